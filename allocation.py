@@ -0,0 +1,239 @@
+"""
+주간 학습 시간 배정기
+
+시간표로부터 다음 배열을 한 번만 만든 뒤 배열 연산으로 학습 시간을 배정한다.
+    - has_class: 요일 × 과목 수업 여부 (복습/예습 구분)
+    - capacity: 요일별 공강 시간 합계 (min_free_minutes 이상인 공강만, 시간 단위)
+배정 결과는 요일 × 과목 시간 행렬이며, place() 로 실제 공강 구간의 시작/종료 시각까지 정한다.
+
+배정 방식:
+    - allocate(): 우선순위 순 탐욕 배정 (요일마다 앞 과목부터 하루 목표 시간만큼)
+    - solve(): 최소 비용 유량으로 과목별 주간 목표를 요일에 고르게 나누는 최적 배정
+"""
+from collections import deque
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from timetable import CLASS, DAY_NAMES, FREE, to_slots
+
+MIN_FREE_MINUTES = 60
+
+# solve() 기본값
+UNIT_MINUTES = 30          # 배정 단위 = 최소 블록 길이
+MAX_DAILY_HOURS = 8.0      # 하루 최대 학습 시간
+REVIEW_BONUS = 0.3         # 수업 있는 날(복습) 배정 선호 (시간당, 과목 가중치 1 기준)
+BALANCE_PENALTY = 0.1      # 하루 학습량이 1시간 늘 때마다 더해지는 비용 (요일 간 균형)
+_COST_SCALE = 100          # 비용을 정수로 다루기 위한 배율
+
+
+class _MinCostFlow:
+    """
+    정수 용량 최소 비용 유량 (successive shortest path + SPFA)
+
+    음수 비용 간선을 허용하고, 비용을 더 줄이는 증가 경로가 없으면 멈춘다
+    (유량 크기가 아니라 총비용을 최소화).
+    """
+    def __init__(self, n_nodes: int):
+        # 간선: [도착 노드, 잔여 용량, 비용, 역방향 간선 인덱스]
+        self.graph = [[] for _ in range(n_nodes)]
+
+    def add_edge(self, u: int, v: int, capacity: int, cost: int) -> Tuple[int, int]:
+        self.graph[u].append([v, capacity, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return u, len(self.graph[u]) - 1
+
+    def flow(self, edge: Tuple[int, int]) -> int:
+        u, i = edge
+        v, _, _, rev = self.graph[u][i]
+        return self.graph[v][rev][1]
+
+    def run(self, source: int, sink: int):
+        graph = self.graph
+        n = len(graph)
+        while True:
+            dist = [float("inf")] * n
+            prev = [None] * n
+            in_queue = [False] * n
+            dist[source] = 0
+            queue = deque([source])
+            while queue:
+                u = queue.popleft()
+                in_queue[u] = False
+                du = dist[u]
+                for i, (v, capacity, cost, _) in enumerate(graph[u]):
+                    if capacity > 0 and du + cost < dist[v]:
+                        dist[v] = du + cost
+                        prev[v] = (u, i)
+                        if not in_queue[v]:
+                            in_queue[v] = True
+                            queue.append(v)
+            if dist[sink] >= 0:
+                return
+
+            push = float("inf")
+            v = sink
+            while v != source:
+                u, i = prev[v]
+                push = min(push, graph[u][i][1])
+                v = u
+            v = sink
+            while v != source:
+                u, i = prev[v]
+                edge = graph[u][i]
+                edge[1] -= push
+                graph[v][edge[3]][1] += push
+                v = u
+
+
+class WeeklyAllocator:
+    """
+    Args:
+        timetable_slots: 수업/공강 슬롯 (JSON 형식 또는 Slot)
+        subject_names: 배정 대상 과목 이름 (배정 순서, 중복 가능)
+        min_free_minutes: 학습에 사용할 공강의 최소 길이(분)
+        n_days: 요일 수 (0=월요일)
+    """
+    def __init__(self, timetable_slots: Iterable, subject_names: Sequence[str],
+                 min_free_minutes: int = MIN_FREE_MINUTES, n_days: int = len(DAY_NAMES)):
+        self.subject_names = list(subject_names)
+        self.n_days = n_days
+
+        name_ids = {}
+        subject_ids = np.array([name_ids.setdefault(name, len(name_ids)) for name in self.subject_names],
+                               dtype=np.int64)
+        presence = np.zeros((n_days, len(name_ids)), dtype=bool)
+        free_rows = []
+        for slot in to_slots(timetable_slots):
+            if not 0 <= slot.day < n_days:
+                continue
+            if slot.kind == CLASS:
+                name_id = name_ids.get(slot.name)
+                if name_id is not None:
+                    presence[slot.day, name_id] = True
+            elif slot.kind == FREE and slot.duration >= min_free_minutes:
+                free_rows.append((slot.day, slot.start, slot.end))
+
+        self.has_class = presence[:, subject_ids]
+
+        frees = np.array(free_rows, dtype=np.int64).reshape(-1, 3)
+        # 요일별 공강 시간 합계는 시간표 순서대로 더한다 (기존 계산과 같은 부동소수 결과)
+        self.capacity = np.bincount(frees[:, 0], weights=(frees[:, 2] - frees[:, 1]) / 60.0, minlength=n_days)
+
+        # 배치용: 요일, 시작 시각 순으로 정렬한 공강 구간
+        frees = frees[np.lexsort((frees[:, 1], frees[:, 0]))]
+        bounds = np.searchsorted(frees[:, 0], np.arange(n_days + 1))
+        self._free_intervals = [frees[bounds[d]:bounds[d + 1], 1:] for d in range(n_days)]
+
+    def free_intervals(self, day: int) -> np.ndarray:
+        """해당 요일의 (시작, 종료) 공강 구간 배열 (시작 순)"""
+        return self._free_intervals[day]
+
+    def allocate(self, hours_needed: Sequence[float]) -> np.ndarray:
+        """
+        과목 순서대로 요일별 남은 공강 시간을 채우는 배정 (앞 과목 우선)
+
+        Args:
+            hours_needed: 과목별 하루 목표 학습 시간 (subject_names 순서)
+
+        Returns:
+            요일 × 과목 배정 시간 행렬
+        """
+        hours = np.asarray(hours_needed, dtype=np.float64)
+        before = np.concatenate(([0.0], np.cumsum(hours)))[:-1]
+        return np.clip(self.capacity[:, None] - before[None, :], 0.0, hours[None, :])
+
+    def _usable_lengths(self, day: int, unit_minutes: int = None) -> np.ndarray:
+        intervals = self._free_intervals[day]
+        lengths = intervals[:, 1] - intervals[:, 0]
+        if unit_minutes:
+            lengths = lengths // unit_minutes * unit_minutes
+        return lengths
+
+    def solve(self, weekly_hours: Sequence[float], daily_hours: Sequence[float], weights: Sequence[float],
+              unit_minutes: int = UNIT_MINUTES, max_daily_hours: float = MAX_DAILY_HOURS,
+              review_bonus: float = REVIEW_BONUS, balance_penalty: float = BALANCE_PENALTY) -> np.ndarray:
+        """
+        최소 비용 유량 최적 배정
+
+        과목 -> 요일 -> 종료 노드 네트워크에서 unit_minutes 단위로 다음을 최적화한다.
+            - 과목별 주간 목표(weekly_hours) 충족, 가중치(weights)가 큰 과목 우선
+            - 과목별 하루 상한(daily_hours), 요일별 상한(max_daily_hours 와 공강 용량)
+            - 수업이 있는 날 배정 선호(review_bonus), 요일 간 학습량 균형(balance_penalty)
+        공강 구간마다 unit_minutes 의 배수만 사용하므로 place(..., unit_minutes) 로 배치하면
+        모든 블록이 unit_minutes 이상이다.
+
+        Returns:
+            요일 × 과목 배정 시간 행렬 (allocate() 와 같은 형식)
+        """
+        n_subjects = len(self.subject_names)
+        unit_hours = unit_minutes / 60.0
+        units_per_hour = max(int(round(1 / unit_hours)), 1)
+        weekly_units = [int(hours / unit_hours + 1e-9) for hours in weekly_hours]
+        daily_units = [int(hours / unit_hours + 1e-9) for hours in daily_hours]
+        max_daily_units = int(max_daily_hours / unit_hours + 1e-9)
+
+        source, sink = 0, 1 + n_subjects + self.n_days
+        network = _MinCostFlow(sink + 1)
+        edges = {}
+        for i in range(n_subjects):
+            gain = int(round(weights[i] * unit_hours * _COST_SCALE))
+            network.add_edge(source, 1 + i, weekly_units[i], -gain)
+
+        bonus = int(round(review_bonus * unit_hours * _COST_SCALE))
+        for day in range(self.n_days):
+            day_node = 1 + n_subjects + day
+            day_units = min(int(self._usable_lengths(day, unit_minutes).sum()) // unit_minutes, max_daily_units)
+            if day_units <= 0:
+                continue
+            for i in range(n_subjects):
+                if daily_units[i] > 0:
+                    cost = -bonus if self.has_class[day, i] else 0
+                    edges[day, i] = network.add_edge(1 + i, day_node, daily_units[i], cost)
+            # 하루 학습량 1시간 구간마다 비용이 커지는 간선 (볼록 비용 -> 요일 간 균형)
+            for tier, start in enumerate(range(0, day_units, units_per_hour)):
+                penalty = int(round(balance_penalty * tier * unit_hours * _COST_SCALE))
+                network.add_edge(day_node, sink, min(units_per_hour, day_units - start), penalty)
+
+        network.run(source, sink)
+
+        allocation = np.zeros((self.n_days, n_subjects), dtype=np.float64)
+        for (day, i), edge in edges.items():
+            allocation[day, i] = network.flow(edge) * unit_hours
+        return allocation
+
+    def place(self, allocation: np.ndarray, unit_minutes: int = None) -> List[List[List[Tuple[int, int]]]]:
+        """
+        배정 시간을 실제 공강 구간에 앞에서부터 이어 붙여 배치
+
+        과목의 학습 시간이 공강 구간 경계를 넘으면 여러 블록으로 나뉜다.
+        unit_minutes 가 주어지면 각 공강 구간의 unit_minutes 배수 부분만 사용한다
+        (solve() 결과를 최소 블록 길이를 지키며 배치할 때).
+
+        Returns:
+            blocks[요일][과목] = [(시작 분, 종료 분), ...]
+        """
+        n_subjects = allocation.shape[1]
+        placed = []
+        for day in range(self.n_days):
+            blocks = [[] for _ in range(n_subjects)]
+            intervals = self._free_intervals[day]
+            minutes = allocation[day] * 60.0
+            if len(intervals) and minutes.any():
+                # 공강 구간을 이어 붙인 축 위에서 과목 구간과 공강 구간 경계로 자른다
+                task_ends = np.rint(np.cumsum(minutes)).astype(np.int64)
+                lengths = self._usable_lengths(day, unit_minutes)
+                interval_ends = np.cumsum(lengths)
+                cuts = np.union1d(task_ends, interval_ends)
+                limit = min(task_ends[-1], interval_ends[-1])
+                cuts = np.concatenate(([0], cuts[(cuts > 0) & (cuts <= limit)]))
+                seg_start, seg_end = cuts[:-1], cuts[1:]
+
+                task_of = np.searchsorted(task_ends, seg_start, side='right')
+                interval_of = np.searchsorted(interval_ends, seg_start, side='right')
+                starts = intervals[interval_of, 0] + seg_start - (interval_ends - lengths)[interval_of]
+                ends = starts + (seg_end - seg_start)
+                for task, start, end in zip(task_of.tolist(), starts.tolist(), ends.tolist()):
+                    blocks[task].append((start, end))
+            placed.append(blocks)
+        return placed
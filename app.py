@@ -1,6 +1,7 @@
 import os
 import json
-import torch
+import threading
+import uuid
 import requests
 import xml.etree.ElementTree as ET
 from urllib.parse import urlparse
@@ -11,60 +12,226 @@ from flask import (
     redirect, url_for, session, jsonify
 )
 
-from models.study_plan_nn import StudyPlanGenerator, create_study_plan
+from models.inference import TORCH_BACKENDS, set_inference_threads
+from models.study_plan_nn import StudyPlanGenerator, TrainingConfig, create_study_plan, plan_stats
+from model_registry import ModelRegistry
 from everytime import Everytime
 from convert import Convert
-
-STUDY_PLAN_MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "study_plan_model.pt")
+from jobs import JobQueue
+from plan_cache import PlanCache, make_plan_key
+from plan_sessions import open_plan_session_store
+from free_time import DEFAULT_DAY_END, DEFAULT_DAY_START, FreeTimeIndex
+from schedule_grid import DEFAULT_RESOLUTION, ScheduleGrid
+from timetable import DAY_NAMES, slots_to_wire, sort_slots, to_slots
+from user_store import DEFAULT_STORE_LOCATIONS, open_user_store
+
+# 데이터/모델 경로는 환경 변수로 바꿀 수 있다 (배포 환경, 테스트용 임시 디렉터리)
+STUDY_PLAN_MODEL_PATH = os.environ.get(
+    "STUDY_PLAN_MODEL_PATH", os.path.join(os.path.dirname(__file__), "models", "study_plan_model.pt"))
+# 합성 데이터로 훈련한 배포용 기본 모델 (python train_offline.py --synthetic 2000 --patience 20 --output models/model.npz)
+BUNDLED_MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "model.npz")
+MODEL_REGISTRY_DIR = os.environ.get(
+    "MODEL_REGISTRY_DIR", os.path.join(os.path.abspath(os.path.dirname(__file__)), "models", "registry"))
+PLAN_CACHE_DIR = os.environ.get(
+    "PLAN_CACHE_DIR", os.path.join(os.path.abspath(os.path.dirname(__file__)), "plan_cache"))
+# 생성한 학습 계획은 서버에 저장하고 쿠키 세션에는 계획 id 만 보관: sqlite (워커 간 공유, 기본값) 또는 memory
+PLAN_SESSION_BACKEND = os.environ.get("PLAN_SESSION_STORE", "sqlite")
+PLAN_SESSION_PATH = os.environ.get(
+    "PLAN_SESSION_PATH", os.path.join(os.path.abspath(os.path.dirname(__file__)), "sessions", "plan_sessions.sqlite3"))
+PLAN_SESSION_TTL = int(os.environ.get("PLAN_SESSION_TTL", str(24 * 60 * 60)))
+
+# 공강을 계산하는 하루 범위 (자정 기준 분)
+FREE_TIME_DAY_START = DEFAULT_DAY_START
+FREE_TIME_DAY_END = DEFAULT_DAY_END
+# 전체 시간표 격자 칸 길이(분). ?resolution= 으로 허용 목록 안에서 바꿀 수 있음
+SCHEDULE_GRID_RESOLUTION = DEFAULT_RESOLUTION
+SCHEDULE_GRID_RESOLUTIONS = (5, 10, 15, 30, 60)
+# 추론 백엔드(numpy / eager / torchscript / onnx)와 워커당 추론 스레드 수.
+# numpy 이면 웹 서버는 torch 를 import 하지 않는다 (모델 재훈련 시에만 import)
+STUDY_PLAN_BACKEND = os.environ.get("STUDY_PLAN_BACKEND", "numpy")
+STUDY_PLAN_THREADS = int(os.environ.get("STUDY_PLAN_THREADS", "1"))
+# /retrain_model 훈련 설정: 손실이 더 줄지 않으면 조기 종료, 같은 데이터면 같은 모델
+RETRAIN_CONFIG = TrainingConfig(epochs=300, batch_size=256, patience=15, lr_patience=5, seed=0)
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here_for_session"
 
-SUBJECT_DATA_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "subject_datas")
-SUBJECT_DATA_FILE = os.path.join(SUBJECT_DATA_DIR, "subject_datas.json")
+# 사용자별 시간표/과목 저장소: sqlite (WAL, 기본값) 또는 json (사용자별 파일)
+SUBJECT_STORE_BACKEND = os.environ.get("SUBJECT_STORE", "sqlite")
+SUBJECT_STORE_LOCATIONS = DEFAULT_STORE_LOCATIONS
+SUBJECT_STORE_LOCATION = os.environ.get("SUBJECT_STORE_LOCATION", SUBJECT_STORE_LOCATIONS[SUBJECT_STORE_BACKEND])
+
+subject_store = open_user_store(SUBJECT_STORE_BACKEND, SUBJECT_STORE_LOCATION)
 
-global_timetable_slots = []
-global_study_planner = None
+def current_session_id():
+    """세션마다 발급하는 id (로그인/로그아웃해도 유지, 백그라운드 작업 소유자 확인에 사용)"""
+    if 'anon_id' not in session:
+        session['anon_id'] = uuid.uuid4().hex
+    return session['anon_id']
 
-def ensure_subject_data_dir():
-    if not os.path.exists(SUBJECT_DATA_DIR):
-        os.makedirs(SUBJECT_DATA_DIR)
+def current_user_key():
+    """로그인 사용자는 사용자 이름, 그 외에는 세션마다 발급한 익명 id 로 데이터를 구분"""
+    username = session.get('username')
+    if username:
+        return f"user:{username}"
+    return f"anon:{current_session_id()}"
 
 def save_subject_data(timetable_slots, subjects=None):
-    ensure_subject_data_dir()
-    data = {"timetable_slots": timetable_slots}
-    if subjects is not None:
-        data["subjects"] = subjects
-    with open(SUBJECT_DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-def load_subject_data_from_file():
-    if os.path.exists(SUBJECT_DATA_FILE):
+    subject_store.put(current_user_key(), timetable_slots, subjects)
+
+def load_subject_data():
+    """현재 사용자의 (timetable_slots, subjects). 반환값은 저장소 캐시와 공유되므로 수정하지 않는다."""
+    try:
+        return subject_store.get(current_user_key())
+    except Exception as e:
+        print(f"과목 데이터 로드 오류: {e}")
+        return [], []
+
+class ModelUnavailableError(RuntimeError):
+    """레지스트리와 배포용 기본 모델 모두 사용할 수 없음 (요청은 503 으로 응답)"""
+
+_bundled_planner = None
+_bundled_planner_lock = threading.Lock()
+
+def load_study_planner():
+    """
+    프로세스 시작 시 레지스트리의 현재 버전을 로드.
+    레지스트리가 비어 있으면 이전 방식의 단일 체크포인트를 찾아 첫 버전으로 등록하고
+    (스키마가 맞지 않으면 건너뜀), 그것도 없으면 배포용 기본 모델을 읽기 전용으로 불러 둔다.
+    """
+    planner = model_registry.current_planner()
+    if planner is not None:
+        print(f"학습 계획 모델 로드 완료: {model_registry.loaded_version}")
+        return planner
+    if os.path.exists(STUDY_PLAN_MODEL_PATH):
         try:
-            with open(SUBJECT_DATA_FILE, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-            timetable_slots = loaded_data.get("timetable_slots", [])
-            subjects = loaded_data.get("subjects", [])
-            return timetable_slots, subjects
+            planner = StudyPlanGenerator(STUDY_PLAN_MODEL_PATH)
+            version = model_registry.publish(planner, metrics={"imported_from": os.path.basename(STUDY_PLAN_MODEL_PATH)})
+            print(f"학습 계획 모델 로드 완료: {STUDY_PLAN_MODEL_PATH} -> {version}")
+            return planner
         except Exception as e:
-            print(f"과목 데이터 로드 오류: {e}")
-    return [], []
+            print(f"모델 로드 실패 ({STUDY_PLAN_MODEL_PATH}): {e}")
+    return load_bundled_planner()
+
+def load_bundled_planner():
+    """
+    배포용 기본 모델(BUNDLED_MODEL_PATH)을 레지스트리에 게시하지 않고 읽기 전용으로 로드 (프로세스당 한 번).
+    로드에 실패하면 None
+    """
+    global _bundled_planner
+    if _bundled_planner is not None:
+        return _bundled_planner
+    with _bundled_planner_lock:
+        if _bundled_planner is None and os.path.exists(BUNDLED_MODEL_PATH):
+            try:
+                planner = StudyPlanGenerator(BUNDLED_MODEL_PATH, backend=STUDY_PLAN_BACKEND, n_threads=STUDY_PLAN_THREADS)
+                planner.set_backend(STUDY_PLAN_BACKEND, STUDY_PLAN_THREADS)
+                _bundled_planner = planner
+                print(f"배포용 기본 모델 로드 완료: {BUNDLED_MODEL_PATH}")
+            except Exception as e:
+                print(f"모델 로드 실패 ({BUNDLED_MODEL_PATH}): {e}")
+    return _bundled_planner
+
+def get_study_planner():
+    """
+    레지스트리의 현재 모델 반환 (다른 프로세스가 새 버전을 활성화하면 자동 교체).
+    현재 버전이 없으면(빈 레지스트리, 특성 스키마 변경 등) 배포용 기본 모델을 사용하고,
+    그것도 없으면 ModelUnavailableError. 요청 안에서는 모델을 훈련하지 않는다
+    (새 모델은 /retrain_model 또는 train_offline.py 로 게시).
+    """
+    planner = model_registry.current_planner() or load_bundled_planner()
+    if planner is None:
+        raise ModelUnavailableError("사용 가능한 학습 계획 모델이 없습니다. 잠시 후 다시 시도해 주세요.")
+    return planner
+
+if STUDY_PLAN_BACKEND in TORCH_BACKENDS:
+    set_inference_threads(STUDY_PLAN_THREADS)
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR, backend=STUDY_PLAN_BACKEND, n_threads=STUDY_PLAN_THREADS)
+load_study_planner()
+
+def plan_job_progress(stage, info):
+    """학습 계획 작업의 단계별 진행률 (0-100)"""
+    if stage == "training" and info.get("epochs"):
+        return 10 + 70 * info["epoch"] / info["epochs"]
+    return {"predicting": 85, "scheduling": 95}.get(stage, 5)
+
+plan_jobs = JobQueue(max_workers=2, progress_fn=plan_job_progress)
+plan_cache = PlanCache(max_entries=256, disk_dir=PLAN_CACHE_DIR, max_disk_bytes=64 * 1024 * 1024)
+plan_sessions = open_plan_session_store(PLAN_SESSION_BACKEND, PLAN_SESSION_PATH, ttl=PLAN_SESSION_TTL)
+
+def generate_study_plan(subjects, slots_for_dataset, progress_callback=None, solver="greedy"):
+    """같은 입력, 모델, 배정 방식이면 캐시된 결과를 재사용하는 학습 계획 생성"""
+    planner = get_study_planner()
+    key = make_plan_key(subjects, slots_for_dataset, planner.fingerprint(), solver)
+    return plan_cache.get_or_create(
+        key, lambda: create_study_plan(subjects, slots_for_dataset, planner=planner,
+                                       progress_callback=progress_callback, solver=solver))
+
+def run_plan_job(subjects, slots_for_dataset, timetable_slots_full, progress_callback=None):
+    """백그라운드에서 실행되는 학습 계획 생성 작업"""
+    study_plan_result = generate_study_plan(subjects, slots_for_dataset, progress_callback)
+    return {"plan": study_plan_result, "timetable_slots": timetable_slots_full}
+
+def store_plan_in_session(study_plan_result, timetable_slots_full, plan_id=None):
+    """계획은 서버 측 저장소에, 쿠키 세션에는 계획 id 만 저장 (plan_id 를 주면 같은 id 로 덮어씀)"""
+    session['plan_id'] = plan_sessions.put({
+        "weekly_schedule": study_plan_result.get('weekly_schedule', {}),
+        "priorities": study_plan_result.get('priorities', []),
+        "summary": study_plan_result.get('summary', {}),
+        "stats": plan_stats(study_plan_result),
+        "timetable_slots": timetable_slots_full,
+    }, plan_id)
+
+def load_plan_from_session():
+    """현재 세션의 계획 ({"weekly_schedule", "priorities", "summary", "stats", "timetable_slots"}). 없거나 만료되었으면 None"""
+    plan_id = session.get('plan_id')
+    if not plan_id:
+        return None
+    return plan_sessions.get(plan_id)
+
+def render_plan_result(study_plan_result, timetable_slots, neural_features_count=12):
+    """계획에 저장된 통계(plan["stats"])로 결과 페이지 렌더링 (일정을 다시 순회하지 않음)"""
+    stats = plan_stats(study_plan_result)
+    avg_confidence = stats['average_confidence']
+    return render_template("result.html",
+                           priorities=study_plan_result.get('priorities', []),
+                           weekly_schedule=study_plan_result.get('weekly_schedule', {}),
+                           summary=study_plan_result.get('summary', {}),
+                           total_study_hours=round(stats['total_study_hours'], 1),
+                           daily_study_hours=stats['daily_study_hours'],
+                           subject_weekly_hours=stats['subject_weekly_hours'],
+                           timetable_slots=timetable_slots,
+                           neural_features_count=neural_features_count,
+                           average_confidence=avg_confidence if avg_confidence > 0 else 0.947, # Provide a default if not calculated
+                           analysis_reliability="높음" if (avg_confidence if avg_confidence > 0 else 0.947) >= 0.8 else "보통", # Example reliability
+                           training_epochs=100
+                           )
+
+def plan_error(message, wants_json):
+    if wants_json:
+        return jsonify({"error": message}), 400
+    return render_template("result.html", error_message=message)
+
+def model_unavailable(error, wants_json):
+    """사용할 모델이 없을 때 503 (요청마다 훈련하지 않음)"""
+    if wants_json:
+        return jsonify({"error": str(error)}), 503
+    return render_template("result.html", error_message=str(error)), 503
 
 USER_CREDENTIALS = {"admin": "helloai"}
+# 모델 버전 교체 등 관리 기능을 사용할 수 있는 사용자 (쉼표로 구분)
+ADMIN_USERS = frozenset(filter(None, os.environ.get("ADMIN_USERS", "admin").split(",")))
 
-def time_to_minutes(time_str):
-    try:
-        h, m = map(int, time_str.split(':'))
-        return h * 60 + m
-    except:
-        return None
+def is_admin():
+    return session.get('username') in ADMIN_USERS
 
-def minutes_to_time_str(minutes):
-    if minutes is None:
-        return ""
-    h = minutes // 60
-    m = minutes % 60
-    return f"{h:02d}:{m:02d}"
+def admin_required():
+    """관리자가 아니면 오류 응답 (로그인 안 함 401, 권한 없음 403), 관리자면 None"""
+    if not session.get('username'):
+        return jsonify({"success": False, "error": "로그인이 필요합니다."}), 401
+    if not is_admin():
+        return jsonify({"success": False, "error": "권한이 없습니다."}), 403
+    return None
 
 @app.route("/")
 def main():
@@ -73,9 +240,9 @@ def main():
 @app.route("/logout")
 def logout():
     session.pop('username', None)
-    session.pop('ai_weekly_schedule', None)
-    session.pop('ai_priorities', None)
-    session.pop('used_timetable_slots_for_plan', None)
+    plan_id = session.pop('plan_id', None)
+    if plan_id:
+        plan_sessions.delete(plan_id)
     return redirect(url_for("login"))
 
 @app.route("/login", methods=["GET", "POST"])
@@ -110,51 +277,19 @@ def process_timetable():
             return jsonify({"error": "시간표 XML을 가져오지 못했습니다."}), 400
 
         c = Convert(xml_data) #
-        subjects_from_everytime = c.get_subjects() #
+        subjects_from_everytime = c.get_timetable()
         if not subjects_from_everytime:
             return jsonify({"timetable_slots": [], "subjects": [], "message": "과목 정보를 찾을 수 없습니다."})
 
-        day_map = {"0":"월요일","1":"화요일","2":"수요일","3":"목요일","4":"금요일","5":"토요일","6":"일요일"}
-        free_start, free_end = time_to_minutes("09:00"), time_to_minutes("21:00")
-        timetable_results = []
-
-        for subj in subjects_from_everytime:
-            name = subj.get("name", "")
-            prof = subj.get("professor", "")
-            for info in subj.get("info", []):
-                d, s, e_ = info.get("day"), info.get("startAt"), info.get("endAt")
-                if d in day_map and s and e_:
-                    timetable_results.append(("수업", name, day_map[d], s, e_, prof, info.get("place","")))
-
-        for key in sorted(day_map.keys()):
-            day = day_map[key]
-            classes_on_day = []
-            for subj in subjects_from_everytime:
-                for info in subj.get("info", []):
-                    if info.get("day")==key:
-                        sm, em = time_to_minutes(info.get("startAt")), time_to_minutes(info.get("endAt"))
-                        if sm is not None and em is not None and sm<em:
-                            if em > free_start and sm < free_end:
-                                classes_on_day.append((sm, em))
-            classes_on_day.sort()
-            last_class_end_time = free_start
-            for sm, em in classes_on_day:
-                if sm > last_class_end_time:
-                    timetable_results.append(("공강","",day,minutes_to_time_str(last_class_end_time),minutes_to_time_str(sm),"",""))
-                last_class_end_time = max(last_class_end_time, em)
-            if last_class_end_time < free_end:
-                timetable_results.append(("공강","",day,minutes_to_time_str(last_class_end_time),minutes_to_time_str(free_end),"",""))
-
-        order = {"월요일":0,"화요일":1,"수요일":2,"목요일":3,"금요일":4,"토요일":5,"일요일":6}
-        timetable_results.sort(key=lambda x: (order.get(x[2],7), time_to_minutes(x[3]) or 0, 0 if x[0]=="공강" else 1))
-
-        global global_timetable_slots
-        global_timetable_slots = timetable_results
-
-        default_subjects_for_plan = [{"name": s['name'], "weight": 50.0, "major": False} for s in subjects_from_everytime]
-        save_subject_data(global_timetable_slots, default_subjects_for_plan)
-
-        return jsonify({"timetable_slots": timetable_results, "subjects": default_subjects_for_plan, "message": "시간표를 성공적으로 불러왔습니다."})
+        class_slots = [slot for subj in subjects_from_everytime for slot in subj.sessions
+                       if 0 <= slot.day < len(DAY_NAMES)]
+        free_time = FreeTimeIndex(class_slots, day_start=FREE_TIME_DAY_START, day_end=FREE_TIME_DAY_END)
+        timetable_results = sort_slots(class_slots + free_time.free_slot_rows())
+
+        default_subjects_for_plan = [{"name": s.name, "weight": 50.0, "major": False} for s in subjects_from_everytime]
+        save_subject_data(timetable_results, default_subjects_for_plan)
+
+        return jsonify({"timetable_slots": slots_to_wire(timetable_results), "subjects": default_subjects_for_plan, "message": "시간표를 성공적으로 불러왔습니다."})
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -162,10 +297,8 @@ def process_timetable():
 
 @app.route("/load_stored_timetable")
 def load_stored_timetable_route():
-    global global_timetable_slots
-    slots, subjects = load_subject_data_from_file()
+    slots, subjects = load_subject_data()
     if slots:
-        global_timetable_slots = slots
         return jsonify({"timetable_slots": slots, "subjects": subjects, "message": "저장된 시간표를 불러왔습니다."})
     return jsonify({"timetable_slots": [], "subjects": [], "message": "저장된 데이터가 없습니다."}), 404
 
@@ -186,25 +319,26 @@ def loading():
 
 @app.route("/plan", methods=["GET","POST"])
 def plan():
-    global global_timetable_slots, global_study_planner
-
     if request.method == "POST":
+        # JSON 을 요청하면 백그라운드 작업으로 등록하고 작업 id 를 반환 (로딩 페이지에서 사용)
+        wants_json = request.accept_mimetypes.best == "application/json"
+
         slots_json = request.form.get("timetable_slots","")
         if not slots_json:
-            return render_template("result.html", error_message="시간표 정보가 없습니다.")
+            return plan_error("시간표 정보가 없습니다.", wants_json)
 
         try:
             timetable_slots_full = json.loads(slots_json)
         except:
-            return render_template("result.html", error_message="시간표 데이터 파싱 실패")
+            return plan_error("시간표 데이터 파싱 실패", wants_json)
 
         subjects_json_str = request.form.get("subjects_json")
         if not subjects_json_str:
-            return render_template("result.html", error_message="과목 상세 정보(JSON)가 없습니다.")
+            return plan_error("과목 상세 정보(JSON)가 없습니다.", wants_json)
         try:
             subjects_input_data = json.loads(subjects_json_str)
         except json.JSONDecodeError:
-            return render_template("result.html", error_message="과목 상세 정보(JSON) 파싱 실패")
+            return plan_error("과목 상세 정보(JSON) 파싱 실패", wants_json)
 
         valid_subjects_data = []
         for subj_data in subjects_input_data:
@@ -216,65 +350,38 @@ def plan():
                 })
 
         if not valid_subjects_data:
-            return render_template("result.html", error_message="유효한 과목명이 필요합니다.")
+            return plan_error("유효한 과목명이 필요합니다.", wants_json)
 
         subjects_data_for_ai = valid_subjects_data
         save_subject_data(timetable_slots_full, subjects_data_for_ai)
 
-        slots_for_dataset = [(s[0], s[1], s[2], s[3], s[4]) for s in timetable_slots_full if len(s) >=5]
-
+        slots_for_dataset = to_slots(timetable_slots_full)
 
         try:
-            study_plan_result = create_study_plan(subjects_data_for_ai, slots_for_dataset) #
-
-            session['ai_weekly_schedule'] = study_plan_result.get('weekly_schedule', {})
-            session['ai_priorities'] = study_plan_result.get('priorities', [])
-            session['used_timetable_slots_for_plan'] = timetable_slots_full
-
-
-            total_study_hours = 0
-            daily_study_hours = {}
-            weekly_schedule_from_ai = study_plan_result.get('weekly_schedule', {})
-
-            for day, schedule_items in weekly_schedule_from_ai.items():
-                daily_hours = sum(item.get('duration', 0) for item in schedule_items)
-                daily_study_hours[day] = daily_hours
-                total_study_hours += daily_hours
-
-            subject_weekly_hours = {}
-            for day_schedule_items in weekly_schedule_from_ai.values():
-                for item in day_schedule_items:
-                    subject = item.get('subject')
-                    if subject:
-                        subject_weekly_hours[subject] = subject_weekly_hours.get(subject, 0) + item.get('duration', 0)
-
-            avg_confidence = 0
-            if study_plan_result.get('priorities'):
-                confidences = [p.get('confidence',0) for p in study_plan_result.get('priorities') if p.get('confidence') is not None]
-                if confidences:
-                    avg_confidence = sum(confidences) / len(confidences)
-
-
-            return render_template("result.html",
-                                   priorities=study_plan_result.get('priorities', []),
-                                   weekly_schedule=weekly_schedule_from_ai,
-                                   summary=study_plan_result.get('summary', {}),
-                                   total_study_hours=round(total_study_hours, 1),
-                                   daily_study_hours=daily_study_hours,
-                                   subject_weekly_hours=subject_weekly_hours,
-                                   timetable_slots=timetable_slots_full,
-                                   neural_features_count=study_plan_result.get('neural_features_count', getattr(getattr(global_study_planner, 'model', None), 'input_dim', 12) if global_study_planner else 12),
-                                   average_confidence= avg_confidence if avg_confidence > 0 else 0.947, # Provide a default if not calculated
-                                   analysis_reliability="높음" if (avg_confidence if avg_confidence > 0 else 0.947) >= 0.8 else "보통", # Example reliability
-                                   training_epochs=100
-                                   )
+            get_study_planner()
+        except ModelUnavailableError as e:
+            return model_unavailable(e, wants_json)
+
+        if wants_json:
+            job_id = plan_jobs.submit(run_plan_job, subjects_data_for_ai, slots_for_dataset, timetable_slots_full,
+                                      owner=current_session_id())
+            return jsonify({"job_id": job_id, "status_url": url_for("job_status", job_id=job_id)}), 202
 
+        try:
+            study_plan_result = generate_study_plan(subjects_data_for_ai, slots_for_dataset)
+            store_plan_in_session(study_plan_result, timetable_slots_full)
+            return render_plan_result(
+                study_plan_result, timetable_slots_full,
+                neural_features_count=study_plan_result.get('neural_features_count', getattr(getattr(get_study_planner(), 'model', None), 'input_dim', 12)))
+
+        except ModelUnavailableError as e:
+            return model_unavailable(e, wants_json)
         except Exception as e:
             import traceback
             traceback.print_exc()
             return render_template("result.html", error_message=f"AI 학습 계획 생성 중 오류: {str(e)}")
 
-    loaded_slots, loaded_subjects = load_subject_data_from_file()
+    loaded_slots, loaded_subjects = load_subject_data()
     initial_timetable_json = json.dumps(loaded_slots) if loaded_slots else ""
     initial_subjects_json = json.dumps(loaded_subjects) if loaded_subjects else "[]"
 
@@ -283,158 +390,89 @@ def plan():
                            initial_subjects_data=initial_subjects_json)
 
 
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """백그라운드 학습 계획 작업의 진행 상황과 결과 조회 (작업을 등록한 세션만 조회 가능)"""
+    job = plan_jobs.get(job_id, owner=current_session_id())
+    if job is None:
+        return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+
+    status = job.to_dict()
+    if job.status == "done":
+        # 폴링할 때마다 새 계획을 만들지 않도록 작업 id 를 계획 id 로 사용
+        if session.get('plan_id') != job_id:
+            store_plan_in_session(job.result["plan"], job.result["timetable_slots"], plan_id=job_id)
+        status["result_url"] = url_for("show_result")
+    return jsonify(status)
+
+
+@app.route("/plan_cache/stats")
+def plan_cache_stats():
+    """학습 계획 캐시 / 시간표 특성 캐시 / 사용자 데이터 읽기 캐시 / 계획 세션 적중/미스 통계 (모니터링용)"""
+    stats = plan_cache.stats()
+    stats["subject_store"] = subject_store.stats()
+    stats["plan_sessions"] = plan_sessions.stats()
+    planner = model_registry.current_planner() or load_bundled_planner()
+    if planner is not None:
+        stats["feature_cache"] = planner.feature_cache.stats()
+    return jsonify(stats)
+
+
+@app.route("/model_registry")
+def model_registry_info():
+    """등록된 모델 버전과 현재 버전 (관리자만, 훈련 지표 등 메타데이터 포함)"""
+    denied = admin_required()
+    if denied:
+        return denied
+    return jsonify(model_registry.describe())
+
+
+@app.route("/model_registry/activate", methods=["POST"])
+def model_registry_activate():
+    """지정한 버전으로 모델 교체 (롤백, 관리자만). 재시작 없이 다음 요청부터 적용된다."""
+    denied = admin_required()
+    if denied:
+        return denied
+    version = request.form.get("version") or (request.get_json(silent=True) or {}).get("version")
+    try:
+        model_registry.activate(version)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, "version": version})
+
+
 @app.route("/show_full_schedule")
 def show_full_schedule():
-    current_timetable_slots = session.get('used_timetable_slots_for_plan')
+    stored_plan = load_plan_from_session() or {}
+    current_timetable_slots = stored_plan.get('timetable_slots')
 
     if not current_timetable_slots:
-        global global_timetable_slots
-        if global_timetable_slots:
-            current_timetable_slots = global_timetable_slots
+        slots_from_store, _ = load_subject_data()
+        if slots_from_store:
+            current_timetable_slots = slots_from_store
         else:
-            slots_from_file, _ = load_subject_data_from_file()
-            if slots_from_file:
-                current_timetable_slots = slots_from_file
-            else:
-                return render_template("full_schedule.html", message="시간표 정보가 없습니다. 먼저 시간표를 불러오고 계획을 생성해주세요.", days_of_week=[], time_intervals=[], schedule_grid={})
+            return render_template("full_schedule.html", message="시간표 정보가 없습니다. 먼저 시간표를 불러오고 계획을 생성해주세요.", days_of_week=[], time_intervals=[], schedule_grid={})
 
     if not current_timetable_slots:
         return render_template("full_schedule.html", message="표시할 시간표 데이터가 없습니다.", days_of_week=[], time_intervals=[], schedule_grid={})
 
-    ai_weekly_schedule = session.get('ai_weekly_schedule', {})
-
-    days_of_week = ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"]
-    time_intervals = [f"{h:02d}:{m:02d}" for h in range(9, 21) for m in (0, 30)]
-
-    schedule_grid = {time_str: {day: None for day in days_of_week} for time_str in time_intervals}
-
-    subject_colors = {}
-    color_palette = [
-        "#FFB3BA", "#FFDFBA", "#FFFFBA", "#BAFFC9", "#BAE1FF", "#E0BBE4",
-        "#FFBEB1", "#FDFD96", "#BDE4A7", "#A7CEE2", "#D7B0E0", "#FFCBAE",
-        "#F6A7B0", "#FDD09C", "#F9F871", "#AEDEA0", "#A4C8E0", "#CAA7D9"
-    ]
-    used_colors_count = 0
-
-    def get_color_for_subject(subject_name):
-        nonlocal used_colors_count
-        if subject_name not in subject_colors:
-            subject_colors[subject_name] = color_palette[used_colors_count % len(color_palette)]
-            used_colors_count += 1
-        return subject_colors[subject_name]
-
-    for slot_data in current_timetable_slots:
-        if len(slot_data) < 7: continue
-        slot_type, name, day, start_str, end_str, prof, place = slot_data[:7]
-        if slot_type == "수업" and day in days_of_week:
-            s_h, s_m = map(int, start_str.split(':'))
-            e_h, e_m = map(int, end_str.split(':'))
-
-            class_start_total_minutes = s_h * 60 + s_m
-            class_end_total_minutes = e_h * 60 + e_m
-
-            grid_s_idx, grid_e_idx = -1, -1
-
-            for idx, t_str in enumerate(time_intervals):
-                t_h_interval, t_m_interval = map(int, t_str.split(':'))
-                interval_start_total_minutes = t_h_interval * 60 + t_m_interval
-
-                if grid_s_idx == -1 and interval_start_total_minutes >= class_start_total_minutes and interval_start_total_minutes < class_end_total_minutes:
-                    grid_s_idx = idx
-
-                if interval_start_total_minutes < class_end_total_minutes:
-                    grid_e_idx = idx + 1
-
-            if grid_s_idx != -1 and grid_e_idx != -1 and grid_s_idx < grid_e_idx:
-                rowspan = grid_e_idx - grid_s_idx
-                target_start_time_str = time_intervals[grid_s_idx]
-                if schedule_grid[target_start_time_str][day] is None:
-                    schedule_grid[target_start_time_str][day] = {
-                        "type": "class", "subject_name": name,
-                        "professor": prof, "place": place,
-                        "start_time": start_str, "end_time": end_str,
-                        "rowspan": rowspan, "color": get_color_for_subject(name)
-                    }
-                    for i in range(1, rowspan):
-                        if grid_s_idx + i < len(time_intervals):
-                            schedule_grid[time_intervals[grid_s_idx + i]][day] = "covered"
-
-    mutable_ai_schedule = {day: [dict(task) for task in tasks] for day, tasks in ai_weekly_schedule.items()}
-
-    for day in days_of_week:
-        if day not in mutable_ai_schedule or not mutable_ai_schedule[day]:
-            continue
-
-        tasks_for_day = mutable_ai_schedule[day]
-        current_ai_task_idx = 0
-
-        for time_idx, time_str in enumerate(time_intervals):
-            if current_ai_task_idx >= len(tasks_for_day):
-                break
-
-            if schedule_grid[time_str][day] is None:
-                ai_task = tasks_for_day[current_ai_task_idx]
-
-                slots_needed_for_task_remaining = int(float(ai_task.get('duration', 0)) * 2)
-
-                if slots_needed_for_task_remaining <= 0:
-                    current_ai_task_idx += 1
-                    if current_ai_task_idx < len(tasks_for_day):
-                        ai_task = tasks_for_day[current_ai_task_idx]
-                        slots_needed_for_task_remaining = int(float(ai_task.get('duration', 0)) * 2)
-                        if slots_needed_for_task_remaining <= 0: continue
-                    else: break
-
-                contiguous_free_slots = 0
-                for i in range(len(time_intervals) - time_idx):
-                    check_time_str = time_intervals[time_idx + i]
-                    if schedule_grid[check_time_str][day] is None:
-                        contiguous_free_slots += 1
-                    else:
-                        break
-
-                slots_to_fill_now = min(slots_needed_for_task_remaining, contiguous_free_slots)
-
-                if slots_to_fill_now > 0:
-                    actual_study_duration_hours = slots_to_fill_now / 2.0
-
-                    block_end_idx = time_idx + slots_to_fill_now
-
-                    h_end_block, m_end_block = map(int, time_intervals[block_end_idx-1].split(':'))
-                    m_end_block += 30
-                    if m_end_block >= 60: h_end_block+=1; m_end_block-=60
-                    actual_block_end_time_str = f"{h_end_block:02d}:{m_end_block:02d}"
-
-                    # --- 색상 결정 로직 수정 ---
-                    item_color = "transparent" # 기본값을 투명으로 설정
-                    study_type = ai_task.get('study_type', '').lower() # 소문자로 비교
-
-                    # '예습' 또는 '복습'이 아닌 경우에만 과목 색상 적용
-                    # (만약 모든 study 타입에 색을 입히고 싶다면 이 조건문 제거)
-                    if not ('예습' not in study_type and '복습' not in study_type):
-                        item_color = get_color_for_subject(ai_task['subject'])
-                    # --- ---
-
-                    schedule_grid[time_str][day] = {
-                        "type": "study",
-                        "subject_name": ai_task['subject'],
-                        "place": f"{ai_task.get('study_type','공강 자습')}",
-                        "start_time": time_str,
-                        "end_time": actual_block_end_time_str,
-                        "rowspan": slots_to_fill_now,
-                        "color": item_color # 수정된 색상 적용
-                    }
-                    for i in range(1, slots_to_fill_now):
-                        schedule_grid[time_intervals[time_idx + i]][day] = "covered"
-
-                    ai_task['duration'] = float(ai_task.get('duration', 0)) - actual_study_duration_hours
-                    if ai_task['duration'] < 0.01:
-                        current_ai_task_idx += 1
+    ai_weekly_schedule = stored_plan.get('weekly_schedule', {})
+
+    resolution = request.args.get('resolution', SCHEDULE_GRID_RESOLUTION, type=int)
+    if resolution not in SCHEDULE_GRID_RESOLUTIONS:
+        resolution = SCHEDULE_GRID_RESOLUTION
+
+    grid = ScheduleGrid(day_start=FREE_TIME_DAY_START, day_end=FREE_TIME_DAY_END, resolution=resolution)
+    for slot in to_slots(current_timetable_slots):
+        grid.place_class(slot)
+    grid.place_study_tasks(ai_weekly_schedule)
+    if grid.unplaced:
+        print(f"시간표 격자에 표시하지 못한 학습 블록 {len(grid.unplaced)}개 (해상도 {resolution}분): {grid.unplaced}")
 
     return render_template("full_schedule.html",
-                           schedule_grid=schedule_grid,
-                           time_intervals=time_intervals,
-                           days_of_week=days_of_week,
+                           schedule_grid=grid.to_template_grid(),
+                           time_intervals=grid.time_labels,
+                           days_of_week=grid.days,
                            message=None)
 
 
@@ -460,27 +498,22 @@ def export_study_plan():
 
 @app.route("/retrain_model", methods=["POST"])
 def retrain_model_route():
-    global global_study_planner, global_timetable_slots
+    # 저장된 모든 사용자의 데이터로 훈련 (대규모 데이터는 train_offline.py 사용)
+    inputs = [(subjects, to_slots(slots)) for _, slots, subjects in subject_store.items() if subjects and slots]
 
-    slots, subjects = load_subject_data_from_file()
-
-    if not subjects or not slots:
+    if not inputs:
         return jsonify({"success": False, "error": "모델 재훈련에 필요한 데이터(과목 및 시간표)가 저장되어 있지 않습니다."})
 
     try:
-        slots_for_dataset = [(s[0], s[1], s[2], s[3], s[4]) for s in slots if len(s) >=5]
-
-        print(f"Retraining model with {len(subjects)} subjects and {len(slots_for_dataset)} timetable slots.")
-
-        if not os.path.exists(os.path.join(os.path.dirname(__file__), "models")):
-            os.makedirs(os.path.join(os.path.dirname(__file__), "models"))
+        print(f"Retraining model with {sum(len(subjects) for subjects, _ in inputs)} subjects from {len(inputs)} users.")
 
         planner = StudyPlanGenerator() #
-        planner.train_model(subjects, slots_for_dataset, epochs=100) #
-        planner.save_model(STUDY_PLAN_MODEL_PATH) #
-        global_study_planner = planner
+        planner.train_model_pooled(inputs, config=RETRAIN_CONFIG) #
+        # 새 버전으로 원자적으로 저장하고 현재 버전으로 교체 (처리 중인 요청은 이전 모델 사용)
+        version = model_registry.publish(planner)
 
-        return jsonify({"success": True, "message": "모델 재훈련이 완료되었습니다."})
+        return jsonify({"success": True, "message": "모델 재훈련이 완료되었습니다.", "version": version,
+                        "metrics": planner.training_metrics})
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -488,57 +521,28 @@ def retrain_model_route():
 
 @app.route("/result")
 def show_result():
-    """세션에 저장된 AI 학습 계획 결과를 다시 표시"""
-    ai_weekly_schedule = session.get('ai_weekly_schedule')
-    ai_priorities = session.get('ai_priorities')
-    used_timetable_slots = session.get('used_timetable_slots_for_plan')
+    """세션의 계획 id 로 서버 측 저장소에서 AI 학습 계획 결과를 가져와 다시 표시"""
+    stored_plan = load_plan_from_session() or {}
+    ai_weekly_schedule = stored_plan.get('weekly_schedule')
+    ai_priorities = stored_plan.get('priorities')
+    used_timetable_slots = stored_plan.get('timetable_slots')
 
     if not ai_weekly_schedule or not ai_priorities:
         return redirect(url_for('plan'))
 
-    # 결과 페이지에 필요한 통계 데이터 재계산
-    total_study_hours = 0
-    daily_study_hours = {}
-
-    for day, schedule_items in ai_weekly_schedule.items():
-        daily_hours = sum(item.get('duration', 0) for item in schedule_items)
-        daily_study_hours[day] = daily_hours
-        total_study_hours += daily_hours
-
-    subject_weekly_hours = {}
-    for day_schedule_items in ai_weekly_schedule.values():
-        for item in day_schedule_items:
-            subject = item.get('subject')
-            if subject:
-                subject_weekly_hours[subject] = subject_weekly_hours.get(subject, 0) + item.get('duration', 0)
-
-    # 평균 신뢰도 계산
-    avg_confidence = 0
-    if ai_priorities:
-        confidences = [p.get('confidence', 0) for p in ai_priorities if p.get('confidence') is not None]
-        if confidences:
-            avg_confidence = sum(confidences) / len(confidences)
+    return render_plan_result(stored_plan, used_timetable_slots or [])
 
-    return render_template("result.html",
-                           priorities=ai_priorities,
-                           weekly_schedule=ai_weekly_schedule,
-                           summary={},  # 세션에 저장되지 않았다면 빈 dict
-                           total_study_hours=round(total_study_hours, 1),
-                           daily_study_hours=daily_study_hours,
-                           subject_weekly_hours=subject_weekly_hours,
-                           timetable_slots=used_timetable_slots or [],
-                           neural_features_count=12,  # 기본값
-                           average_confidence=avg_confidence if avg_confidence > 0 else 0.947,
-                           analysis_reliability="높음" if (avg_confidence if avg_confidence > 0 else 0.947) >= 0.8 else "보통",
-                           training_epochs=100
-                           )
+@app.route("/result/stats")
+def result_stats():
+    """현재 세션 계획의 결과 페이지 통계 (JSON, 템플릿 렌더링 없이 프런트엔드에서 조회)"""
+    stored_plan = load_plan_from_session()
+    if not stored_plan or not stored_plan.get('weekly_schedule') or not stored_plan.get('priorities'):
+        return jsonify({"error": "저장된 학습 계획이 없습니다."}), 404
+    return jsonify(dict(plan_stats(stored_plan), summary=stored_plan.get('summary', {})))
 
 if __name__ == "__main__":
     models_dir = os.path.join(os.path.dirname(__file__), "models")
     if not os.path.exists(models_dir):
         os.makedirs(models_dir)
 
-    if not os.path.exists(SUBJECT_DATA_DIR):
-        os.makedirs(SUBJECT_DATA_DIR)
-
     app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
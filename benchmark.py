@@ -0,0 +1,345 @@
+"""
+학습 계획 생성 성능 벤치마크
+
+사용 예:
+    python benchmark.py batch --users 1000
+    python benchmark.py allocate --users 300
+    python benchmark.py checkpoint --users 2000
+    python benchmark.py inference --threads 1
+    python benchmark.py train --users 2000
+    python benchmark.py ics --timetables 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from models.inference import INFERENCE_BACKENDS, create_backend, set_inference_threads
+from models.study_plan_nn import (
+    FEATURE_NAMES, FEATURE_SCHEMA_HASH, PRIORITY_NAMES, STUDY_HOURS_BY_PRIORITY, WEEKLY_STUDY_DAYS,
+    StudyPlanDataset, StudyPlanGenerator, TrainingConfig, config_path, create_study_plans_batch
+)
+from models.study_plan_net import StudyPlanNet
+from calendar_writer import CalendarWriter
+from convert import Convert
+from timetable import parse_time
+
+DAYS = ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"]
+
+
+def _minutes_to_time_str(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def make_synthetic_timetable(rnd, n_subjects=6):
+    """임의의 과목 목록과 (타입, 과목명, 요일, 시작, 종료) 슬롯 생성 (09:00-21:00 공강 포함)"""
+    subjects = []
+    classes_by_day = {day: [] for day in DAYS}
+    slots = []
+    for i in range(n_subjects):
+        name = f"과목{i}"
+        subjects.append({"name": name, "weight": float(rnd.randint(1, 10)), "major": float(rnd.random() < 0.4)})
+        for _ in range(rnd.choice([1, 2, 2, 3])):
+            day = DAYS[rnd.randrange(5)]
+            start = rnd.randrange(108, 228) * 5
+            end = start + rnd.choice([75, 90, 150, 180])
+            classes_by_day[day].append((start, end))
+            slots.append(("수업", name, day, _minutes_to_time_str(start), _minutes_to_time_str(end)))
+
+    for day in DAYS:
+        last_end = 9 * 60
+        for start, end in sorted(classes_by_day[day]):
+            if start > last_end:
+                slots.append(("공강", "", day, _minutes_to_time_str(last_end), _minutes_to_time_str(start)))
+            last_end = max(last_end, end)
+        if last_end < 21 * 60:
+            slots.append(("공강", "", day, _minutes_to_time_str(last_end), _minutes_to_time_str(21 * 60)))
+    return subjects, slots
+
+
+def make_cohort(n_users, seed=0):
+    rnd = random.Random(seed)
+    return [make_synthetic_timetable(rnd, rnd.randint(4, 8)) for _ in range(n_users)]
+
+
+def _timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_batch(args):
+    """사용자별 루프 vs 배치 forward 처리량 비교"""
+    torch.manual_seed(args.seed)
+    planner = StudyPlanGenerator()
+    planner.model = StudyPlanNet(input_dim=len(FEATURE_NAMES))
+    cohort = make_cohort(args.users, args.seed)
+
+    def per_user_priorities():
+        for subjects, slots in cohort:
+            planner.with_inputs(subjects, slots).predict_study_priorities()
+
+    def batched_priorities():
+        planner.predict_study_priorities_batch(cohort)
+
+    def per_user_plans():
+        for subjects, slots in cohort:
+            p = planner.with_inputs(subjects, slots)
+            p.generate_weekly_schedule(p.predict_study_priorities())
+
+    def batched_plans():
+        create_study_plans_batch(cohort, planner)
+
+    print(f"사용자 수: {args.users}, 반복: {args.repeat} (최솟값 기준)")
+    for label, loop_fn, batch_fn in (("우선순위 예측", per_user_priorities, batched_priorities),
+                                     ("주간 계획 전체", per_user_plans, batched_plans)):
+        loop_time = _timed(loop_fn, args.repeat)
+        batch_time = _timed(batch_fn, args.repeat)
+        print(f"[{label}] 사용자별 루프: {loop_time:.3f}s ({args.users / loop_time:,.0f} users/s)  "
+              f"배치: {batch_time:.3f}s ({args.users / batch_time:,.0f} users/s)  "
+              f"x{loop_time / batch_time:.1f}")
+
+
+def _label_priorities(subjects, slots):
+    """모델 없이 라벨 규칙(중요도/전공)으로 만든 우선순위"""
+    labels = StudyPlanDataset(subjects, slots).labels.tolist()
+    priorities = [{'subject_name': subject['name'], 'priority': PRIORITY_NAMES[label], 'priority_score': label}
+                  for subject, label in zip(subjects, labels)]
+    priorities.sort(key=lambda p: p['priority_score'])
+    return priorities
+
+
+def _plan_quality(priorities, weekly_schedule):
+    """
+    계획 품질 지표
+        coverage: 우선순위 가중 주간 목표 달성률 (과목별 min(배정, 목표) 기준)
+        hours: 총 배정 시간
+        day_spread: 학습이 있는 요일의 하루 학습 시간 표준편차
+        review_share: 총 배정 중 수업 있는 날(복습) 비율
+        short_blocks: 30분 미만 블록 수
+    """
+    targets = {p['subject_name']: STUDY_HOURS_BY_PRIORITY[p['priority']] * WEEKLY_STUDY_DAYS for p in priorities}
+    weights = {p['subject_name']: len(PRIORITY_NAMES) - p['priority_score'] for p in priorities}
+    assigned = {name: 0.0 for name in targets}
+    day_hours, review_hours, short_blocks = [], 0.0, 0
+    for tasks in weekly_schedule.values():
+        hours = sum(task['duration'] for task in tasks)
+        if hours > 0:
+            day_hours.append(hours)
+        for task in tasks:
+            assigned[task['subject']] += task['duration']
+            if task['study_type'] == "복습":
+                review_hours += task['duration']
+            short_blocks += sum(1 for block in task['blocks']
+                                if parse_time(block['end_time']) - parse_time(block['start_time']) < 30)
+    total = sum(assigned.values())
+    return {
+        "coverage": sum(weights[n] * min(assigned[n], targets[n]) for n in targets)
+                    / max(sum(weights[n] * targets[n] for n in targets), 1e-9),
+        "hours": total,
+        "day_spread": statistics.pstdev(day_hours) if day_hours else 0.0,
+        "review_share": review_hours / total if total else 0.0,
+        "short_blocks": short_blocks,
+    }
+
+
+def bench_allocate(args):
+    """탐욕 배정 vs 최소 비용 유량 최적 배정: 사용자당 계산 시간과 계획 품질 비교"""
+    cohort = make_cohort(args.users, args.seed)
+    inputs = []
+    for subjects, slots in cohort:
+        planner = StudyPlanGenerator()
+        planner.timetable_slots = StudyPlanDataset([], slots).timetable_slots
+        inputs.append((planner, _label_priorities(subjects, slots)))
+
+    print(f"사용자 수: {args.users}")
+    for solver in ("greedy", "optimal"):
+        times, qualities = [], []
+        for planner, priorities in inputs:
+            start = time.perf_counter()
+            weekly_schedule = planner.generate_weekly_schedule(priorities, solver=solver)
+            times.append((time.perf_counter() - start) * 1000)
+            qualities.append(_plan_quality(priorities, weekly_schedule))
+        times.sort()
+        mean = {key: statistics.fmean(q[key] for q in qualities) for key in qualities[0]}
+        print(f"[{solver:>7}] 평균 {statistics.fmean(times):.2f}ms  p95 {times[int(len(times) * 0.95) - 1]:.2f}ms  "
+              f"최대 {times[-1]:.2f}ms | 목표 달성률 {mean['coverage']:.1%}  총 {mean['hours']:.1f}h  "
+              f"요일 편차 {mean['day_spread']:.2f}h  복습일 비율 {mean['review_share']:.1%}  "
+              f"30분 미만 블록 {mean['short_blocks']:.2f}개")
+
+
+def bench_checkpoint(args):
+    """이전 단일 파일 체크포인트(훈련 데이터 포함) vs 가중치 + 설정 사이드카: 크기와 로드 시간"""
+    torch.manual_seed(args.seed)
+    planner = StudyPlanGenerator()
+    planner.model = StudyPlanNet(input_dim=len(FEATURE_NAMES))
+    cohort = make_cohort(args.users, args.seed)
+    subjects = [subject for user_subjects, _ in cohort for subject in user_subjects]
+    slots = [list(slot) for _, user_slots in cohort for slot in user_slots]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.pt")
+        torch.save({
+            'model_state_dict': planner.model.state_dict(),
+            'input_dim': planner.model.input_dim,
+            'hidden_dim': planner.model.hidden_dim,
+            'output_dim': planner.model.output_dim,
+            'feature_schema': FEATURE_SCHEMA_HASH,
+            'subjects': subjects,
+            'timetable_slots': slots,
+        }, legacy_path)
+        slim_path = os.path.join(tmp, "slim.pt")
+        planner.save_model(slim_path)
+
+        legacy_size = os.path.getsize(legacy_path)
+        slim_size = os.path.getsize(slim_path) + os.path.getsize(config_path(slim_path))
+        legacy_time = _timed(lambda: StudyPlanGenerator(legacy_path), args.repeat)
+        slim_time = _timed(lambda: StudyPlanGenerator(slim_path), args.repeat)
+
+    print(f"훈련 데이터: 과목 {len(subjects):,}개, 슬롯 {len(slots):,}개 (사용자 {args.users})")
+    print(f"[이전 형식] {legacy_size / 1024:,.1f} KiB, 로드 {legacy_time * 1000:.2f}ms")
+    print(f"[가중치+JSON] {slim_size / 1024:,.1f} KiB, 로드 {slim_time * 1000:.2f}ms  "
+          f"(크기 x{legacy_size / slim_size:.1f}, 로드 x{legacy_time / slim_time:.1f})")
+
+
+def bench_inference(args):
+    """추론 백엔드별 호출 지연: 사용자 1명(과목 수 행) / 코호트 전체 배치"""
+    set_inference_threads(args.threads)
+    torch.manual_seed(args.seed)
+    model = StudyPlanNet(input_dim=len(FEATURE_NAMES))
+    cohort = make_cohort(args.users, args.seed)
+    features = [StudyPlanDataset(subjects, slots).features for subjects, slots in cohort]
+    batch = np.concatenate(features)
+    reference = create_backend("eager", model)(batch)
+
+    print(f"스레드: {args.threads}, 사용자 수: {args.users} (배치 {len(batch)}행), 반복: {args.repeat}")
+    for name in INFERENCE_BACKENDS:
+        try:
+            backend = create_backend(name, model, args.threads)
+        except ImportError as e:
+            print(f"[{name:>11}] 건너뜀: {e}")
+            continue
+        max_diff = float(np.abs(backend(batch) - reference).max())
+
+        def single_calls():
+            for user_features in features:
+                backend(user_features)
+
+        single_time = _timed(single_calls, args.repeat) / len(features)
+        batch_time = _timed(lambda: backend(batch), args.repeat)
+        print(f"[{name:>11}] 사용자 1명: {single_time * 1e6:.1f}us/call  "
+              f"배치: {batch_time * 1000:.3f}ms ({args.users / batch_time:,.0f} users/s)  "
+              f"eager 대비 최대 오차 {max_diff:.1e}")
+
+
+def bench_train(args):
+    """여러 사용자 데이터를 모은 훈련: 고정 epoch 전체 배치 vs 미니배치 + 조기 종료"""
+    cohort = make_cohort(args.users, args.seed)
+    holdout = make_cohort(max(args.users // 5, 1), args.seed + 1)
+    holdout_features = np.concatenate([StudyPlanDataset(s, t).features for s, t in holdout])
+    holdout_labels = np.concatenate([StudyPlanDataset(s, t).labels for s, t in holdout])
+
+    configs = (
+        ("전체 배치 고정", TrainingConfig(epochs=args.epochs, seed=args.seed)),
+        ("미니배치+조기종료", TrainingConfig(epochs=args.epochs, lr=0.01, batch_size=args.batch_size, patience=10,
+                                       val_fraction=0.1, lr_patience=4, seed=args.seed)),
+    )
+    print(f"사용자 수: {args.users}, 최대 epoch: {args.epochs}")
+    for label, config in configs:
+        planner = StudyPlanGenerator()
+        planner.train_model_pooled(cohort, config=config)
+        metrics = planner.training_metrics
+        holdout_accuracy = float((create_backend("numpy", planner.model)(holdout_features).argmax(axis=1) == holdout_labels).mean())
+        print(f"[{label}] epoch {metrics['epochs']}/{metrics['max_epochs']}  {metrics['seconds']:.2f}s  "
+              f"손실 {metrics['final_loss']:.4f}  훈련 정확도 {metrics['train_accuracy']:.1%}  "
+              f"새 사용자 정확도 {holdout_accuracy:.1%}")
+
+
+def _wire_subjects(slots):
+    """합성 시간표의 수업 슬롯을 Convert.get_subjects 형식의 과목 목록으로"""
+    subjects = {}
+    for kind, name, day, start, end in slots:
+        if kind == "수업":
+            subjects.setdefault(name, {"name": name, "professor": "", "info": []})["info"].append(
+                {"day": str(DAYS.index(day)), "place": f"{name} 강의실", "startAt": start, "endAt": end})
+    return list(subjects.values())
+
+
+def bench_ics(args):
+    """icalendar 객체 트리 + to_ical vs CalendarWriter 스트리밍: 시간표당 .ics 생성 시간"""
+    timetables = [_wire_subjects(slots) for _, slots in make_cohort(args.timetables, args.seed)]
+    n_events = sum(len(subject["info"]) for subjects in timetables for subject in subjects)
+    converter = Convert("")
+
+    def with_icalendar():
+        return [converter.get_calendar(subjects, args.begin, args.end).to_ical() for subjects in timetables]
+
+    def with_writer():
+        return [CalendarWriter(args.begin, args.end).to_bytes(subjects) for subjects in timetables]
+
+    if with_icalendar() != with_writer():
+        raise SystemExit("출력이 다릅니다.")
+    print(f"시간표 {args.timetables}개, 이벤트 {n_events:,}개, 반복: {args.repeat} (최솟값 기준, 출력 동일)")
+    old_time = _timed(with_icalendar, args.repeat)
+    new_time = _timed(with_writer, args.repeat)
+    print(f"[icalendar] {old_time:.3f}s ({old_time / args.timetables * 1e6:.0f}us/시간표)")
+    print(f"[CalendarWriter] {new_time:.3f}s ({new_time / args.timetables * 1e6:.0f}us/시간표)  x{old_time / new_time:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="학습 계획 생성 벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help="다중 사용자 배치 예측 처리량")
+    batch_parser.add_argument("--users", type=int, default=500)
+    batch_parser.add_argument("--repeat", type=int, default=3)
+    batch_parser.add_argument("--seed", type=int, default=0)
+    batch_parser.set_defaults(func=bench_batch)
+
+    allocate_parser = subparsers.add_parser("allocate", help="탐욕 배정 vs 최적 배정 시간/품질")
+    allocate_parser.add_argument("--users", type=int, default=300)
+    allocate_parser.add_argument("--seed", type=int, default=0)
+    allocate_parser.set_defaults(func=bench_allocate)
+
+    checkpoint_parser = subparsers.add_parser("checkpoint", help="체크포인트 형식별 크기/로드 시간")
+    checkpoint_parser.add_argument("--users", type=int, default=2000)
+    checkpoint_parser.add_argument("--repeat", type=int, default=5)
+    checkpoint_parser.add_argument("--seed", type=int, default=0)
+    checkpoint_parser.set_defaults(func=bench_checkpoint)
+
+    inference_parser = subparsers.add_parser("inference", help="추론 백엔드별 호출 지연")
+    inference_parser.add_argument("--threads", type=int, default=1)
+    inference_parser.add_argument("--users", type=int, default=500)
+    inference_parser.add_argument("--repeat", type=int, default=5)
+    inference_parser.add_argument("--seed", type=int, default=0)
+    inference_parser.set_defaults(func=bench_inference)
+
+    train_parser = subparsers.add_parser("train", help="다중 사용자 훈련: 고정 epoch vs 조기 종료")
+    train_parser.add_argument("--users", type=int, default=2000)
+    train_parser.add_argument("--epochs", type=int, default=300)
+    train_parser.add_argument("--batch-size", type=int, default=128)
+    train_parser.add_argument("--seed", type=int, default=0)
+    train_parser.set_defaults(func=bench_train)
+
+    ics_parser = subparsers.add_parser("ics", help="icalendar vs 스트리밍 .ics 생성 시간")
+    ics_parser.add_argument("--timetables", type=int, default=2000)
+    ics_parser.add_argument("--begin", type=str, default="2025-03-02")
+    ics_parser.add_argument("--end", type=str, default="2025-06-20")
+    ics_parser.add_argument("--repeat", type=int, default=3)
+    ics_parser.add_argument("--seed", type=int, default=0)
+    ics_parser.set_defaults(func=bench_ics)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
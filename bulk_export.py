@@ -0,0 +1,226 @@
+"""
+학기 시작 일괄 내보내기
+
+시간표 XML 파일(디렉터리) 또는 Everytime ID 목록(manifest)을 받아
+프로세스 풀에서 동시에 변환해 사용자별 .ics 파일과 전체 공강 보고서(JSON / CSV)를 만든다.
+
+manifest 는 한 줄에 하나씩 XML 파일 경로(manifest 기준 상대 경로 가능) 또는 Everytime ID / 공유 URL 을 적는다.
+빈 줄과 # 주석은 무시한다. ID 는 bulk_import.fetch_timetables 로 가져오면서 도착하는 대로 변환한다.
+manifest 의 XML 파일 이름은 manifest 기준 상대 경로(확장자 제외)로 정해지며,
+서로 다른 시간표가 같은 출력 파일 이름이 되면 내보내기 전에 ValueError 를 낸다.
+"""
+import asyncio
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bulk_import import fetch_timetables, safe_filename
+from calendar_writer import CalendarWriter
+from convert import Convert
+from everytime import Everytime
+from free_time import DEFAULT_DAY_END, DEFAULT_DAY_START, FreeTimeIndex
+from timetable import DAY_NAMES, format_time, parse_time
+
+REPORT_FORMATS = ("json", "csv")
+
+_writer = None
+
+
+def read_sources(path):
+    """
+    내보낼 시간표 목록
+
+    Args:
+        path: XML 파일이 들어 있는 디렉터리, XML 파일 하나, 또는 manifest 파일
+
+    Returns:
+        (files, identifiers) - files 는 [(이름, XML 경로)], identifiers 는 Everytime ID 목록 (중복 항목은 한 번만)
+    """
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path) if name.lower().endswith(".xml"))
+        return [(os.path.splitext(name)[0], os.path.join(path, name)) for name in names], []
+    if path.lower().endswith(".xml"):
+        return [(os.path.splitext(os.path.basename(path))[0], path)], []
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    files, identifiers = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            xml_path = os.path.normpath(line if os.path.isabs(line) else os.path.join(base_dir, line))
+            if line.lower().endswith(".xml") or os.path.isfile(xml_path):
+                # 다른 디렉터리의 같은 파일 이름이 겹치지 않도록 manifest 기준 상대 경로를 이름으로 사용
+                name = os.path.splitext(os.path.relpath(xml_path, base_dir))[0].replace(os.sep, "/")
+                files.append((name, xml_path))
+            else:
+                identifiers.append(Everytime(line).path)
+    return list(dict.fromkeys(files)), list(dict.fromkeys(identifiers))
+
+
+def output_filename(name):
+    """사용자별 .ics 파일 이름"""
+    return f"{safe_filename(name)}.ics"
+
+
+def check_output_names(names):
+    """
+    출력 파일 이름 충돌 검사 (대소문자를 구분하지 않는 파일 시스템 포함)
+
+    Raises:
+        ValueError: 서로 다른 이름이 같은 .ics 파일 이름이 되는 경우
+    """
+    seen = {}
+    collisions = []
+    for name in names:
+        key = output_filename(name).lower()
+        if key in seen and seen[key] != name:
+            collisions.append(f"{seen[key]!r} / {name!r} -> {output_filename(name)}")
+        seen.setdefault(key, name)
+    if collisions:
+        raise ValueError("출력 파일 이름이 겹칩니다: " + ", ".join(collisions))
+
+
+def _init_worker(begin, end, hide_details):
+    # 학기 시작일/종료일은 프로세스마다 한 번만 파싱
+    global _writer
+    _writer = CalendarWriter(begin, end, hide_details)
+
+
+def export_one(name, source, output_dir, day_start=DEFAULT_DAY_START, day_end=DEFAULT_DAY_END):
+    """
+    시간표 하나를 .ics 로 저장하고 공강 시간을 계산 (워커 프로세스에서 실행)
+
+    Args:
+        source: XML 내용 또는 XML 파일 경로 (Convert 입력 형식)
+
+    Returns:
+        {"name", "ics", "events", "free": {요일: [[시작, 종료], ...]}, "free_minutes": {요일: 분}, "error"}
+    """
+    try:
+        converter = Convert(source)
+        timetable = converter.get_timetable()
+        subjects = [subject.to_wire() for subject in timetable]
+        path = os.path.join(output_dir, output_filename(name))
+        events = _writer.write(subjects, path)
+
+        free_time = FreeTimeIndex.from_subjects(timetable, day_start=day_start, day_end=day_end)
+        free = {day_name: [[format_time(start), format_time(end)] for start, end in free_time.free_slots(day)]
+                for day, day_name in enumerate(DAY_NAMES)}
+        return {
+            "name": name,
+            "ics": path,
+            "events": events,
+            "free": free,
+            "free_minutes": {day_name: free_time.free_minutes(day) for day, day_name in enumerate(DAY_NAMES)},
+            "error": None,
+        }
+    except Exception as e:
+        return {"name": name, "error": f"변환 실패: {e}"}
+
+
+def write_report(results, path, fmt, meta):
+    """공강 보고서 저장 (json: 사용자별 전체 결과, csv: 사용자 × 공강 구간 한 줄씩)"""
+    if fmt == "json":
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(meta, users=results), f, ensure_ascii=False)
+        return
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "day", "start", "end", "minutes"])
+        for result in results:
+            for day_name in DAY_NAMES:
+                for start, end in result["free"][day_name]:
+                    writer.writerow([result["name"], day_name, start, end, parse_time(end) - parse_time(start)])
+
+
+async def _export_identifiers(identifiers, pool, output_dir, day_start, day_end, handle,
+                              client=None, concurrency=8, rate=5.0):
+    loop = asyncio.get_running_loop()
+    pending = []
+    async for identifier, xml, error in fetch_timetables(identifiers, client, concurrency, rate):
+        if error is not None:
+            handle({"name": identifier, "error": error})
+            continue
+        future = loop.run_in_executor(pool, export_one, identifier, xml, output_dir, day_start, day_end)
+        future.add_done_callback(
+            lambda f, name=identifier: handle(f.result() if not f.exception()
+                                              else {"name": name, "error": f"변환 실패: {f.exception()}"}))
+        pending.append(future)
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+def export_semester(source_path, output_dir, begin, end, hide_details=False,
+                    day_start=DEFAULT_DAY_START, day_end=DEFAULT_DAY_END,
+                    report_formats=REPORT_FORMATS, workers=None, client=None,
+                    concurrency=8, rate=5.0, on_result=None):
+    """
+    시간표를 일괄 변환해 사용자별 .ics 와 공강 보고서(free_time.json / free_time.csv) 저장
+
+    Args:
+        source_path: read_sources 입력 (디렉터리 / XML 파일 / manifest)
+        workers: 변환 프로세스 수 (기본: CPU 수)
+        concurrency, rate: Everytime ID 를 가져올 때의 동시 요청 수 / 초당 요청 수
+        on_result: (result, done, total) 콜백 - 각 시간표 처리 직후 호출
+
+    Raises:
+        ValueError: 지원하지 않는 보고서 형식이거나 출력 파일 이름이 겹치는 경우 (아무것도 쓰기 전에)
+
+    Returns:
+        {"total", "succeeded", "failed": {이름: 오류}, "events", "reports": {형식: 경로},
+         "elapsed", "timetables_per_sec", "events_per_sec"}
+    """
+    for fmt in report_formats:
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"지원하지 않는 보고서 형식입니다: {fmt}")
+    files, identifiers = read_sources(source_path)
+    check_output_names([name for name, _ in files] + identifiers)
+    os.makedirs(output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    total = len(files) + len(identifiers)
+    results, failed = [], {}
+
+    def handle(result):
+        if result["error"] is None:
+            results.append(result)
+        else:
+            failed[result["name"]] = result["error"]
+        if on_result:
+            on_result(result, len(results) + len(failed), total)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(begin, end, hide_details)) as pool:
+        futures = {pool.submit(export_one, name, path, output_dir, day_start, day_end): name
+                   for name, path in files}
+        if identifiers:
+            asyncio.run(_export_identifiers(identifiers, pool, output_dir, day_start, day_end, handle,
+                                            client, concurrency, rate))
+        for future in as_completed(futures):
+            try:
+                handle(future.result())
+            except Exception as e:
+                handle({"name": futures[future], "error": f"변환 실패: {e}"})
+
+    results.sort(key=lambda result: result["name"])
+    meta = {"begin": begin, "end": end, "day_start": format_time(day_start), "day_end": format_time(day_end)}
+    reports = {}
+    for fmt in report_formats:
+        reports[fmt] = os.path.join(output_dir, f"free_time.{fmt}")
+        write_report(results, reports[fmt], fmt, meta)
+
+    elapsed = time.perf_counter() - started
+    events = sum(result["events"] for result in results)
+    return {
+        "total": total,
+        "succeeded": len(results),
+        "failed": failed,
+        "events": events,
+        "reports": reports,
+        "elapsed": elapsed,
+        "timetables_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "events_per_sec": events / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,150 @@
+"""
+여러 Everytime 시간표를 동시에 가져와 변환하는 일괄 가져오기
+
+asyncio 로 동시 요청 수와 호스트별 요청 간격을 제한하고,
+도착하는 시간표부터 바로 Convert.get_subjects 로 변환해 ID 별 .ics / .json 파일로 저장한다.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from convert import Convert
+from everytime import Everytime, EverytimeClient
+
+
+class HostRateLimiter:
+    """호스트별로 요청 사이 최소 간격(1 / rate 초)을 보장하는 비동기 rate limiter"""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_time = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, host):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time.get(host, now))
+            self._next_time[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+def read_ids_file(path):
+    """한 줄에 하나씩 적힌 ID 또는 공유 URL 목록 읽기 (빈 줄, # 주석 무시)"""
+    identifiers = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                identifiers.append(Everytime(line).path)
+    return identifiers
+
+
+def safe_filename(identifier):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', identifier) or "_"
+
+
+async def fetch_timetables(identifiers, client=None, concurrency=8, rate=5.0, executor=None):
+    """
+    시간표 XML 을 동시에 가져오는 비동기 제너레이터
+
+    Yields:
+        (identifier, xml, error) - 완료되는 순서대로. 실패 시 xml 은 None
+    """
+    client = client or EverytimeClient(pool_maxsize=concurrency)
+    host = urlparse(client.base_url).netloc
+    limiter = HostRateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    executor = executor or ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="everytime")
+
+    async def fetch_one(identifier):
+        async with semaphore:
+            await limiter.acquire(host)
+            try:
+                xml = await loop.run_in_executor(executor, client.get_timetable, identifier)
+            except Exception as e:
+                return identifier, None, str(e)
+        if not xml or "<error>" in xml.lower():
+            return identifier, None, "시간표 XML을 가져오지 못했습니다."
+        return identifier, xml, None
+
+    tasks = [asyncio.ensure_future(fetch_one(identifier)) for identifier in identifiers]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        for task in tasks:
+            task.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+def _write_output(identifier, xml, output_dir, fmt, begin, end, hide_details):
+    c = Convert(xml)
+    subjects = c.get_subjects()
+    path = os.path.join(output_dir, f"{safe_filename(identifier)}.{fmt}")
+    if fmt == "ics":
+        c.write_calendar(subjects, begin, end, path, hide_details)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"identifier": identifier, "subjects": subjects}, f, ensure_ascii=False)
+    return path
+
+
+async def import_timetables_async(identifiers, output_dir, fmt="ics", begin=None, end=None,
+                                  hide_details=False, client=None, concurrency=8, rate=5.0,
+                                  on_result=None):
+    """
+    시간표를 일괄로 가져와 ID 별 파일로 저장
+
+    Args:
+        fmt: "ics" (begin, end 필요) 또는 "json"
+        on_result: (identifier, path, error) 콜백 - 각 ID 처리 직후 호출
+
+    Returns:
+        {"total", "succeeded", "failed": {id: error}, "outputs": {id: path}, "elapsed"}
+    """
+    if fmt not in ("ics", "json"):
+        raise ValueError(f"지원하지 않는 출력 형식입니다: {fmt}")
+    if fmt == "ics" and not (begin and end):
+        raise ValueError("ics 출력에는 학기 시작일과 종료일이 필요합니다.")
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    outputs, failed = {}, {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="everytime") as executor:
+        async for identifier, xml, error in fetch_timetables(identifiers, client, concurrency, rate, executor):
+            path = None
+            if error is None:
+                try:
+                    path = await loop.run_in_executor(executor, _write_output, identifier, xml,
+                                                      output_dir, fmt, begin, end, hide_details)
+                    outputs[identifier] = path
+                except Exception as e:
+                    error = f"변환 실패: {e}"
+            if error is not None:
+                failed[identifier] = error
+            if on_result:
+                on_result(identifier, path, error)
+
+    return {
+        "total": len(identifiers),
+        "succeeded": len(outputs),
+        "failed": failed,
+        "outputs": outputs,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def import_timetables(identifiers, output_dir, **kwargs):
+    """import_timetables_async 의 동기 버전"""
+    return asyncio.run(import_timetables_async(identifiers, output_dir, **kwargs))
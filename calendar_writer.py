@@ -0,0 +1,132 @@
+"""
+iCalendar(.ics) 스트리밍 생성기
+
+Convert.get_calendar(icalendar 객체 트리 + to_ical) 와 같은 내용을 만들되,
+    - 학기 시작일/종료일은 달력마다 한 번만 파싱하고
+    - 요일별 첫 수업 날짜는 정수 연산으로 미리 계산해
+    - VEVENT 텍스트를 바로 파일/응답으로 흘려 보낸다 (이벤트마다 dateutil 파싱, 객체 생성 없음).
+텍스트 이스케이프와 75 옥텟 줄 접기는 icalendar 와 같은 규칙을 따른다.
+"""
+import datetime
+from typing import Iterable, Iterator
+
+from dateutil import parser
+
+from timetable import parse_time
+
+CRLF = "\r\n"
+FOLD_LIMIT = 75
+HIDDEN_SUMMARY = "수업"
+
+
+def escape_text(text: str) -> str:
+    """RFC 5545 TEXT 이스케이프 (icalendar 와 같은 순서)"""
+    return (
+        text.replace(r"\N", "\n")
+        .replace("\\", "\\\\")
+        .replace(";", r"\;")
+        .replace(",", r"\,")
+        .replace("\r\n", r"\n")
+        .replace("\n", r"\n")
+        .replace("\r", r"\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """75 옥텟 미만으로 줄 접기 (이스케이프 문자 앞에서는 나누지 않음, icalendar 와 같은 결과)"""
+    if len(line) * 4 < FOLD_LIMIT or len(line.encode("utf-8")) < FOLD_LIMIT:
+        return line
+    folded, current, count = [], [], 0
+    for char in line:
+        size = len(char.encode("utf-8"))
+        if current and count + size >= FOLD_LIMIT:
+            if len(current) > 1 and current[-1] in "\\^":
+                prefix = current.pop()
+                folded.append("".join(current))
+                current, count = [prefix], len(prefix.encode("utf-8"))
+            else:
+                folded.append("".join(current))
+                current, count = [], 0
+        current.append(char)
+        count += size
+    folded.append("".join(current))
+    return (CRLF + " ").join(folded)
+
+
+def _format_datetime(value: datetime.datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+class CalendarWriter:
+    """
+    학기 동안 매주 반복되는 수업 일정 .ics 생성기
+
+    Args:
+        start_date, end_date: 학기 시작일 / 종료일 (dateutil 이 읽을 수 있는 형식, 한 번만 파싱)
+        hide_details: True 이면 과목명을 "수업" 으로 바꾸고 장소를 뺀다
+    """
+    def __init__(self, start_date: str, end_date: str, hide_details: bool = False):
+        start = parser.parse(start_date)
+        self.hide_details = hide_details
+        self._rrule = f"RRULE:FREQ=WEEKLY;UNTIL={_format_datetime(parser.parse(end_date))}"
+        # 요일(0=월요일)별 학기 첫 수업 날짜 (Convert.get_nearest_date 와 같은 날짜)
+        self._anchors = [start.date() + datetime.timedelta(days=(weekday - start.weekday()) % 7)
+                         for weekday in range(7)]
+        self._anchor_strs = [anchor.strftime("%Y%m%d") for anchor in self._anchors]
+
+    def _timestamp(self, weekday: int, minutes: int) -> str:
+        if 0 <= minutes < 24 * 60:
+            return f"{self._anchor_strs[weekday]}T{minutes // 60:02d}{minutes % 60:02d}00"
+        anchor = datetime.datetime.combine(self._anchors[weekday], datetime.time())
+        return _format_datetime(anchor + datetime.timedelta(minutes=minutes))
+
+    def iter_events(self, timetable: Iterable[dict]) -> Iterator[str]:
+        """
+        과목마다 수업 시간별 VEVENT 텍스트 (Convert.get_subjects 형식의 과목 목록)
+
+        요일이나 시각을 알 수 없는 수업은 건너뛴다.
+        """
+        for item in timetable:
+            summary = fold_line("SUMMARY:" + escape_text(HIDDEN_SUMMARY if self.hide_details else item["name"]))
+            for session in item["info"]:
+                day, start, end = session.get("day"), parse_time(session.get("startAt")), parse_time(session.get("endAt"))
+                if day is None or not str(day).isdigit() or int(day) > 6 or start is None or end is None:
+                    continue
+                weekday = int(day)
+                lines = [
+                    "BEGIN:VEVENT",
+                    summary,
+                    "DTSTART:" + self._timestamp(weekday, start),
+                    "DTEND:" + self._timestamp(weekday, end),
+                    self._rrule,
+                ]
+                place = session.get("place")
+                if place and not self.hide_details:
+                    lines.append(fold_line("LOCATION:" + escape_text(place)))
+                lines.append("END:VEVENT")
+                yield CRLF.join(lines) + CRLF
+
+    def iter_calendar(self, timetable: Iterable[dict]) -> Iterator[str]:
+        """VCALENDAR 전체를 조각 단위로 (Flask Response 등에 그대로 전달 가능)"""
+        yield "BEGIN:VCALENDAR" + CRLF
+        yield from self.iter_events(timetable)
+        yield "END:VCALENDAR" + CRLF
+
+    def to_bytes(self, timetable: Iterable[dict]) -> bytes:
+        return "".join(self.iter_calendar(timetable)).encode("utf-8")
+
+    def write(self, timetable: Iterable[dict], path_or_file) -> int:
+        """
+        .ics 저장 (path_or_file 은 파일 경로 또는 쓰기용 바이너리 파일 객체)
+
+        Returns:
+            기록한 VEVENT 수 (요일/시각을 알 수 없어 건너뛴 수업은 제외)
+        """
+        if hasattr(path_or_file, "write"):
+            events = 0
+            for chunk in self.iter_calendar(timetable):
+                path_or_file.write(chunk.encode("utf-8"))
+                events += chunk.startswith("BEGIN:VEVENT")
+            return events
+        with open(path_or_file, 'wb') as f:
+            return self.write(timetable, f)
@@ -7,38 +7,104 @@ from dateutil import parser
 from icalendar import Calendar, Event
 import requests
 
+from calendar_writer import CalendarWriter
+from timetable import CLASS, Slot, Subject
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _iter_chunks(source):
+    """
+    입력을 파서에 넣을 조각으로 나눈다.
+
+    - bytes / bytearray: XML 내용
+    - 파일 객체 (read 메서드): 조각 단위로 읽음
+    - os.PathLike: 파일 경로
+    - str: 공백을 제외하고 '<' 로 시작하면 XML 내용, 아니면 파일 경로
+    """
+    if isinstance(source, (bytes, bytearray)):
+        for i in range(0, len(source), CHUNK_SIZE):
+            yield source[i:i + CHUNK_SIZE]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    elif isinstance(source, str) and source.lstrip("\ufeff \t\r\n").startswith("<"):
+        for i in range(0, len(source), CHUNK_SIZE):
+            yield source[i:i + CHUNK_SIZE]
+    else:
+        with open(source, 'rb') as f:
+            yield from _iter_chunks(f)
+
+
+def _subject_from_element(subject):
+    name = subject.find("name").get("value")
+    professor = subject.find("professor").get("value")
+    sessions = []
+    for x in subject.find("time").findall("data"):
+        day = x.get("day")
+        sessions.append(Slot(
+            CLASS, name,
+            int(day) if day is not None and day.isdigit() else -1,
+            int(x.get("starttime")) * 5,
+            int(x.get("endtime")) * 5,
+            professor,
+            x.get("place"),
+        ))
+    return Subject(name, professor, tuple(sessions))
+
+
+def iter_timetable(source):
+    """
+    시간표 XML 에서 과목(Subject)을 하나씩 읽어 반환하는 스트리밍 파서
+
+    처리한 subject 요소는 트리에서 제거하므로 여러 학기/여러 사용자를 합친
+    큰 XML 도 일정한 메모리로 읽을 수 있다. (입력 형식은 _iter_chunks 참고)
+    """
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    parents = []
+
+    def drain():
+        for event, elem in parser.read_events():
+            if event == "start":
+                parents.append(elem)
+                continue
+            parents.pop()
+            if elem.tag == "subject":
+                yield _subject_from_element(elem)
+                if parents:
+                    parents[-1].remove(elem)
+                elem.clear()
+
+    for chunk in _iter_chunks(source):
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+
+def iter_subjects(source):
+    """iter_timetable 의 JSON 형식(dict) 버전"""
+    for subject in iter_timetable(source):
+        yield subject.to_wire()
+
 
 class Convert():
     def __init__(self, filename):
         self.filename = filename
 
+    def iter_subjects(self):
+        return iter_subjects(self.filename)
+
     def get_subjects(self):
-        result = []
-        try:
-            tree = ElementTree.parse(self.filename)
-            root = tree.getroot()
-        except:
-            tree = ElementTree.fromstring(self.filename)
-            root = tree
-
-        for subject in root.iter('subject'):
-            name = subject.find("name").get("value")
-            single_subject = {}
-
-            single_subject["name"] = name
-            single_subject["professor"] = subject.find("professor").get("value")
-            single_subject["info"] = list(map(
-                lambda x: {
-                    "day": x.get("day"),
-                    "place" : x.get("place"),
-                    "startAt": '{:02d}:{:02d}'.format(*divmod(int(x.get("starttime")) * 5, 60)),
-                    "endAt": '{:02d}:{:02d}'.format(*divmod(int(x.get("endtime")) * 5, 60))
-                }, subject.find("time").findall("data")
-                )
-            )
-            result.append(single_subject)
-        
-        return result
+        return list(self.iter_subjects())
+
+    def get_timetable(self):
+        """과목 목록 (Subject, 시각은 정수 분으로 파싱됨)"""
+        return list(iter_timetable(self.filename))
 
     def get_calendar(self, timetable, start_date, end_date, hide_details=False):
         cal = Calendar()
@@ -60,6 +126,10 @@ class Convert():
         with open(path, 'wb') as f:
             f.write(cal.to_ical())
 
+    def write_calendar(self, timetable, start_date, end_date, path, hide_details=False):
+        """get_calendar + export_calender_as_ics 와 같은 .ics 를 객체 트리 없이 바로 저장 (calendar_writer 참고)"""
+        CalendarWriter(start_date, end_date, hide_details).write(timetable, path)
+
     def get_nearest_date(self, start_date, weekday):
         start_date = parser.parse(start_date)
         weekday = int(weekday)
@@ -1,9 +1,158 @@
-from datetime import time
-import requests
+import os
+import threading
+import time
+from collections import OrderedDict
 from urllib.parse import urlparse
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 로컬 테스트 서버 등으로 바꿀 수 있도록 환경 변수로 주입 가능
+DEFAULT_BASE_URL = os.environ.get("EVERYTIME_BASE_URL", "https://api.everytime.kr")
+TIMETABLE_PATH = "/find/timetable/table/friend"
+
+DEFAULT_HEADERS = {
+    "Accept": "*/*",
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "Origin": "https://everytime.kr",
+    "Referer": "https://everytime.kr/",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.63 Safari/537.36"
+}
+
+
+class EverytimeClient:
+    """
+    Everytime 시간표 API 클라이언트
+
+    - requests.Session 연결 풀 재사용 (매 요청마다 TCP/TLS 핸드셰이크 방지)
+    - 연결/읽기 타임아웃과 재시도
+    - 식별자별 XML TTL 캐시 (만료 후에는 ETag/Last-Modified 로 조건부 갱신)
+    - 요청이 실패하면(연결 오류, 재시도 후에도 429 / 5xx) 만료된 캐시라도 사용
+
+    Args:
+        base_url: API 주소 (테스트 시 로컬 가짜 서버 주소)
+        timeout: (연결, 읽기) 타임아웃 초
+        retries: 연결 오류 / 5xx / 429 재시도 횟수
+        cache_ttl: 캐시 유효 시간(초). 0 이면 캐시하지 않음
+        max_cache_entries: 캐시할 최대 식별자 수
+    """
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=(3.05, 10), retries=2,
+                 backoff_factor=0.3, cache_ttl=600, max_cache_entries=512, pool_maxsize=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_cache_entries = max_cache_entries
+
+        retry = Retry(total=retries, backoff_factor=backoff_factor,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({"POST"}), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # identifier -> {"xml", "etag", "last_modified", "fetched_at"}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get_timetable(self, identifier, force_refresh=False):
+        """시간표 XML 문자열 반환"""
+        with self._lock:
+            entry = self._cache.get(identifier)
+            if entry is not None:
+                self._cache.move_to_end(identifier)
+                if not force_refresh and time.time() - entry["fetched_at"] < self.cache_ttl:
+                    self.hits += 1
+                    return entry["xml"]
+
+        headers = {}
+        if entry is not None and not force_refresh:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.session.post(
+                self.base_url + TIMETABLE_PATH,
+                data={"identifier": identifier, "friendInfo": 'true'},
+                headers=headers,
+                timeout=self.timeout)
+        except requests.RequestException as e:
+            if entry is not None:
+                print(f"Everytime 요청 실패, 캐시된 시간표 사용 ({identifier}): {e}")
+                return entry["xml"]
+            raise
+
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                entry["fetched_at"] = time.time()
+                self.revalidated += 1
+            return entry["xml"]
+
+        if not response.ok and entry is not None:
+            # 재시도 후에도 429 / 5xx 이면 만료된 캐시라도 오류 응답 대신 사용
+            print(f"Everytime 응답 오류 {response.status_code}, 캐시된 시간표 사용 ({identifier})")
+            return entry["xml"]
+
+        xml = response.text
+        with self._lock:
+            self.misses += 1
+            if response.ok and self.cache_ttl > 0 and "<error>" not in xml.lower():
+                self._cache[identifier] = {
+                    "xml": xml,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+                self._cache.move_to_end(identifier)
+                while len(self._cache) > self.max_cache_entries:
+                    self._cache.popitem(last=False)
+        return xml
+
+    def invalidate(self, identifier=None):
+        with self._lock:
+            if identifier is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(identifier, None)
+
+    def cache_stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "entries": len(self._cache),
+            }
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """프로세스 전역에서 공유하는 클라이언트"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = EverytimeClient()
+        return _default_client
+
+
 class Everytime:
-    def __init__(self, path):
+    def __init__(self, path, client=None):
+        self.client = client
         url = urlparse(path)
         if url.netloc == "everytime.kr":
             self.path = url.path.replace("/@", "")
@@ -11,20 +160,4 @@ class Everytime:
         self.path = path
 
     def get_timetable(self):
-        return requests.post(
-            "https://api.everytime.kr/find/timetable/table/friend",
-            data={
-                "identifier": self.path,
-                "friendInfo": 'true'
-            },
-            headers={
-                "Accept": "*/*",
-                "Connection": "keep-alive",
-                "Pragma": "no-cache",
-                "Cache-Control": "no-cache",
-                "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                "Host": "api.everytime.kr",
-                "Origin": "https://everytime.kr",
-                "Referer": "https://everytime.kr/",
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/93.0.4577.63 Safari/537.36"
-            }).text
+        return (self.client or get_default_client()).get_timetable(self.path)
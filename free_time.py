@@ -0,0 +1,133 @@
+"""
+공강 시간 계산 엔진
+
+요일별로 수업 시간을 정렬·병합한 구간 인덱스를 만들어 다음 질의에 답한다.
+    - free_slots(day): 하루 범위(기본 09:00-21:00) 안의 공강 구간 (미리 계산, O(1))
+    - is_busy(day, minute) / overlaps(day, start, end): 이진 탐색 (O(log n))
+    - is_tick_busy(day, tick): Everytime 의 5분 단위(starttime * 5)와 같은 비트셋 조회 (O(1))
+
+CLI(every2cal.py)와 웹(app.py)이 같은 엔진을 사용한다.
+"""
+from bisect import bisect_right
+from typing import Iterable, List, Tuple
+
+from timetable import CLASS, DAY_NAMES, FREE, Slot
+
+TICK_MINUTES = 5
+TICKS_PER_DAY = 24 * 60 // TICK_MINUTES
+DEFAULT_DAY_START = 9 * 60
+DEFAULT_DAY_END = 21 * 60
+
+
+class FreeTimeIndex:
+    """
+    주간 수업/공강 구간 인덱스
+
+    Args:
+        slots: 수업 Slot 목록 (CLASS 가 아닌 슬롯, 시작 >= 종료인 슬롯은 무시)
+        day_start, day_end: 공강을 계산할 하루 범위 (자정 기준 분)
+        n_days: 요일 수 (0=월요일)
+    """
+    def __init__(self, slots: Iterable[Slot], day_start: int = DEFAULT_DAY_START,
+                 day_end: int = DEFAULT_DAY_END, n_days: int = len(DAY_NAMES)):
+        if day_start > day_end:
+            raise ValueError("하루 시작 시각이 종료 시각보다 늦습니다.")
+        self.day_start = day_start
+        self.day_end = day_end
+        self.n_days = n_days
+
+        per_day = [[] for _ in range(n_days)]
+        for slot in slots:
+            if slot.kind == CLASS and 0 <= slot.day < n_days and slot.start < slot.end:
+                per_day[slot.day].append((slot.start, slot.end))
+
+        self._starts = []
+        self._ends = []
+        self._ticks = []
+        self._free = []
+        for intervals in per_day:
+            merged = self._merge(intervals)
+            self._starts.append([start for start, _ in merged])
+            self._ends.append([end for _, end in merged])
+            self._ticks.append(self._to_ticks(merged))
+            self._free.append(self._complement(merged))
+
+    @classmethod
+    def from_subjects(cls, subjects, **kwargs) -> "FreeTimeIndex":
+        """Subject 목록(Convert.get_timetable)으로 인덱스 생성"""
+        return cls((slot for subject in subjects for slot in subject.sessions), **kwargs)
+
+    @staticmethod
+    def _merge(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _to_ticks(merged: List[Tuple[int, int]]) -> int:
+        """바쁜 5분 단위 칸의 비트셋 (경계가 5분 단위가 아니면 바깥쪽으로 포함)"""
+        bits = 0
+        for start, end in merged:
+            first = max(start // TICK_MINUTES, 0)
+            last = min(-(-end // TICK_MINUTES), TICKS_PER_DAY)
+            if first < last:
+                bits |= (1 << last) - (1 << first)
+        return bits
+
+    def _complement(self, merged: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        free = []
+        cursor = self.day_start
+        for start, end in merged:
+            if end <= cursor:
+                continue
+            if start >= self.day_end:
+                break
+            if start > cursor:
+                free.append((cursor, start))
+            cursor = end
+        if cursor < self.day_end:
+            free.append((cursor, self.day_end))
+        return free
+
+    def busy_intervals(self, day: int) -> List[Tuple[int, int]]:
+        """병합된 수업 구간 (하루 범위로 자르지 않음)"""
+        return list(zip(self._starts[day], self._ends[day]))
+
+    def free_slots(self, day: int, min_duration: int = 0) -> List[Tuple[int, int]]:
+        """하루 범위 안의 공강 구간 (시작 순)"""
+        if min_duration:
+            return [(start, end) for start, end in self._free[day] if end - start >= min_duration]
+        return list(self._free[day])
+
+    def free_slot_rows(self, min_duration: int = 0) -> List[Slot]:
+        """모든 요일의 공강을 FREE Slot 으로 반환"""
+        return [Slot(FREE, "", day, start, end)
+                for day in range(self.n_days)
+                for start, end in self.free_slots(day, min_duration)]
+
+    def free_minutes(self, day: int) -> int:
+        return sum(end - start for start, end in self._free[day])
+
+    def is_busy(self, day: int, minute: int) -> bool:
+        """해당 시각에 수업 중인지 ([start, end) 기준)"""
+        i = bisect_right(self._starts[day], minute) - 1
+        return i >= 0 and minute < self._ends[day][i]
+
+    def overlaps(self, day: int, start: int, end: int) -> bool:
+        """[start, end) 구간이 수업과 겹치는지"""
+        if start >= end:
+            return False
+        i = bisect_right(self._ends[day], start)
+        return i < len(self._starts[day]) and self._starts[day][i] < end
+
+    def busy_ticks(self, day: int) -> int:
+        return self._ticks[day]
+
+    def is_tick_busy(self, day: int, tick: int) -> bool:
+        """5분 단위 칸(tick = 분 // 5, Everytime starttime 과 같은 단위)이 수업과 겹치는지"""
+        return bool(self._ticks[day] >> tick & 1)
@@ -0,0 +1,126 @@
+"""
+백그라운드 작업 큐
+
+학습 계획 생성처럼 오래 걸리는 작업을 스레드 풀에서 실행하고,
+작업 id 로 진행 상황(단계, epoch, loss 등)과 최종 결과를 조회할 수 있게 한다.
+"""
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """
+    작업 하나의 상태 (queued → running → done / failed)
+
+    Args:
+        owner: 작업을 등록한 세션/사용자 키 (JobQueue.get 에서 같은 키로만 조회 가능)
+    """
+    def __init__(self, progress_fn=None, owner=None):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = "queued"
+        self.stage = None
+        self.progress = 0
+        self.info = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._progress_fn = progress_fn
+        self._lock = threading.Lock()
+
+    def update(self, stage, **info):
+        """진행 상황 갱신 (작업 함수의 progress_callback 으로 전달됨)"""
+        with self._lock:
+            self.stage = stage
+            self.info.update(info)
+            if self._progress_fn:
+                self.progress = max(self.progress, min(int(self._progress_fn(stage, info)), 99))
+
+    def to_dict(self, include_result=True):
+        with self._lock:
+            data = {
+                "id": self.id,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": self.progress,
+                "error": self.error,
+            }
+            data.update(self.info)
+            if include_result and self.status == "done":
+                data["result"] = self.result
+            return data
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+
+class JobQueue:
+    """
+    스레드 풀 기반 작업 큐
+
+    Args:
+        max_workers: 동시에 실행할 작업 수
+        progress_fn: (stage, info) -> 0~100 진행률 계산 함수
+        max_jobs: 보관할 최대 작업 수 (초과 시 오래된 완료 작업부터 삭제)
+        ttl: 완료된 작업을 보관하는 시간(초)
+    """
+    def __init__(self, max_workers=2, progress_fn=None, max_jobs=500, ttl=3600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="plan-job")
+        self.progress_fn = progress_fn
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, owner=None, **kwargs):
+        """
+        작업 등록 후 작업 id 반환. fn 은 progress_callback 키워드 인자를 받아야 한다.
+
+        Args:
+            owner: 작업을 등록한 세션/사용자 키. 조회할 때 같은 키를 주어야 한다.
+        """
+        job = Job(self.progress_fn, owner)
+        with self._lock:
+            self._evict()
+            self._jobs[job.id] = job
+        self.executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def get(self, job_id, owner=None):
+        """작업 조회. 없거나 등록한 owner 가 아니면 None (다른 사용자의 결과를 볼 수 없음)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        try:
+            job.result = fn(*args, progress_callback=job.update, **kwargs)
+            job.progress = 100
+            job.status = "done"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def _evict(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        if len(self._jobs) >= self.max_jobs:
+            finished = sorted((job for job in self._jobs.values() if job.finished),
+                              key=lambda job: job.finished_at)
+            for job in finished[:len(self._jobs) - self.max_jobs + 1]:
+                del self._jobs[job.id]
@@ -0,0 +1,229 @@
+"""
+학습 계획 모델 레지스트리
+
+버전별 체크포인트를 다음 구조로 저장한다.
+
+    registry/
+        CURRENT            현재 사용 중인 버전 이름 (예: "v0003")
+        v0003/
+            model.npz      가중치의 NumPy 배열 (save_numpy_weights, torch 없이 추론할 때 사용)
+            model.pt       같은 가중치의 state_dict (save_weights). torch 백엔드 레지스트리만 기록하며,
+                           numpy 백엔드는 torch 를 import 하지 않도록 model.npz 만 쓴다
+            meta.json      모델 설정(model_config: 형식, 차원, 특성 스키마 해시)과
+                           훈련 지표, 생성 시각 등. 가중치 파일의 사이드카 역할
+
+모든 파일은 임시 파일에 쓴 뒤 os.replace 로 교체하므로 읽는 쪽은 항상 완성된 파일만 본다.
+버전 디렉터리는 os.mkdir 로 예약해 여러 프로세스가 동시에 게시해도 번호가 겹치지 않는다.
+실행 중인 서버는 current_planner() 가 CURRENT 변경을 감지해 새 버전으로 교체하며,
+이미 처리 중인 요청은 이전 모델 참조를 그대로 사용한다.
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from models.study_plan_nn import StudyPlanGenerator
+
+CURRENT_FILE = "CURRENT"
+CHECKPOINT_FILE = "model.pt"
+NUMPY_CHECKPOINT_FILE = "model.npz"
+META_FILE = "meta.json"
+_VERSION_RE = re.compile(r"^v(\d+)$")
+
+
+def _atomic_write(path, write_fn, mode="w"):
+    """같은 디렉터리의 임시 파일에 쓴 뒤 rename (실패 시 임시 파일 삭제)"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, mode, **({"encoding": "utf-8"} if "b" not in mode else {})) as f:
+            write_fn(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelRegistry:
+    """
+    Args:
+        root_dir: 레지스트리 디렉터리
+        keep: 보관할 최근 버전 수 (현재 버전은 항상 보관)
+        check_interval: CURRENT 변경 확인 주기(초). 0 이면 매 호출마다 확인
+        backend, n_threads: 불러온 모델에 적용할 추론 백엔드 (StudyPlanGenerator.set_backend)
+    """
+    def __init__(self, root_dir, keep=5, check_interval=2.0, backend="numpy", n_threads=None):
+        self.root_dir = root_dir
+        self.keep = keep
+        self.check_interval = check_interval
+        self.backend = backend
+        self.n_threads = n_threads
+        self._lock = threading.RLock()
+        self._planner = None
+        self._loaded_version = None
+        self._last_check = float("-inf")
+
+    def _version_dir(self, version):
+        return os.path.join(self.root_dir, version)
+
+    def versions(self):
+        """게시가 끝난(meta.json 이 있는) 버전 이름 목록 (오래된 순)"""
+        if not os.path.isdir(self.root_dir):
+            return []
+        found = []
+        for name in os.listdir(self.root_dir):
+            match = _VERSION_RE.match(name)
+            if match and os.path.exists(os.path.join(self.root_dir, name, META_FILE)):
+                found.append((int(match.group(1)), name))
+        return [name for _, name in sorted(found)]
+
+    def metadata(self, version):
+        with open(os.path.join(self._version_dir(version), META_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.root_dir, CURRENT_FILE), 'r', encoding='utf-8') as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def _reserve_version(self):
+        os.makedirs(self.root_dir, exist_ok=True)
+        existing = [int(m.group(1)) for m in map(_VERSION_RE.match, os.listdir(self.root_dir)) if m]
+        number = max(existing, default=0) + 1
+        while True:
+            version = f"v{number:04d}"
+            try:
+                os.mkdir(self._version_dir(version))
+                return version
+            except FileExistsError:
+                number += 1
+
+    def publish(self, planner, metrics=None, activate=True):
+        """
+        훈련된 생성기를 새 버전으로 저장
+
+        Args:
+            metrics: 메타데이터에 함께 기록할 훈련 지표 (없으면 planner.training_metrics)
+            activate: True 이면 CURRENT 를 새 버전으로 바꾸고 이 프로세스의 모델도 바로 교체
+
+        Returns:
+            버전 이름
+        """
+        if not planner.model:
+            raise ValueError("저장할 모델이 없습니다.")
+
+        version = self._reserve_version()
+        version_dir = self._version_dir(version)
+        try:
+            _atomic_write(os.path.join(version_dir, NUMPY_CHECKPOINT_FILE), planner.save_numpy_weights, mode="wb")
+            if self.backend != "numpy":
+                _atomic_write(os.path.join(version_dir, CHECKPOINT_FILE), planner.save_weights, mode="wb")
+            meta = {
+                "version": version,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                **planner.model_config(),
+                "fingerprint": planner.fingerprint(),
+                "metrics": metrics if metrics is not None else getattr(planner, "training_metrics", {}),
+            }
+            # meta.json 이 마지막에 생겨야 versions() 에 나타난다
+            _atomic_write(os.path.join(version_dir, META_FILE),
+                          lambda f: json.dump(meta, f, ensure_ascii=False, indent=2))
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version, planner)
+        self._prune()
+        return version
+
+    def activate(self, version, planner=None):
+        """CURRENT 를 version 으로 바꾸고 이 프로세스의 모델을 교체 (롤백에도 사용)"""
+        if version not in self.versions():
+            raise ValueError(f"존재하지 않는 모델 버전입니다: {version}")
+        if planner is None:
+            planner = self.load(version)
+        os.makedirs(self.root_dir, exist_ok=True)
+        _atomic_write(os.path.join(self.root_dir, CURRENT_FILE), lambda f: f.write(version))
+        self._swap(version, planner)
+
+    def load(self, version):
+        """
+        numpy 백엔드이고 model.npz 가 있으면 torch 없이 로드 (이전 버전은 model.pt 를 torch 로 읽음).
+        torch 백엔드는 model.pt 를 읽고, model.pt 가 없는 버전(numpy 백엔드가 게시)은 model.npz 를 변환해 쓴다.
+        """
+        planner = StudyPlanGenerator(backend=self.backend, n_threads=self.n_threads)
+        npz_path = os.path.join(self._version_dir(version), NUMPY_CHECKPOINT_FILE)
+        pt_path = os.path.join(self._version_dir(version), CHECKPOINT_FILE)
+        if self.backend == "numpy":
+            path = npz_path if os.path.exists(npz_path) else pt_path
+        else:
+            path = pt_path if os.path.exists(pt_path) else npz_path
+        planner.load_model(path, config=self.metadata(version))
+        return planner
+
+    def _swap(self, version, planner):
+        # 백엔드 컴파일은 교체 전에 끝내 요청 처리 중에 지연이 생기지 않게 한다
+        planner.set_backend(self.backend, self.n_threads)
+        with self._lock:
+            if self._planner is not None:
+                # 시간표 특성 캐시는 모델과 무관하므로 새 모델에서도 그대로 사용
+                planner.feature_cache = self._planner.feature_cache
+            self._planner = planner
+            self._loaded_version = version
+            self._last_check = time.monotonic()
+
+    def current_planner(self):
+        """
+        현재 버전의 생성기 (없으면 None)
+
+        check_interval 마다 CURRENT 를 확인해 다른 프로세스가 게시/활성화한 버전으로 교체한다.
+        새 버전 로드에 실패하면 기존 모델을 계속 사용한다.
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return self._planner
+        self._last_check = now
+
+        version = self.current_version()
+        if version is None or version == self._loaded_version:
+            return self._planner
+        with self._lock:
+            if version != self._loaded_version:
+                try:
+                    planner = self.load(version)
+                except Exception as e:
+                    print(f"모델 버전 로드 실패 ({version}): {e}")
+                    return self._planner
+                self._swap(version, planner)
+                print(f"학습 계획 모델 교체: {version}")
+            return self._planner
+
+    @property
+    def loaded_version(self):
+        return self._loaded_version
+
+    def _prune(self):
+        """최근 keep 개와 현재 버전을 제외한 오래된 버전 삭제"""
+        versions = self.versions()
+        current = self.current_version()
+        for version in versions[:-self.keep] if self.keep else []:
+            if version != current:
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
+
+    def describe(self):
+        """버전 목록과 현재 버전 (모니터링/관리용)"""
+        return {
+            "current": self.current_version(),
+            "loaded": self._loaded_version,
+            "versions": [self.metadata(version) for version in self.versions()],
+        }
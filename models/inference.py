@@ -0,0 +1,135 @@
+"""
+StudyPlanNet 추론 백엔드
+
+    - numpy: NumPy 행렬 곱으로 직접 계산 (torch 를 import 하지 않음, 웹 서버 기본값)
+    - eager: PyTorch 모듈을 그대로 실행 (eval 모드)
+    - torchscript: trace 후 freeze 한 그래프 (dropout 제거, eager 와 같은 결과)
+    - onnx: ONNX 로 내보내 onnxruntime CPU 세션으로 실행 (onnx, onnxruntime 필요)
+
+모든 백엔드는 (N, input_dim) float32 배열을 받아 (N, output_dim) softmax 확률 배열을 반환한다.
+모델은 StudyPlanNet 또는 NumpyStudyPlanNet 모두 받으며, torch 백엔드는 필요할 때만 torch 를 import 한다.
+멀티 워커(gunicorn 등) 배포에서는 워커마다 torch 스레드 풀이 코어 수만큼 생겨
+과다 구독이 되므로 set_inference_threads 로 워커당 스레드 수를 제한한다.
+"""
+import io
+import warnings
+
+import numpy as np
+
+from models.numpy_net import NumpyStudyPlanNet
+
+INFERENCE_BACKENDS = ("numpy", "eager", "torchscript", "onnx")
+TORCH_BACKENDS = ("eager", "torchscript", "onnx")
+
+
+def set_inference_threads(n_threads: int):
+    """torch intra-op 스레드 수 설정 (inter-op 는 병렬 작업 시작 전에만 바꿀 수 있음)"""
+    import torch
+
+    torch.set_num_threads(n_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+
+def export_torchscript(model):
+    """trace + freeze 한 TorchScript 모듈 (배치 크기는 자유)"""
+    import torch
+    from models.study_plan_net import to_torch_model
+
+    model = to_torch_model(model).eval()
+    example = torch.zeros(1, model.input_dim)
+    with warnings.catch_warnings():
+        # torch.jit 은 deprecated 경고를 내지만 이 용도에는 여전히 가장 가볍다
+        warnings.simplefilter("ignore", FutureWarning)
+        return torch.jit.freeze(torch.jit.trace(model, example))
+
+
+def export_onnx(model, path=None) -> bytes:
+    """ONNX 그래프 직렬화 (path 가 주어지면 파일로도 저장)"""
+    import torch
+    from models.study_plan_net import to_torch_model
+
+    model = to_torch_model(model).eval()
+    buffer = io.BytesIO()
+    torch.onnx.export(
+        model, torch.zeros(1, model.input_dim), buffer,
+        input_names=["features"], output_names=["probabilities"],
+        dynamic_axes={"features": {0: "batch"}, "probabilities": {0: "batch"}},
+        dynamo=False,
+    )
+    data = buffer.getvalue()
+    if path:
+        with open(path, 'wb') as f:
+            f.write(data)
+    return data
+
+
+class NumpyBackend:
+    name = "numpy"
+
+    def __init__(self, model, n_threads: int = None):
+        if not isinstance(model, NumpyStudyPlanNet):
+            model = NumpyStudyPlanNet(model.state_dict(), model.input_dim, model.hidden_dim, model.output_dim)
+        self.model = model
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return self.model(features)
+
+
+class EagerBackend:
+    name = "eager"
+
+    def __init__(self, model, n_threads: int = None):
+        from models.study_plan_net import to_torch_model
+
+        self.model = to_torch_model(model).eval()
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        import torch
+
+        with torch.inference_mode():
+            return self.model(torch.from_numpy(features)).numpy()
+
+
+class TorchScriptBackend:
+    name = "torchscript"
+
+    def __init__(self, model, n_threads: int = None):
+        self.module = export_torchscript(model)
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        import torch
+
+        with torch.inference_mode():
+            return self.module(torch.from_numpy(features)).numpy()
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model, n_threads: int = None):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("onnx 백엔드에는 onnx, onnxruntime 패키지가 필요합니다.")
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = n_threads or 1
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(export_onnx(model), options,
+                                                    providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: features})[0]
+
+
+_BACKEND_CLASSES = {backend.name: backend
+                    for backend in (NumpyBackend, EagerBackend, TorchScriptBackend, OnnxBackend)}
+
+
+def create_backend(name: str, model, n_threads: int = None):
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"지원하지 않는 추론 백엔드입니다: {name}")
+    return _BACKEND_CLASSES[name](model, n_threads)
@@ -0,0 +1,72 @@
+"""
+torch 없이 실행하는 StudyPlanNet 추론 (NumPy)
+
+StudyPlanNet 의 eval 모드 forward(fc1..fc4 + ReLU, 마지막 softmax)를 그대로 재현한다.
+가중치는 state_dict 와 같은 이름("fc1.weight", ...)의 float32 배열을 담은 .npz 파일로 주고받으므로
+웹 서버는 torch 를 import 하지 않고 모델을 불러와 예측할 수 있다.
+"""
+from collections import OrderedDict
+from typing import Dict
+
+import numpy as np
+
+LAYER_NAMES = ("fc1", "fc2", "fc3", "fc4")
+
+
+def to_numpy(value) -> np.ndarray:
+    """torch 텐서 또는 배열을 float32 NumPy 배열로 (torch 를 import 하지 않음)"""
+    if hasattr(value, "detach"):
+        value = value.detach().cpu().numpy()
+    return np.ascontiguousarray(value, dtype=np.float32)
+
+
+class NumpyStudyPlanNet:
+    """
+    StudyPlanNet 과 같은 구조의 추론 전용 모델
+
+    Args:
+        state_dict: {"fc1.weight": (out, in), "fc1.bias": (out,), ...} 텐서 또는 배열
+    """
+    def __init__(self, state_dict: Dict, input_dim: int, hidden_dim: int = 128, output_dim: int = 5):
+        self.input_dim = input_dim
+        self.hidden_dim = hidden_dim
+        self.output_dim = output_dim
+        self._params = OrderedDict()
+        for layer in LAYER_NAMES:
+            for kind in ("weight", "bias"):
+                name = f"{layer}.{kind}"
+                if name not in state_dict:
+                    raise ValueError(f"가중치가 없습니다: {name}")
+                self._params[name] = to_numpy(state_dict[name])
+        # forward 용: x @ W^T 를 연속 메모리 행렬 곱으로 계산
+        self._layers = [(np.ascontiguousarray(self._params[f"{layer}.weight"].T), self._params[f"{layer}.bias"])
+                        for layer in LAYER_NAMES]
+        if self._layers[0][0].shape[0] != input_dim or self._layers[-1][0].shape[1] != output_dim:
+            raise ValueError("가중치 크기가 모델 설정과 다릅니다.")
+
+    @classmethod
+    def load(cls, path, input_dim: int, hidden_dim: int = 128, output_dim: int = 5) -> "NumpyStudyPlanNet":
+        """save() 로 저장한 .npz 가중치 로드 (pickle 사용 안 함)"""
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls({name: arrays[name] for name in arrays.files}, input_dim, hidden_dim, output_dim)
+
+    def save(self, path):
+        """가중치를 .npz 로 저장 (path 는 파일 경로 또는 쓰기용 바이너리 파일 객체)"""
+        np.savez(path, **self._params)
+
+    def state_dict(self) -> "OrderedDict[str, np.ndarray]":
+        return OrderedDict(self._params)
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        """(N, input_dim) 특성 -> (N, output_dim) softmax 확률 (float32)"""
+        x = np.asarray(features, dtype=np.float32)
+        last = len(self._layers) - 1
+        for i, (weight_t, bias) in enumerate(self._layers):
+            x = x @ weight_t
+            x += bias
+            if i < last:
+                np.maximum(x, 0.0, out=x)
+        x -= x.max(axis=1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=1, keepdims=True)
+        return x
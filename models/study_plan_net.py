@@ -0,0 +1,48 @@
+"""
+StudyPlanNet (PyTorch) - 훈련과 torch 추론 백엔드에서만 사용
+
+웹 서버의 추론 경로는 models.numpy_net 을 사용하므로 이 모듈(과 torch)은 필요할 때만 import 된다.
+"""
+import torch
+import torch.nn as nn
+
+from models.numpy_net import NumpyStudyPlanNet
+
+
+class StudyPlanNet(nn.Module):
+    """
+    학습 계획을 생성하는 인공신경망
+    """
+    def __init__(self, input_dim: int, hidden_dim: int = 128, output_dim: int = 5):
+        super(StudyPlanNet, self).__init__()
+        self.input_dim = input_dim
+        self.hidden_dim = hidden_dim
+        self.output_dim = output_dim  # 학습 시간 분배 (매우 높음, 높음, 보통, 낮음, 매우 낮음)
+
+        # 네트워크 구조
+        self.fc1 = nn.Linear(input_dim, hidden_dim)
+        self.fc2 = nn.Linear(hidden_dim, hidden_dim // 2)
+        self.fc3 = nn.Linear(hidden_dim // 2, hidden_dim // 4)
+        self.fc4 = nn.Linear(hidden_dim // 4, output_dim)
+
+        self.dropout = nn.Dropout(0.3)
+        self.relu = nn.ReLU()
+        self.softmax = nn.Softmax(dim=1)
+
+    def forward(self, x):
+        x = self.relu(self.fc1(x))
+        x = self.dropout(x)
+        x = self.relu(self.fc2(x))
+        x = self.dropout(x)
+        x = self.relu(self.fc3(x))
+        x = self.fc4(x)
+        return self.softmax(x)
+
+
+def to_torch_model(model) -> StudyPlanNet:
+    """NumpyStudyPlanNet 이면 같은 가중치의 StudyPlanNet 으로 변환 (이미 StudyPlanNet 이면 그대로)"""
+    if not isinstance(model, NumpyStudyPlanNet):
+        return model
+    net = StudyPlanNet(model.input_dim, model.hidden_dim, model.output_dim)
+    net.load_state_dict({name: torch.from_numpy(array.copy()) for name, array in model.state_dict().items()})
+    return net.eval()
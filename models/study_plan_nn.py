@@ -1,184 +1,240 @@
-import torch
-import torch.nn as nn
-import torch.optim as optim
 import numpy as np
 import json
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
-
-class StudyPlanNet(nn.Module):
+from typing import List, Dict, NamedTuple, Optional, Tuple
+
+from allocation import UNIT_MINUTES, WeeklyAllocator
+from models.inference import create_backend, export_onnx, export_torchscript
+from models.numpy_net import NumpyStudyPlanNet, to_numpy
+from timetable import CLASS, DAY_NAMES, FREE, format_time, to_slots
+
+# 특성 벡터 구성 (순서가 바뀌거나 항목이 추가되면 FEATURE_SCHEMA_VERSION 을 올린다)
+FEATURE_NAMES = (
+    "weight", "major", "class_hours", "free_hours_around_class",
+    "day_mon", "day_tue", "day_wed", "day_thu", "day_fri",
+    "time_morning", "time_afternoon", "time_evening",
+    "continuity",
+)
+FEATURE_SCHEMA_VERSION = 1
+FEATURE_SCHEMA_HASH = hashlib.sha1(
+    json.dumps({"version": FEATURE_SCHEMA_VERSION, "features": FEATURE_NAMES}).encode("utf-8")
+).hexdigest()[:12]
+
+PRIORITY_NAMES = ["매우 높음", "높음", "보통", "낮음", "매우 낮음"]
+
+# 우선순위별 하루 학습 시간 (시간)
+STUDY_HOURS_BY_PRIORITY = {
+    "매우 높음": 3.0,
+    "높음": 2.5,
+    "보통": 2.0,
+    "낮음": 1.5,
+    "매우 낮음": 1.0
+}
+
+# 최적 배정(solver="optimal")에서 과목별 주간 목표 = 하루 학습 시간 × WEEKLY_STUDY_DAYS
+WEEKLY_STUDY_DAYS = 5
+SOLVERS = ("greedy", "optimal")
+
+N_WEEKDAYS = 5  # 요일 분포 특성은 월-금만 사용
+
+# 결과 페이지 통계(plan["stats"]) 형식 버전 - 필드가 바뀌면 올려서 이전에 저장된 계획은 다시 계산
+PLAN_STATS_VERSION = 1
+
+class TrainingConfig(NamedTuple):
+    """
+    훈련 설정 (기본값은 이전과 같은 100 epoch 전체 배치 훈련)
+
+    epochs: 최대 epoch 수
+    batch_size: 미니배치 크기 (None 이면 전체 배치)
+    patience: 감시 손실이 min_delta 이상 줄지 않는 epoch 이 이만큼 이어지면 조기 종료 (None 이면 사용 안 함)
+    val_fraction: 검증용으로 떼어 둘 비율. 0 이면 훈련 손실을 감시
+    lr_patience, lr_factor: 감시 손실이 lr_patience epoch 동안 개선되지 않으면 학습률 × lr_factor (None 이면 고정)
+    seed: 초기화, 드롭아웃, 셔플, 검증 분할 시드 (None 이면 전역 난수 상태 사용)
     """
-    학습 계획을 생성하는 인공신경망
+    epochs: int = 100
+    lr: float = 0.001
+    batch_size: Optional[int] = None
+    patience: Optional[int] = None
+    min_delta: float = 1e-4
+    val_fraction: float = 0.0
+    lr_patience: Optional[int] = None
+    lr_factor: float = 0.5
+    seed: Optional[int] = None
+
+def _training_config(config: Optional[TrainingConfig], epochs: Optional[int], lr: Optional[float]) -> TrainingConfig:
+    config = config or TrainingConfig()
+    if epochs is not None:
+        config = config._replace(epochs=epochs)
+    if lr is not None:
+        config = config._replace(lr=lr)
+    return config
+
+# 체크포인트: 가중치(state_dict 텐서만) 파일 + 설정 JSON. 사용자 데이터는 저장하지 않는다.
+CHECKPOINT_FORMAT = "study_plan_weights/1"
+
+def config_path(weights_path: str) -> str:
+    """가중치 파일의 설정 사이드카 경로 (model.pt -> model.json)"""
+    return os.path.splitext(weights_path)[0] + ".json"
+
+def __getattr__(name):
+    # StudyPlanNet 은 torch 가 필요하므로 models.study_plan_net 에서 처음 접근할 때 불러온다
+    if name == "StudyPlanNet":
+        from models.study_plan_net import StudyPlanNet
+        return StudyPlanNet
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class TimetableFeatureCache:
+    """
+    시간표 기반 특성(FEATURE_NAMES[2:]) 의 LRU 캐시
+
+    키는 (시간표 슬롯, 과목 이름 순서) 이므로 과목 중요도/전공 여부만 바뀐 입력은
+    시간표 특성을 다시 계산하지 않는다. 여러 요청 스레드에서 공유할 수 있다.
     """
-    def __init__(self, input_dim: int, hidden_dim: int = 128, output_dim: int = 5):
-        super(StudyPlanNet, self).__init__()
-        self.input_dim = input_dim
-        self.hidden_dim = hidden_dim
-        self.output_dim = output_dim  # 학습 시간 분배 (매우 높음, 높음, 보통, 낮음, 매우 낮음)
-
-        # 네트워크 구조
-        self.fc1 = nn.Linear(input_dim, hidden_dim)
-        self.fc2 = nn.Linear(hidden_dim, hidden_dim // 2)
-        self.fc3 = nn.Linear(hidden_dim // 2, hidden_dim // 4)
-        self.fc4 = nn.Linear(hidden_dim // 4, output_dim)
-
-        self.dropout = nn.Dropout(0.3)
-        self.relu = nn.ReLU()
-        self.softmax = nn.Softmax(dim=1)
-
-    def forward(self, x):
-        x = self.relu(self.fc1(x))
-        x = self.dropout(x)
-        x = self.relu(self.fc2(x))
-        x = self.dropout(x)
-        x = self.relu(self.fc3(x))
-        x = self.fc4(x)
-        return self.softmax(x)
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute) -> np.ndarray:
+        with self._lock:
+            table = self._entries.get(key)
+            if table is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return table
+
+        table = compute()
+        table.setflags(write=False)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = table
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return table
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
 
 class StudyPlanDataset:
     """
     학습 계획 데이터셋 클래스
+
+    feature_cache 가 주어지면 시간표 기반 특성을 캐시에서 재사용하고
+    중요도/전공 여부 열과 라벨만 새로 계산한다.
     """
-    def __init__(self, subjects: List[Dict], timetable_slots: List[Tuple]):
+    def __init__(self, subjects: List[Dict], timetable_slots: List[Tuple],
+                 feature_cache: TimetableFeatureCache = None):
         self.subjects = subjects
-        self.timetable_slots = timetable_slots
+        self.timetable_slots = to_slots(timetable_slots)
+        self.feature_cache = feature_cache
         self.features = self._extract_features()
         self.labels = self._generate_labels()
 
-    def _extract_features(self) -> torch.Tensor:
+    def _extract_features(self) -> np.ndarray:
         """
         과목별 특성 벡터 추출
-        """
-        features = []
-
-        for subject in self.subjects:
-            feature_vector = []
-
-            # 1. 과목 중요도 (정규화)
-            weight = subject.get('weight', 1.0)
-            normalized_weight = min(weight / 10.0, 1.0)  # 0-1 범위로 정규화
-            feature_vector.append(normalized_weight)
-
-            # 2. 전공 여부 (0 또는 1)
-            is_major = subject.get('major', 0.0)
-            feature_vector.append(is_major)
-
-            # 3. 수업 시간 분석
-            class_hours = self._calculate_class_hours(subject['name'])
-            feature_vector.append(class_hours / 10.0)  # 정규화
-
-            # 4. 공강 시간 분석
-            free_hours = self._calculate_free_hours_around_class(subject['name'])
-            feature_vector.append(free_hours / 20.0)  # 정규화
-
-            # 5. 요일별 분포 (월-금)
-            day_distribution = self._get_day_distribution(subject['name'])
-            feature_vector.extend(day_distribution)
 
-            # 6. 시간대별 분포 (오전, 오후, 저녁)
-            time_distribution = self._get_time_distribution(subject['name'])
-            feature_vector.extend(time_distribution)
-
-            # 7. 연속성 지수 (연속된 수업인지)
-            continuity = self._calculate_continuity(subject['name'])
-            feature_vector.append(continuity)
-
-            features.append(feature_vector)
-
-        return torch.FloatTensor(features)
-
-    def _calculate_class_hours(self, subject_name: str) -> float:
-        """수업 시간 계산"""
-        total_hours = 0
-        for slot in self.timetable_slots:
-            if slot[0] == "수업" and slot[1] == subject_name:
-                start_time = self._time_to_minutes(slot[3])
-                end_time = self._time_to_minutes(slot[4])
-                total_hours += (end_time - start_time) / 60.0
-        return total_hours
-
-    def _calculate_free_hours_around_class(self, subject_name: str) -> float:
-        """수업 전후 공강시간 계산"""
-        free_hours = 0
-        subject_slots = []
-
-        # 해당 과목의 수업시간 찾기
-        for slot in self.timetable_slots:
-            if slot[0] == "수업" and slot[1] == subject_name:
-                subject_slots.append((slot[2], self._time_to_minutes(slot[3]), self._time_to_minutes(slot[4])))
-
-        # 각 수업 전후 공강시간 계산
-        for day, start, end in subject_slots:
-            for slot in self.timetable_slots:
-                if slot[0] == "공강" and slot[2] == day:
-                    free_start = self._time_to_minutes(slot[3])
-                    free_end = self._time_to_minutes(slot[4])
-
-                    # 수업 직전/직후 2시간 이내의 공강시간
-                    if abs(free_end - start) <= 120 or abs(free_start - end) <= 120:
-                        free_hours += (free_end - free_start) / 60.0
-
-        return free_hours
+        시간표를 한 번만 파싱해 배열로 만든 뒤 과목별 특성을 그룹 연산으로 계산한다.
+        (열 순서는 FEATURE_NAMES 참고)
+        """
+        if not self.subjects:
+            return np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
 
-    def _get_day_distribution(self, subject_name: str) -> List[float]:
-        """요일별 분포 (월-금)"""
-        days = ["월요일", "화요일", "수요일", "목요일", "금요일"]
-        distribution = [0.0] * 5
+        # 같은 이름의 과목은 같은 시간표 특성을 공유
+        name_ids = {}
+        subject_ids = np.array([name_ids.setdefault(subject['name'], len(name_ids)) for subject in self.subjects])
 
-        for slot in self.timetable_slots:
-            if slot[0] == "수업" and slot[1] == subject_name:
-                if slot[2] in days:
-                    distribution[days.index(slot[2])] = 1.0
+        features = np.zeros((len(self.subjects), len(FEATURE_NAMES)), dtype=np.float64)
 
-        return distribution
+        # 1. 과목 중요도 (정규화, 0-1 범위)
+        weights = np.array([subject.get('weight', 1.0) for subject in self.subjects], dtype=np.float64)
+        features[:, 0] = np.minimum(weights / 10.0, 1.0)
 
-    def _get_time_distribution(self, subject_name: str) -> List[float]:
-        """시간대별 분포 (오전, 오후, 저녁)"""
-        morning = afternoon = evening = 0
+        # 2. 전공 여부 (0 또는 1)
+        features[:, 1] = [subject.get('major', 0.0) for subject in self.subjects]
 
-        for slot in self.timetable_slots:
-            if slot[0] == "수업" and slot[1] == subject_name:
-                start_minutes = self._time_to_minutes(slot[3])
+        # 3-7. 시간표 기반 특성
+        if self.feature_cache is not None:
+            key = (tuple(self.timetable_slots), tuple(name_ids))
+            table = self.feature_cache.get_or_compute(key, lambda: self._timetable_features(name_ids))
+        else:
+            table = self._timetable_features(name_ids)
+        features[:, 2:] = table[subject_ids]
 
-                if start_minutes < 720:  # 12:00 이전 (오전)
-                    morning = 1
-                elif start_minutes < 1080:  # 18:00 이전 (오후)
-                    afternoon = 1
-                else:  # 저녁
-                    evening = 1
+        return features.astype(np.float32)
 
-        return [float(morning), float(afternoon), float(evening)]
-
-    def _calculate_continuity(self, subject_name: str) -> float:
-        """수업의 연속성 계산"""
-        subject_times = []
+    def _timetable_features(self, name_ids: Dict[str, int]) -> np.ndarray:
+        """
+        과목 이름별 시간표 특성 (수업 시간, 공강 시간, 요일 분포, 시간대 분포, 연속성)
+        """
+        n_names = len(name_ids)
+        class_rows, free_rows = [], []
 
+        # 배열로 변환: (과목 id, 요일, 평일 인덱스, 시작 분, 종료 분)
         for slot in self.timetable_slots:
-            if slot[0] == "수업" and slot[1] == subject_name:
-                day = slot[2]
-                start = self._time_to_minutes(slot[3])
-                end = self._time_to_minutes(slot[4])
-                subject_times.append((day, start, end))
-
-        # 같은 날 연속된 수업인지 확인
-        continuity_score = 0
-        for i, (day1, start1, end1) in enumerate(subject_times):
-            for j, (day2, start2, end2) in enumerate(subject_times):
-                if i != j and day1 == day2:
-                    if abs(end1 - start2) <= 30 or abs(end2 - start1) <= 30:  # 30분 이내
-                        continuity_score += 1
-
-        return min(continuity_score / len(subject_times) if subject_times else 0, 1.0)
-
-    def _time_to_minutes(self, time_str: str) -> int:
-        """시간 문자열을 분으로 변환"""
-        try:
-            h, m = map(int, time_str.split(':'))
-            return h * 60 + m
-        except:
-            return 0
-
-    def _generate_labels(self) -> torch.Tensor:
+            if slot.kind == CLASS:
+                name_id = name_ids.get(slot.name)
+                if name_id is None:
+                    continue
+                class_rows.append((name_id, slot.day, slot.day if slot.day < N_WEEKDAYS else -1,
+                                   slot.start, slot.end))
+            elif slot.kind == FREE:
+                free_rows.append((slot.day, slot.start, slot.end))
+
+        result = np.zeros((n_names, len(FEATURE_NAMES) - 2), dtype=np.float64)
+        if not class_rows:
+            return result
+
+        classes = np.array(class_rows, dtype=np.int64)
+        c_id, c_day, c_weekday, c_start, c_end = classes.T
+
+        # 3. 수업 시간 (시간 단위 합계, 정규화)
+        result[:, 0] = np.bincount(c_id, weights=(c_end - c_start) / 60.0, minlength=n_names) / 10.0
+
+        # 4. 수업 직전/직후 2시간 이내의 같은 요일 공강시간 (정규화)
+        if free_rows:
+            frees = np.array(free_rows, dtype=np.int64)
+            f_day, f_start, f_end = frees.T
+            near = (c_day[:, None] == f_day[None, :]) & (
+                (np.abs(f_end[None, :] - c_start[:, None]) <= 120) |
+                (np.abs(f_start[None, :] - c_end[:, None]) <= 120)
+            )
+            class_idx, free_idx = np.nonzero(near)
+            result[:, 1] = np.bincount(c_id[class_idx], weights=(f_end - f_start)[free_idx] / 60.0,
+                                       minlength=n_names) / 20.0
+
+        # 5. 요일별 분포 (월-금)
+        weekday_mask = c_weekday >= 0
+        result[c_id[weekday_mask], 2 + c_weekday[weekday_mask]] = 1.0
+
+        # 6. 시간대별 분포 (오전: 12:00 이전, 오후: 18:00 이전, 저녁)
+        time_bucket = np.where(c_start < 720, 0, np.where(c_start < 1080, 1, 2))
+        result[c_id, 7 + time_bucket] = 1.0
+
+        # 7. 연속성 지수 (같은 날 30분 이내로 이어지는 수업 쌍의 수 / 수업 수)
+        same_day = (c_id[:, None] == c_id[None, :]) & (c_day[:, None] == c_day[None, :])
+        np.fill_diagonal(same_day, False)
+        adjacent = (np.abs(c_end[:, None] - c_start[None, :]) <= 30) | (np.abs(c_end[None, :] - c_start[:, None]) <= 30)
+        scores = np.bincount(c_id, weights=(same_day & adjacent).sum(axis=1), minlength=n_names)
+        counts = np.bincount(c_id, minlength=n_names)
+        result[:, 10] = np.minimum(np.divide(scores, counts, out=np.zeros(n_names), where=counts > 0), 1.0)
+
+        return result
+
+    def _generate_labels(self) -> np.ndarray:
         """
         학습 우선순위 라벨 생성
         """
@@ -205,52 +261,262 @@ class StudyPlanDataset:
 
             labels.append(label)
 
-        return torch.LongTensor(labels)
+        return np.array(labels, dtype=np.int64)
 
 class StudyPlanGenerator:
     """
     학습 계획 생성기
+
+    Args:
+        model_path: 불러올 체크포인트
+        backend: 추론 백엔드 ("numpy", "eager", "torchscript", "onnx", models.inference 참고)
+        n_threads: onnx 백엔드의 intra-op 스레드 수 (torch 백엔드는 set_inference_threads 로 설정)
+
+    model 은 훈련/torch 체크포인트 로드 후에는 StudyPlanNet, .npz 가중치 로드 후에는
+    NumpyStudyPlanNet 이다. 훈련과 torch 백엔드만 torch 를 import 한다.
     """
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, backend: str = "numpy", n_threads: int = None):
         self.model = None
         self.subjects = []
         self.timetable_slots = []
+        self._fingerprint = None
+        self.feature_cache = TimetableFeatureCache()
+        self.training_metrics = {}
+        self.backend = backend
+        self.n_threads = n_threads
+        self._backend = None
 
         if model_path:
             self.load_model(model_path)
 
+    def set_backend(self, backend: str, n_threads: int = None):
+        """추론 백엔드 변경 (현재 모델로 바로 컴파일/내보내기)"""
+        self._backend = create_backend(backend, self.model, n_threads) if self.model else None
+        self.backend = backend
+        self.n_threads = n_threads
+
+    def _infer(self, features: np.ndarray) -> np.ndarray:
+        """선택한 백엔드로 softmax 확률 계산 (모델이 바뀌었으면 백엔드를 다시 만든다)"""
+        if self._backend is None:
+            self._backend = create_backend(self.backend, self.model, self.n_threads)
+        return self._backend(features)
+
+    def export_torchscript(self, path: str):
+        """추론용 TorchScript 모듈 저장 (torch.jit.load 로 불러와 바로 실행 가능)"""
+        if not self.model:
+            raise ValueError("저장할 모델이 없습니다.")
+        import torch
+
+        torch.jit.save(export_torchscript(self.model), path)
+
+    def export_onnx(self, path: str):
+        """ONNX 모델 저장 (onnx 패키지 필요, 배치 크기는 동적)"""
+        if not self.model:
+            raise ValueError("저장할 모델이 없습니다.")
+        export_onnx(self.model, path)
+
     def train_model(self, subjects: List[Dict], timetable_slots: List[Tuple],
-                    epochs: int = 100, lr: float = 0.001):
+                    epochs: int = None, lr: float = None, progress_callback=None,
+                    config: TrainingConfig = None):
         """
         모델 훈련
+
+        Args:
+            epochs, lr: 주어지면 config 의 같은 항목을 덮어쓴다
+            config: 배치 크기, 조기 종료, 학습률 스케줄, 시드 (TrainingConfig, 기본값은 100 epoch 전체 배치)
+
+        progress_callback 이 주어지면 매 epoch 마다
+        progress_callback("training", epoch=..., epochs=..., loss=...) 로 진행 상황을 알린다.
+        훈련 후 self.training_metrics 에 실제 epoch 수, 손실, 훈련 정확도, 소요 시간을 기록한다.
         """
         self.subjects = subjects
-        self.timetable_slots = timetable_slots
+        self.timetable_slots = to_slots(timetable_slots)
+        dataset = StudyPlanDataset(subjects, timetable_slots, self.feature_cache)
+        self._fit(dataset.features, dataset.labels, _training_config(config, epochs, lr), progress_callback)
+
+    def train_model_pooled(self, inputs: List[Tuple[List[Dict], List[Tuple]]],
+                           epochs: int = None, lr: float = None, progress_callback=None,
+                           config: TrainingConfig = None):
+        """
+        여러 사용자의 데이터를 모아 하나의 모델로 훈련
+
+        시간표 특성은 사용자별로 계산한 뒤 이어 붙이므로 사용자 사이에 같은 과목 이름이 있어도 섞이지 않는다.
+        큰 데이터에서는 config.batch_size 로 미니배치 훈련을 사용한다.
+
+        Args:
+            inputs: [(subjects, timetable_slots), ...]
+        """
+        features, labels = [], []
+        for subjects, timetable_slots in inputs:
+            if subjects:
+                dataset = StudyPlanDataset(subjects, timetable_slots, self.feature_cache)
+                features.append(dataset.features)
+                labels.append(dataset.labels)
+        if not features:
+            raise ValueError("훈련할 과목 데이터가 없습니다.")
+        self.train_on_features(np.concatenate(features), np.concatenate(labels), epochs, lr,
+                               progress_callback, config)
+
+    def train_on_features(self, features: np.ndarray, labels: np.ndarray,
+                          epochs: int = None, lr: float = None, progress_callback=None,
+                          config: TrainingConfig = None):
+        """
+        미리 추출한 특성/라벨 배열로 훈련 (StudyPlanDataset.features / labels 형식)
 
-        # 데이터셋 준비
-        dataset = StudyPlanDataset(subjects, timetable_slots)
+        특성 추출을 다른 프로세스에서 병렬로 수행할 때 사용한다 (train_offline.py 참고).
+        """
+        if len(features) == 0:
+            raise ValueError("훈련할 과목 데이터가 없습니다.")
+        self.subjects = []
+        self.timetable_slots = []
+        self._fit(features, labels, _training_config(config, epochs, lr), progress_callback)
+
+    def _fit(self, features: np.ndarray, labels: np.ndarray, config: TrainingConfig, progress_callback=None):
+        import torch
+
+        started = time.perf_counter()
+        if config.seed is None:
+            metrics = self._run_training(features, labels, config, progress_callback)
+        else:
+            # 전역 난수 상태를 바꾸지 않고 초기화/드롭아웃/셔플을 시드로 고정
+            with torch.random.fork_rng(devices=[]):
+                torch.manual_seed(config.seed)
+                metrics = self._run_training(features, labels, config, progress_callback)
+        metrics["seconds"] = time.perf_counter() - started
+        self.training_metrics = metrics
+        self._fingerprint = None
+        self._backend = None
+
+    def _run_training(self, features: np.ndarray, labels: np.ndarray, config: TrainingConfig,
+                      progress_callback=None) -> Dict:
+        import torch
+        import torch.nn as nn
+        import torch.optim as optim
+        from torch.utils.data import DataLoader, TensorDataset
+        from models.study_plan_net import StudyPlanNet
+
+        features = torch.from_numpy(features)
+        labels = torch.from_numpy(labels)
+        n_samples = len(labels)
+
+        # 검증 데이터 분리 (val_fraction > 0 이면 검증 손실로 조기 종료/학습률 조정)
+        val_features = val_labels = None
+        if config.val_fraction > 0 and n_samples >= 2:
+            order = torch.randperm(n_samples)
+            n_val = min(max(int(n_samples * config.val_fraction), 1), n_samples - 1)
+            val_idx, train_idx = order[:n_val], order[n_val:]
+            val_features, val_labels = features[val_idx], labels[val_idx]
+            features, labels = features[train_idx], labels[train_idx]
 
         # 모델 초기화
-        input_dim = dataset.features.shape[1]
+        input_dim = features.shape[1]
         self.model = StudyPlanNet(input_dim=input_dim)
 
         # 손실 함수와 옵티마이저
         criterion = nn.CrossEntropyLoss()
-        optimizer = optim.Adam(self.model.parameters(), lr=lr)
+        optimizer = optim.Adam(self.model.parameters(), lr=config.lr)
+        scheduler = None
+        if config.lr_patience is not None:
+            scheduler = optim.lr_scheduler.ReduceLROnPlateau(
+                optimizer, factor=config.lr_factor, patience=config.lr_patience,
+                threshold=config.min_delta, threshold_mode='abs')
+
+        # 전체 배치이면 매 epoch 같은 텐서를 그대로 사용
+        if config.batch_size is None or config.batch_size >= len(labels):
+            batches = [(features, labels)]
+        else:
+            batches = DataLoader(TensorDataset(features, labels), batch_size=config.batch_size, shuffle=True)
 
         # 훈련
-        self.model.train()
-        for epoch in range(epochs):
-            optimizer.zero_grad()
-
-            outputs = self.model(dataset.features)
-            loss = criterion(outputs, dataset.labels)
+        best_loss, best_state, bad_epochs = float("inf"), None, 0
+        epochs_run, epoch_loss, val_loss = 0, None, None
+        for epoch in range(config.epochs):
+            self.model.train()
+            total = 0.0
+            for batch_features, batch_labels in batches:
+                optimizer.zero_grad()
+
+                outputs = self.model(batch_features)
+                loss = criterion(outputs, batch_labels)
+
+                loss.backward()
+                optimizer.step()
+                total += loss.item() * len(batch_labels)
+            epochs_run = epoch + 1
+            epoch_loss = total / len(labels)
+
+            monitored = epoch_loss
+            if val_features is not None:
+                self.model.eval()
+                with torch.no_grad():
+                    val_loss = monitored = criterion(self.model(val_features), val_labels).item()
+            if scheduler is not None:
+                scheduler.step(monitored)
+
+            if progress_callback:
+                progress_callback("training", epoch=epochs_run, epochs=config.epochs, loss=epoch_loss)
+
+            if epochs_run % 20 == 0:
+                print(f'Epoch [{epochs_run}/{config.epochs}], Loss: {epoch_loss:.4f}')
+
+            # 조기 종료: patience epoch 동안 min_delta 이상 개선이 없으면 가장 좋았던 가중치로 되돌리고 중단
+            if config.patience is not None:
+                if monitored < best_loss - config.min_delta:
+                    best_loss, bad_epochs = monitored, 0
+                    best_state = {name: tensor.detach().clone() for name, tensor in self.model.state_dict().items()}
+                else:
+                    bad_epochs += 1
+                    if bad_epochs >= config.patience:
+                        break
+
+        if best_state is not None:
+            self.model.load_state_dict(best_state)
+        self.model.eval()
+        with torch.no_grad():
+            accuracy = (torch.argmax(self.model(features), dim=1) == labels).float().mean().item()
+        return {
+            "epochs": epochs_run,
+            "max_epochs": config.epochs,
+            "stopped_early": epochs_run < config.epochs,
+            "final_loss": epoch_loss,
+            "best_loss": best_loss if best_state is not None else None,
+            "val_loss": val_loss,
+            "final_lr": optimizer.param_groups[0]["lr"],
+            "train_accuracy": accuracy,
+            "n_samples": n_samples,
+            "batch_size": config.batch_size,
+            "seed": config.seed,
+        }
 
-            loss.backward()
-            optimizer.step()
+    def fingerprint(self) -> str:
+        """모델 가중치의 해시 (캐시 키 등에서 모델 버전 구분용)"""
+        if not self.model:
+            return ""
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for name, tensor in self.model.state_dict().items():
+                digest.update(name.encode("utf-8"))
+                digest.update(to_numpy(tensor).tobytes())
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def with_inputs(self, subjects: List[Dict], timetable_slots: List[Tuple]) -> 'StudyPlanGenerator':
+        """
+        훈련된 모델과 시간표 특성 캐시를 공유하면서 다른 입력으로 예측하는 생성기 반환 (재훈련 없음)
+        """
+        if not self.model:
+            raise ValueError("모델이 훈련되지 않았습니다.")
 
-            if (epoch + 1) % 20 == 0:
-                print(f'Epoch [{epoch+1}/{epochs}], Loss: {loss.item():.4f}')
+        planner = StudyPlanGenerator(backend=self.backend, n_threads=self.n_threads)
+        planner.model = self.model
+        planner._fingerprint = self.fingerprint()
+        if self._backend is None:
+            self._backend = create_backend(self.backend, self.model, self.n_threads)
+        planner._backend = self._backend
+        planner.feature_cache = self.feature_cache
+        planner.subjects = subjects
+        planner.timetable_slots = to_slots(timetable_slots)
+        return planner
 
     def predict_study_priorities(self) -> List[Dict]:
         """
@@ -259,21 +525,48 @@ class StudyPlanGenerator:
         if not self.model:
             raise ValueError("모델이 훈련되지 않았습니다.")
 
-        dataset = StudyPlanDataset(self.subjects, self.timetable_slots)
+        dataset = StudyPlanDataset(self.subjects, self.timetable_slots, self.feature_cache)
+        outputs = self._infer(dataset.features)
 
-        self.model.eval()
-        with torch.no_grad():
-            outputs = self.model(dataset.features)
-            priorities = torch.argmax(outputs, dim=1).tolist()
-            confidence_scores = torch.max(outputs, dim=1)[0].tolist()
+        return self._build_priorities(self.subjects, outputs)
+
+    def predict_study_priorities_batch(self, inputs: List[Tuple[List[Dict], List[Tuple]]]) -> List[List[Dict]]:
+        """
+        여러 사용자의 학습 우선순위를 한 번의 forward 로 예측
+
+        Args:
+            inputs: [(subjects, timetable_slots), ...]
+
+        Returns:
+            사용자별 우선순위 리스트 (입력 순서 유지)
+        """
+        if not self.model:
+            raise ValueError("모델이 훈련되지 않았습니다.")
+
+        features = [StudyPlanDataset(subjects, timetable_slots, self.feature_cache).features
+                    for subjects, timetable_slots in inputs if subjects]
+        if not features:
+            return [[] for _ in inputs]
+
+        outputs = self._infer(np.concatenate(features))
+
+        results = []
+        offset = 0
+        for subjects, _ in inputs:
+            results.append(self._build_priorities(subjects, outputs[offset:offset + len(subjects)]))
+            offset += len(subjects)
+        return results
 
-        priority_names = ["매우 높음", "높음", "보통", "낮음", "매우 낮음"]
+    def _build_priorities(self, subjects: List[Dict], outputs: np.ndarray) -> List[Dict]:
+        """모델 출력(softmax)을 우선순위 결과로 변환"""
+        priorities = np.argmax(outputs, axis=1).tolist()
+        confidence_scores = np.max(outputs, axis=1).tolist()
 
         results = []
-        for i, subject in enumerate(self.subjects):
+        for i, subject in enumerate(subjects):
             results.append({
                 'subject_name': subject['name'],
-                'priority': priority_names[priorities[i]],
+                'priority': PRIORITY_NAMES[priorities[i]],
                 'priority_score': priorities[i],
                 'confidence': confidence_scores[i],
                 'weight': subject.get('weight', 1.0),
@@ -285,84 +578,56 @@ class StudyPlanGenerator:
 
         return results
 
-    def generate_weekly_schedule(self) -> Dict:
+    def generate_weekly_schedule(self, priorities: List[Dict] = None, solver: str = "greedy") -> Dict:
         """
-        주간 학습 계획 생성
+        주간 학습 계획 생성 (priorities 가 주어지면 예측을 다시 하지 않음)
+
+        Args:
+            solver: "greedy" - 요일마다 우선순위 순으로 하루 학습 시간 배정
+                    "optimal" - 과목별 주간 목표를 요일 상한, 최소 블록 길이, 복습일 선호를
+                                지키며 최소 비용 유량으로 배정
+
+        각 항목의 blocks 는 실제로 배치된 공강 구간 [{'start_time', 'end_time'}] 이다.
         """
-        priorities = self.predict_study_priorities()
-
-        # 시간대별 학습 시간 분배
-        time_allocation = {
-            "매우 높음": 3.0,  # 시간
-            "높음": 2.5,
-            "보통": 2.0,
-            "낮음": 1.5,
-            "매우 낮음": 1.0
-        }
+        if solver not in SOLVERS:
+            raise ValueError(f"지원하지 않는 배정 방식입니다: {solver}")
+        if priorities is None:
+            priorities = self.predict_study_priorities()
+
+        allocator = WeeklyAllocator(self.timetable_slots, [p['subject_name'] for p in priorities])
+        daily_hours = [STUDY_HOURS_BY_PRIORITY[p['priority']] for p in priorities]
+        if solver == "optimal":
+            allocation = allocator.solve(
+                weekly_hours=[hours * WEEKLY_STUDY_DAYS for hours in daily_hours],
+                daily_hours=daily_hours,
+                weights=[len(PRIORITY_NAMES) - PRIORITY_NAMES.index(p['priority']) for p in priorities])
+            blocks = allocator.place(allocation, unit_minutes=UNIT_MINUTES)
+        else:
+            allocation = allocator.allocate(daily_hours)
+            blocks = allocator.place(allocation)
 
         weekly_schedule = {}
-        days = ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"]
-
-        for day in days:
+        for day_index, day in enumerate(DAY_NAMES):
             daily_schedule = []
 
-            # 해당 요일의 공강시간 찾기
-            free_slots = []
-            for slot in self.timetable_slots:
-                if slot[0] == "공강" and slot[2] == day:
-                    start_minutes = self._time_to_minutes(slot[3])
-                    end_minutes = self._time_to_minutes(slot[4])
-                    duration = (end_minutes - start_minutes) / 60.0
-
-                    if duration >= 1.0:  # 1시간 이상의 공강시간만
-                        free_slots.append({
-                            'start_time': slot[3],
-                            'end_time': slot[4],
-                            'duration': duration
-                        })
-
-            # 우선순위별로 학습시간 배정
-            allocated_time = 0
-            for priority_info in priorities:
-                subject_name = priority_info['subject_name']
-                priority = priority_info['priority']
-                study_time_needed = time_allocation[priority]
-
-                # 해당 과목의 수업이 있는 날인지 확인
-                has_class_today = any(
-                    slot[0] == "수업" and slot[1] == subject_name and slot[2] == day
-                    for slot in self.timetable_slots
-                )
-
-                # 수업이 있는 날은 복습 시간 추가, 없는 날은 예습 시간
-                study_type = "복습" if has_class_today else "예습"
-
-                # 남은 공강시간에서 학습시간 할당
-                remaining_time = sum(slot['duration'] for slot in free_slots) - allocated_time
-                actual_study_time = min(study_time_needed, remaining_time)
-
-                if actual_study_time > 0:
-                    daily_schedule.append({
-                        'subject': subject_name,
-                        'study_type': study_type,
-                        'duration': actual_study_time,
-                        'priority': priority,
-                        'recommended_materials': self._get_study_materials(subject_name, study_type)
-                    })
-                    allocated_time += actual_study_time
+            # 공강시간이 남은 과목만 우선순위 순으로 (수업이 있는 날은 복습, 없는 날은 예습)
+            for i in np.flatnonzero(allocation[day_index] > 0).tolist():
+                priority_info = priorities[i]
+                study_type = "복습" if allocator.has_class[day_index, i] else "예습"
+                daily_schedule.append({
+                    'subject': priority_info['subject_name'],
+                    'study_type': study_type,
+                    'duration': float(allocation[day_index, i]),
+                    'priority': priority_info['priority'],
+                    'recommended_materials': self._get_study_materials(priority_info['subject_name'], study_type),
+                    'blocks': [{'start_time': format_time(start), 'end_time': format_time(end)}
+                               for start, end in blocks[day_index][i]]
+                })
 
             weekly_schedule[day] = daily_schedule
 
         return weekly_schedule
 
-    def _time_to_minutes(self, time_str: str) -> int:
-        """시간 문자열을 분으로 변환"""
-        try:
-            h, m = map(int, time_str.split(':'))
-            return h * 60 + m
-        except:
-            return 0
-
     def _get_study_materials(self, subject_name: str, study_type: str) -> List[str]:
         """과목별 추천 학습 자료"""
         materials = {
@@ -381,60 +646,209 @@ class StudyPlanGenerator:
         }
         return materials.get(study_type, [])
 
-    def save_model(self, path: str):
-        """모델 저장"""
+    def model_config(self) -> Dict:
+        """가중치 파일과 함께 저장하는 설정 (차원, 특성 스키마). 사용자 데이터는 포함하지 않는다."""
         if not self.model:
             raise ValueError("저장할 모델이 없습니다.")
-
-        torch.save({
-            'model_state_dict': self.model.state_dict(),
+        return {
+            'format': CHECKPOINT_FORMAT,
             'input_dim': self.model.input_dim,
             'hidden_dim': self.model.hidden_dim,
             'output_dim': self.model.output_dim,
-            'subjects': self.subjects,
-            'timetable_slots': self.timetable_slots
-        }, path)
+            'feature_schema': FEATURE_SCHEMA_HASH,
+        }
+
+    def save_weights(self, path):
+        """텐서만 담은 state_dict 저장 (path 는 파일 경로 또는 쓰기용 바이너리 파일 객체)"""
+        import torch
+
+        if not self.model:
+            raise ValueError("저장할 모델이 없습니다.")
+        state_dict = self.model.state_dict()
+        if isinstance(self.model, NumpyStudyPlanNet):
+            state_dict = {name: torch.from_numpy(array.copy()) for name, array in state_dict.items()}
+        torch.save(state_dict, path)
+
+    def save_numpy_weights(self, path):
+        """torch 없이 읽을 수 있는 .npz 가중치 저장 (path 는 파일 경로 또는 쓰기용 바이너리 파일 객체)"""
+        if not self.model:
+            raise ValueError("저장할 모델이 없습니다.")
+        create_backend("numpy", self.model).model.save(path)
+
+    def save_model(self, path: str):
+        """모델 저장: 가중치는 path (.npz 이면 save_numpy_weights), 설정은 사이드카 JSON(<이름>.json)"""
+        config = self.model_config()
+        if path.endswith(".npz"):
+            self.save_numpy_weights(path)
+        else:
+            self.save_weights(path)
+        with open(config_path(path), 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+
+    def load_model(self, path: str, config: Dict = None):
+        """
+        모델 로드
 
-    def load_model(self, path: str):
-        """모델 로드"""
-        checkpoint = torch.load(path, map_location='cpu')
+        Args:
+            config: model_config() 형식의 설정. 없으면 사이드카 JSON 을 읽고,
+                    사이드카도 없으면 이전 형식(설정과 가중치를 함께 담은 단일 파일)으로 읽는다.
 
+        .npz 가중치(save_numpy_weights)는 torch 없이 NumpyStudyPlanNet 으로 불러온다.
+        """
+        if config is None and os.path.exists(config_path(path)):
+            with open(config_path(path), 'r', encoding='utf-8') as f:
+                config = json.load(f)
+
+        if path.endswith(".npz"):
+            if config is None or config.get('format') != CHECKPOINT_FORMAT:
+                raise ValueError("지원하지 않는 체크포인트 형식입니다.")
+            self._check_schema(config)
+            self.model = NumpyStudyPlanNet.load(path, config['input_dim'], config['hidden_dim'], config['output_dim'])
+            self._loaded()
+            return
+
+        import torch
+        from models.study_plan_net import StudyPlanNet
+
+        if config is not None and 'format' in config:
+            if config['format'] != CHECKPOINT_FORMAT:
+                raise ValueError("지원하지 않는 체크포인트 형식입니다.")
+            # 텐서만 역직렬화하고 파일을 메모리 매핑 (임의 객체 unpickle 없음)
+            state_dict = torch.load(path, map_location='cpu', weights_only=True, mmap=True)
+        else:
+            try:
+                config = torch.load(path, map_location='cpu', weights_only=True)
+            except Exception as e:
+                raise ValueError(f"지원하지 않는 체크포인트 형식입니다: {e}")
+            if not isinstance(config, dict) or 'model_state_dict' not in config:
+                raise ValueError("지원하지 않는 체크포인트 형식입니다.")
+            state_dict = config['model_state_dict']
+
+        self._check_schema(config)
         self.model = StudyPlanNet(
-            input_dim=checkpoint['input_dim'],
-            hidden_dim=checkpoint['hidden_dim'],
-            output_dim=checkpoint['output_dim']
+            input_dim=config['input_dim'],
+            hidden_dim=config['hidden_dim'],
+            output_dim=config['output_dim']
         )
-        self.model.load_state_dict(checkpoint['model_state_dict'])
-        self.subjects = checkpoint['subjects']
-        self.timetable_slots = checkpoint['timetable_slots']
+        self.model.load_state_dict(state_dict, assign=True)
+        self.model.eval()
+        self._loaded()
+
+    @staticmethod
+    def _check_schema(config: Dict):
+        schema = config.get('feature_schema')
+        if (schema is not None and schema != FEATURE_SCHEMA_HASH) or config.get('input_dim') != len(FEATURE_NAMES):
+            raise ValueError("체크포인트의 특성 스키마가 현재 버전과 다릅니다. 재훈련이 필요합니다.")
+
+    def _loaded(self):
+        self._fingerprint = None
+        self._backend = None
+        self.subjects = []
+        self.timetable_slots = []
 
 # 사용 예시 함수
-def create_study_plan(subjects_data: List[Dict], timetable_slots: List[Tuple]) -> Dict:
+def create_study_plan(subjects_data: List[Dict], timetable_slots: List[Tuple],
+                      planner: StudyPlanGenerator = None, progress_callback=None,
+                      solver: str = "greedy") -> Dict:
     """
     학습 계획 생성 메인 함수
 
     Args:
         subjects_data: [{'name': '과목명', 'weight': 중요도(1-10), 'major': 전공여부(0/1)}]
         timetable_slots: [(타입, 과목명, 요일, 시작시간, 종료시간, 교수명, 강의실)]
+        planner: 미리 훈련된 생성기. 주어지면 재훈련 없이 추론만 수행
+        progress_callback: (stage, **info) 진행 상황 콜백 ("training", "predicting", "scheduling")
+        solver: 주간 학습 시간 배정 방식 ("greedy" 또는 "optimal", generate_weekly_schedule 참고)
 
     Returns:
         학습 계획 딕셔너리
     """
-    # 학습 계획 생성기 초기화
-    planner = StudyPlanGenerator()
+    if planner is not None and planner.model is not None:
+        # 미리 로드된 모델로 추론만 수행
+        planner = planner.with_inputs(subjects_data, timetable_slots)
+    else:
+        # 학습 계획 생성기 초기화
+        planner = StudyPlanGenerator()
 
-    # 모델 훈련
-    print("인공신경망 모델 훈련 중...")
-    planner.train_model(subjects_data, timetable_slots, epochs=100)
+        # 모델 훈련
+        print("인공신경망 모델 훈련 중...")
+        planner.train_model(subjects_data, timetable_slots, epochs=100, progress_callback=progress_callback)
 
     # 학습 우선순위 예측
     print("학습 우선순위 분석 중...")
+    if progress_callback:
+        progress_callback("predicting")
     priorities = planner.predict_study_priorities()
 
     # 주간 학습 계획 생성
     print("주간 학습 계획 생성 중...")
-    weekly_schedule = planner.generate_weekly_schedule()
+    if progress_callback:
+        progress_callback("scheduling")
+    weekly_schedule = planner.generate_weekly_schedule(priorities, solver=solver)
+
+    return _build_study_plan(subjects_data, priorities, weekly_schedule)
+
+def create_study_plans_batch(inputs: List[Tuple[List[Dict], List[Tuple]]],
+                             planner: StudyPlanGenerator, solver: str = "greedy") -> List[Dict]:
+    """
+    여러 사용자(예: 학기 전체 코호트)의 학습 계획을 한 번에 생성
+
+    우선순위는 훈련된 planner 로 한 번의 배치 forward 로 예측하고,
+    주간 계획은 사용자별로 배정한다.
 
+    Args:
+        inputs: [(subjects_data, timetable_slots), ...]
+        planner: 훈련된 생성기
+        solver: 주간 학습 시간 배정 방식 ("greedy" 또는 "optimal")
+
+    Returns:
+        사용자별 학습 계획 딕셔너리 리스트 (입력 순서 유지)
+    """
+    all_priorities = planner.predict_study_priorities_batch(inputs)
+
+    plans = []
+    for (subjects_data, timetable_slots), priorities in zip(inputs, all_priorities):
+        weekly_schedule = planner.with_inputs(subjects_data, timetable_slots).generate_weekly_schedule(priorities, solver=solver)
+        plans.append(_build_study_plan(subjects_data, priorities, weekly_schedule))
+    return plans
+
+def compute_plan_stats(priorities: List[Dict], weekly_schedule: Dict) -> Dict:
+    """
+    결과 페이지 통계 (계획 생성 시 한 번 계산해 plan["stats"] 로 저장)
+
+    Returns:
+        {'version', 'total_study_hours', 'daily_study_hours': {요일: 시간},
+         'subject_weekly_hours': {과목: 시간}, 'average_confidence'}
+    """
+    total_study_hours = 0
+    daily_study_hours = {}
+    subject_weekly_hours = {}
+    for day, schedule_items in weekly_schedule.items():
+        daily_hours = sum(item.get('duration', 0) for item in schedule_items)
+        daily_study_hours[day] = daily_hours
+        total_study_hours += daily_hours
+        for item in schedule_items:
+            subject = item.get('subject')
+            if subject:
+                subject_weekly_hours[subject] = subject_weekly_hours.get(subject, 0) + item.get('duration', 0)
+
+    confidences = [p.get('confidence', 0) for p in priorities if p.get('confidence') is not None]
+    return {
+        'version': PLAN_STATS_VERSION,
+        'total_study_hours': total_study_hours,
+        'daily_study_hours': daily_study_hours,
+        'subject_weekly_hours': subject_weekly_hours,
+        'average_confidence': sum(confidences) / len(confidences) if confidences else 0,
+    }
+
+def plan_stats(plan: Dict) -> Dict:
+    """저장된 계획의 통계. 없거나 버전이 다르면(이전 캐시 등) 다시 계산"""
+    stats = plan.get('stats')
+    if stats is None or stats.get('version') != PLAN_STATS_VERSION:
+        stats = compute_plan_stats(plan.get('priorities') or [], plan.get('weekly_schedule') or {})
+    return stats
+
+def _build_study_plan(subjects_data: List[Dict], priorities: List[Dict], weekly_schedule: Dict) -> Dict:
     return {
         'priorities': priorities,
         'weekly_schedule': weekly_schedule,
@@ -442,16 +856,18 @@ def create_study_plan(subjects_data: List[Dict], timetable_slots: List[Tuple]) -
             'total_subjects': len(subjects_data),
             'major_subjects': sum(1 for s in subjects_data if s.get('major', 0)),
             'high_priority_subjects': sum(1 for p in priorities if p['priority'] in ['매우 높음', '높음'])
-        }
+        },
+        'stats': compute_plan_stats(priorities, weekly_schedule),
     }
 
 # Flask 앱과의 통합을 위한 함수
 def train_model_for_web(subjects_data: List[Dict], timetable_slots: List[Tuple],
-                        model_path: str = "models/study_plan_model.pt") -> StudyPlanGenerator:
+                        model_path: str = "models/study_plan_model.pt",
+                        progress_callback=None) -> StudyPlanGenerator:
     """
     웹 앱용 모델 훈련 함수
     """
     planner = StudyPlanGenerator()
-    planner.train_model(subjects_data, timetable_slots)
+    planner.train_model(subjects_data, timetable_slots, progress_callback=progress_callback)
     planner.save_model(model_path)
     return planner
\ No newline at end of file
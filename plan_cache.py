@@ -0,0 +1,209 @@
+"""
+학습 계획 결과 캐시
+
+정규화한 과목 목록 + 시간표 슬롯 + 모델 지문 + 배정 방식(solver)의 해시를 키로 create_study_plan 결과를 저장한다.
+메모리(LRU, 개수 제한)와 선택적인 디스크(JSON 파일, 용량 제한) 2단계로 구성된다.
+디스크 파일의 크기와 사용 순서는 메모리 인덱스로 관리하므로 쓰기/통계 조회 때 디렉터리를 훑지 않는다.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def make_plan_key(subjects, timetable_slots, model_fingerprint="", solver="greedy"):
+    """입력, 모델, 배정 방식에 대한 안정적인 해시 키 생성 (과목 순서는 결과에 영향을 주므로 유지)"""
+    normalized = {
+        "subjects": [
+            [str(s.get("name", "")).strip(), float(s.get("weight", 1.0)), float(s.get("major", 0.0))]
+            for s in subjects
+        ],
+        "slots": [[str(v) for v in slot] for slot in timetable_slots],
+        "model": model_fingerprint,
+        "solver": solver,
+    }
+    payload = json.dumps(normalized, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """
+    2단계(메모리 LRU + 디스크) 학습 계획 캐시
+
+    반환되는 결과는 캐시와 공유되므로 호출 측에서 수정하지 않는다.
+
+    Args:
+        max_entries: 메모리에 보관할 최대 결과 수
+        disk_dir: 디스크 캐시 디렉터리 (None 이면 메모리만 사용)
+        max_disk_bytes: 디스크 캐시 최대 용량 (초과 시 오래 사용하지 않은 파일부터 삭제)
+        rescan_every: 디스크 쓰기 이 횟수마다 디렉터리를 다시 읽어 인덱스를 맞춤
+                      (같은 디렉터리를 쓰는 다른 프로세스의 파일 반영)
+    """
+    def __init__(self, max_entries=256, disk_dir=None, max_disk_bytes=64 * 1024 * 1024, rescan_every=1000):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.rescan_every = rescan_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # 디스크 인덱스: 키 -> 파일 크기 (오래 사용하지 않은 순서)
+        self._disk_index = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_writes = 0
+        self._disk_lock = threading.Lock()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._put_memory(key, value)
+        self._write_disk(key, value)
+
+    def get_or_create(self, key, create_fn):
+        """캐시에 있으면 반환, 없으면 create_fn() 결과를 저장 후 반환"""
+        value = self.get(key)
+        if value is None:
+            value = create_fn()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        for path, _, _ in self._disk_files():
+            os.remove(path)
+        if self.disk_dir:
+            self._load_disk_index()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            data = {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+        if self.disk_dir:
+            with self._disk_lock:
+                data["disk_entries"] = len(self._disk_index)
+                data["disk_bytes"] = self._disk_bytes
+            data["max_disk_bytes"] = self.max_disk_bytes
+        return data
+
+    def _put_memory(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+                size = os.fstat(f.fileno()).st_size
+            os.utime(path)  # 재시작 후에도 LRU 순서를 유지하도록 수정 시각 갱신
+        except (OSError, ValueError):
+            # 없는 파일, 다른 프로세스가 지웠거나 손상된 파일
+            self._forget_disk(key)
+            return None
+        with self._disk_lock:
+            # 다른 프로세스가 쓴 파일이면 인덱스에 추가
+            self._disk_bytes += size - self._disk_index.pop(key, 0)
+            self._disk_index[key] = size
+        return value
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+                f.flush()
+                size = os.fstat(f.fileno()).st_size
+            os.replace(tmp_path, self._disk_path(key))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"계획 캐시 저장 실패: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._disk_lock:
+            self._disk_bytes += size - self._disk_index.pop(key, 0)
+            self._disk_index[key] = size
+            self._disk_writes += 1
+            rescan = self.rescan_every and self._disk_writes % self.rescan_every == 0
+        if rescan:
+            self._load_disk_index()
+        self._evict_disk()
+
+    def _disk_files(self):
+        """(경로, 크기, 수정 시각) 목록 (디렉터리 전체를 읽으므로 인덱스 재구성에만 사용)"""
+        if not self.disk_dir:
+            return []
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((entry.path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _load_disk_index(self):
+        """디렉터리를 한 번 읽어 수정 시각 순서로 인덱스 구성"""
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        index = OrderedDict((os.path.basename(path)[:-len(".json")], size) for path, size, _ in files)
+        with self._disk_lock:
+            self._disk_index = index
+            self._disk_bytes = sum(index.values())
+
+    def _forget_disk(self, key):
+        with self._disk_lock:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+
+    def _evict_disk(self):
+        """용량을 넘으면 인덱스에서 가장 오래 사용하지 않은 파일부터 삭제"""
+        while True:
+            with self._disk_lock:
+                if self._disk_bytes <= self.max_disk_bytes or not self._disk_index:
+                    return
+                key, size = self._disk_index.popitem(last=False)
+                self._disk_bytes -= size
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
@@ -0,0 +1,183 @@
+"""
+서버 측 학습 계획 세션 저장소
+
+생성한 학습 계획(주간 일정, 우선순위, 사용한 시간표 슬롯)을 서버에 저장하고
+쿠키 세션에는 계획 id 만 남긴다. 요청마다 큰 서명 쿠키를 주고받거나 검증하지 않고,
+브라우저 쿠키 크기 제한(약 4KB)에도 걸리지 않는다.
+    - MemoryPlanSessionStore: 프로세스 내 LRU + TTL (단일 프로세스용)
+    - SqlitePlanSessionStore: SQLite(WAL) 파일 (여러 워커 프로세스가 공유, 기본값)
+
+만료(TTL)는 저장 시각 기준이며, 만료된 계획은 조회되지 않고 저장할 때 주기적으로 정리된다.
+반환되는 dict 는 저장소(메모리)와 공유될 수 있으므로 호출 측에서 수정하지 않는다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def new_plan_id() -> str:
+    return uuid.uuid4().hex
+
+
+class PlanSessionStore(ABC):
+    """저장소 공통 부분 (하위 클래스는 get / put / delete / __len__ 구현)"""
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, found):
+        with self._stats_lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @abstractmethod
+    def get(self, plan_id: str) -> Optional[dict]:
+        """저장된 계획. 없거나 만료되었으면 None"""
+
+    @abstractmethod
+    def put(self, plan: dict, plan_id: Optional[str] = None) -> str:
+        """계획 저장 후 id 반환 (plan_id 를 주면 같은 id 로 덮어씀)"""
+
+    @abstractmethod
+    def delete(self, plan_id: str):
+        """계획 삭제 (없으면 아무 일도 하지 않음)"""
+
+    @abstractmethod
+    def __len__(self):
+        """만료되지 않은 계획 수"""
+
+    def stats(self):
+        with self._stats_lock:
+            return {"hits": self.hits, "misses": self.misses, "stored": len(self)}
+
+
+class MemoryPlanSessionStore(PlanSessionStore):
+    """
+    프로세스 내 LRU + TTL 저장소
+
+    Args:
+        max_entries: 보관할 최대 계획 수 (초과 시 가장 오래 사용하지 않은 계획부터 삭제)
+    """
+    def __init__(self, max_entries=4096, ttl=DEFAULT_TTL):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, plan_id):
+        with self._lock:
+            entry = self._entries.get(plan_id)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[plan_id]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(plan_id)
+        self._count(entry is not None)
+        return entry[1] if entry is not None else None
+
+    def put(self, plan, plan_id=None):
+        plan_id = plan_id or new_plan_id()
+        with self._lock:
+            self._entries[plan_id] = (time.time() + self.ttl, plan)
+            self._entries.move_to_end(plan_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return plan_id
+
+    def delete(self, plan_id):
+        with self._lock:
+            self._entries.pop(plan_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SqlitePlanSessionStore(PlanSessionStore):
+    """
+    SQLite(WAL) 계획 저장소
+
+    스레드마다 연결을 하나씩 사용한다 (user_store.SqliteUserStore 와 같은 방식).
+
+    Args:
+        purge_every: 저장 이 횟수마다 만료된 계획 삭제
+    """
+    def __init__(self, path, ttl=DEFAULT_TTL, timeout=10.0, purge_every=256):
+        super().__init__(ttl)
+        self.path = path
+        self.timeout = timeout
+        self.purge_every = purge_every
+        self._puts = 0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS plan_sessions ("
+            " plan_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS plan_sessions_expires ON plan_sessions (expires_at)")
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, plan_id):
+        row = self._connection().execute(
+            "SELECT data FROM plan_sessions WHERE plan_id = ? AND expires_at > ?",
+            (plan_id, time.time())).fetchone()
+        self._count(row is not None)
+        return json.loads(row[0]) if row else None
+
+    def put(self, plan, plan_id=None):
+        plan_id = plan_id or new_plan_id()
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO plan_sessions (plan_id, data, expires_at) VALUES (?, ?, ?)",
+                (plan_id, json.dumps(plan, ensure_ascii=False, separators=(",", ":")), now + self.ttl))
+            self._puts += 1
+            if self._puts % self.purge_every == 0:
+                conn.execute("DELETE FROM plan_sessions WHERE expires_at <= ?", (now,))
+        return plan_id
+
+    def delete(self, plan_id):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM plan_sessions WHERE plan_id = ?", (plan_id,))
+
+    def __len__(self):
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM plan_sessions WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+
+
+PLAN_SESSION_STORES = {"sqlite": SqlitePlanSessionStore, "memory": MemoryPlanSessionStore}
+
+
+def open_plan_session_store(backend, location=None, **kwargs) -> PlanSessionStore:
+    """backend: "sqlite" (location = DB 파일) 또는 "memory" (location 사용 안 함)"""
+    if backend not in PLAN_SESSION_STORES:
+        raise ValueError(f"지원하지 않는 세션 저장소입니다: {backend}")
+    if backend == "memory":
+        return MemoryPlanSessionStore(**kwargs)
+    return SqlitePlanSessionStore(location, **kwargs)
@@ -0,0 +1,212 @@
+"""
+전체 시간표 화면(/show_full_schedule)용 격자 엔진
+
+요일 × 시간 칸의 고정 2차원 배열에 수업과 AI 학습 블록을 배치한다.
+    - 수업: 시작/종료 시각에서 칸 번호를 바로 계산 (O(1))
+    - 학습 블록: 배정된 시각(blocks)이 있으면 그 칸에 바로 배치하고, 없으면
+      칸마다 "여기서부터 이어지는 빈 칸 수 / 찬 칸 수" 를 유지해
+      다음 빈 칸과 연속 빈 칸 길이를 O(1) 로 조회
+해상도(칸 길이)와 하루 범위를 바꿔도 칸 수에 비례하는 시간만 든다.
+"""
+from typing import Dict, List
+
+from timetable import CLASS, DAY_NAMES, Slot, format_time, parse_time
+
+DEFAULT_RESOLUTION = 30
+COVERED = "covered"
+
+SUBJECT_COLORS = (
+    "#FFB3BA", "#FFDFBA", "#FFFFBA", "#BAFFC9", "#BAE1FF", "#E0BBE4",
+    "#FFBEB1", "#FDFD96", "#BDE4A7", "#A7CEE2", "#D7B0E0", "#FFCBAE",
+    "#F6A7B0", "#FDD09C", "#F9F871", "#AEDEA0", "#A4C8E0", "#CAA7D9",
+)
+
+
+class ScheduleGrid:
+    """
+    주간 시간표 격자
+
+    Args:
+        day_start, day_end: 표시할 하루 범위 (자정 기준 분, [day_start, day_end))
+        resolution: 칸 길이(분)
+        days: 표시할 요일 이름 (0=월요일 순서)
+    """
+    def __init__(self, day_start: int = 9 * 60, day_end: int = 21 * 60,
+                 resolution: int = DEFAULT_RESOLUTION, days=DAY_NAMES):
+        if resolution <= 0:
+            raise ValueError("칸 길이는 0보다 커야 합니다.")
+        if day_start > day_end:
+            raise ValueError("하루 시작 시각이 종료 시각보다 늦습니다.")
+        self.day_start = day_start
+        self.resolution = resolution
+        self.days = list(days)
+        self.day_index = {day: i for i, day in enumerate(self.days)}
+        self.minutes = list(range(day_start, day_end, resolution))
+        self.time_labels = [format_time(minutes) for minutes in self.minutes]
+        self.n_cells = len(self.minutes)
+
+        # cells[d][i]: None(빈 칸) / 항목 dict(블록 시작 칸) / COVERED(블록에 포함된 칸)
+        self.cells = [[None] * self.n_cells for _ in self.days]
+        # free_run[d][i]: i 부터 이어지는 빈 칸 수, busy_run[d][i]: i 부터 이어지는 찬 칸 수
+        self.free_run = [list(range(self.n_cells, 0, -1)) for _ in self.days]
+        self.busy_run = [[0] * self.n_cells for _ in self.days]
+
+        self._colors = {}
+        # 격자에 한 칸도 표시하지 못한 학습 블록 (범위 밖이거나 칸이 모두 차 있는 경우)
+        self.unplaced = []
+
+    def color_for(self, subject_name: str) -> str:
+        """과목별 색상 (처음 등장한 순서대로 팔레트 배정)"""
+        color = self._colors.get(subject_name)
+        if color is None:
+            color = self._colors[subject_name] = SUBJECT_COLORS[len(self._colors) % len(SUBJECT_COLORS)]
+        return color
+
+    def _floor_index(self, minutes: int) -> int:
+        """minutes 를 포함하는 칸 번호 (범위 밖이면 0 또는 n_cells 로 자름)"""
+        index = (minutes - self.day_start) // self.resolution
+        return min(max(index, 0), self.n_cells)
+
+    def _ceil_index(self, minutes: int) -> int:
+        """minutes 이상인 첫 칸 번호 (범위 밖이면 0 또는 n_cells 로 자름)"""
+        index = -(-(minutes - self.day_start) // self.resolution)
+        return min(max(index, 0), self.n_cells)
+
+    def next_free(self, d: int, i: int) -> int:
+        """i 이후 첫 빈 칸 번호 (없으면 n_cells)"""
+        if i < self.n_cells:
+            return i + self.busy_run[d][i]
+        return self.n_cells
+
+    def _occupy(self, d: int, i: int, length: int, item: dict):
+        """[i, i + length) 칸을 item 블록으로 채우고 연속 길이 정보를 갱신"""
+        cells, free_run, busy_run = self.cells[d], self.free_run[d], self.busy_run[d]
+        end = min(i + length, self.n_cells)
+        cells[i] = item
+        for j in range(i + 1, end):
+            cells[j] = COVERED
+        for j in range(i, end):
+            free_run[j] = 0
+
+        # 블록과 바로 앞의 찬 칸 / 빈 칸 구간만 다시 계산
+        j = end - 1
+        following = busy_run[end] if end < self.n_cells else 0
+        while j >= 0 and free_run[j] == 0:
+            busy_run[j] = following = following + 1
+            j -= 1
+        following = 0
+        while j >= 0 and free_run[j] > 0:
+            free_run[j] = following = following + 1
+            j -= 1
+
+    def place_class(self, slot: Slot) -> bool:
+        """
+        수업 슬롯 배치. 시작 칸이 이미 차 있거나 범위 밖이면 배치하지 않는다.
+
+        Returns:
+            배치 여부
+        """
+        if slot.kind != CLASS or not 0 <= slot.day < len(self.days):
+            return False
+        start_idx = self._ceil_index(slot.start)
+        end_idx = self._ceil_index(slot.end)
+        if start_idx >= end_idx or self.cells[slot.day][start_idx] is not None:
+            return False
+        self._occupy(slot.day, start_idx, end_idx - start_idx, {
+            "type": "class", "subject_name": slot.name,
+            "professor": slot.professor, "place": slot.place,
+            "start_time": slot.start_str, "end_time": slot.end_str,
+            "rowspan": end_idx - start_idx, "color": self.color_for(slot.name),
+        })
+        return True
+
+    def _cells_needed(self, task: dict) -> int:
+        return int(float(task.get('duration', 0)) * (60 / self.resolution))
+
+    def _study_color(self, task: dict) -> str:
+        # 예습/복습 블록에만 과목 색상 적용
+        study_type = task.get('study_type', '').lower()
+        if '예습' in study_type or '복습' in study_type:
+            return self.color_for(task['subject'])
+        return "transparent"
+
+    def _study_item(self, task: dict, start_time: str, end_time: str, rowspan: int) -> dict:
+        return {
+            "type": "study",
+            "subject_name": task['subject'],
+            "place": f"{task.get('study_type', '공강 자습')}",
+            "start_time": start_time,
+            "end_time": end_time,
+            "rowspan": rowspan,
+            "color": self._study_color(task),
+        }
+
+    def _place_study_block(self, d: int, task: dict, block: dict) -> bool:
+        """
+        배정된 [start_time, end_time) 구간이 걸친 칸들(시작 칸 내림, 종료 칸 올림) 중 빈 칸에 배치
+
+        칸보다 짧거나 칸 경계에서 시작하지 않는 블록도 최소 한 칸을 차지한다.
+        수업과 칸을 나눠 쓰는 경우 남은 빈 칸들에 나누어 놓는다.
+
+        Returns:
+            한 칸 이상 배치했는지 여부 (못 했으면 self.unplaced 에 기록)
+        """
+        start, end = parse_time(block.get('start_time')), parse_time(block.get('end_time'))
+        if start is None or end is None or start >= end:
+            return False
+        end_idx = self._ceil_index(end)
+        i = self.next_free(d, self._floor_index(start))
+        placed = False
+        while i < end_idx:
+            fill = min(end_idx - i, self.free_run[d][i])
+            self._occupy(d, i, fill, self._study_item(task, block['start_time'], block['end_time'], fill))
+            placed = True
+            i = self.next_free(d, i + fill)
+        if not placed:
+            self.unplaced.append({"day": self.days[d], "subject": task.get('subject'),
+                                  "start_time": block['start_time'], "end_time": block['end_time']})
+        return placed
+
+    def place_study_tasks(self, weekly_schedule: Dict[str, List[dict]]):
+        """
+        요일별 AI 학습 과제 배치
+
+        과제에 blocks(배정된 공강 구간)가 있으면 그 시각에 그대로 놓고,
+        없으면(이전 형식의 계획) 앞쪽 빈 칸부터 순서대로 채운다.
+        연속 빈 칸이 부족하면 과제를 나누어 다음 빈 구간에 이어서 배치한다.
+        """
+        for d, day in enumerate(self.days):
+            tasks = [dict(task) for task in weekly_schedule.get(day) or ()]
+            if any('blocks' in task for task in tasks):
+                for task in tasks:
+                    for block in task.get('blocks') or ():
+                        self._place_study_block(d, task, block)
+                continue
+
+            task_idx = 0
+            i = self.next_free(d, 0)
+            while i < self.n_cells and task_idx < len(tasks):
+                task = tasks[task_idx]
+                needed = self._cells_needed(task)
+                if needed <= 0:
+                    task_idx += 1
+                    if task_idx >= len(tasks):
+                        break
+                    task = tasks[task_idx]
+                    needed = self._cells_needed(task)
+                    if needed <= 0:
+                        i = self.next_free(d, i + 1)
+                        continue
+
+                fill = min(needed, self.free_run[d][i])
+                end_time = format_time(self.minutes[i + fill - 1] + self.resolution)
+                self._occupy(d, i, fill, self._study_item(task, self.time_labels[i], end_time, fill))
+                task['duration'] = float(task.get('duration', 0)) - fill * self.resolution / 60.0
+                if task['duration'] < 0.01:
+                    task_idx += 1
+                i = self.next_free(d, i + fill)
+
+    def to_template_grid(self) -> Dict[str, Dict[str, object]]:
+        """템플릿용 {"HH:MM": {요일: 칸}} 형식"""
+        return {label: {day: self.cells[d][i] for d, day in enumerate(self.days)}
+                for i, label in enumerate(self.time_labels)}
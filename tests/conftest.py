@@ -0,0 +1,105 @@
+"""
+테스트 공용 설정
+
+StubEverytimeServer: EverytimeClient(base_url=...) 로 붙일 수 있는 로컬 가짜 Everytime 서버.
+요청마다 미리 넣어 둔 응답을 차례로 돌려주고(없으면 기본 응답), 받은 요청을 기록한다.
+run_app_import: 임시 디렉터리를 데이터 경로로 지정한 별도 프로세스에서 app 을 import 하고 코드 실행
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TIMETABLE_XML = (
+    '<response><table year="2025" semester="1">'
+    '<subject id="1"><name value="자료구조"/><professor value="김교수"/>'
+    '<time value="월 09:00-10:30"><data day="0" starttime="108" endtime="126" place="공학관"/></time>'
+    '</subject></table></response>'
+)
+
+
+class StubEverytimeServer:
+    """
+    Args:
+        delay: 응답마다 기다리는 시간(초) (동시 요청 수 측정용)
+    """
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.responses = []  # [(status, body, headers)] - 앞에서부터 하나씩 사용
+        self.default = (200, TIMETABLE_XML, {"ETag": '"v1"'})
+        self.requests = []   # [{"identifier", "headers", "time"}]
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                with stub._lock:
+                    stub.requests.append({"identifier": form.get("identifier", [None])[0],
+                                          "headers": dict(self.headers), "time": time.monotonic()})
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    status, body, headers = stub.responses.pop(0) if stub.responses else stub.default
+                try:
+                    if stub.delay:
+                        time.sleep(stub.delay)
+                    payload = body.encode("utf-8")
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Type", "text/xml; charset=utf-8")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubEverytimeServer()
+    yield server
+    server.stop()
+
+
+def run_app_import(tmp_path, code):
+    env = dict(os.environ,
+               STUDY_PLAN_BACKEND="numpy",
+               STUDY_PLAN_MODEL_PATH=str(tmp_path / "missing.pt"),
+               MODEL_REGISTRY_DIR=str(tmp_path / "registry"),
+               PLAN_CACHE_DIR=str(tmp_path / "plan_cache"),
+               PLAN_SESSION_STORE="memory",
+               SUBJECT_STORE="sqlite",
+               SUBJECT_STORE_LOCATION=str(tmp_path / "subjects.sqlite3"))
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    # 마지막 줄에 출력한 JSON 결과
+    return json.loads(result.stdout.strip().splitlines()[-1])
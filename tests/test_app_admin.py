@@ -0,0 +1,27 @@
+"""모델 레지스트리 관리 API: 로그인하지 않으면 401, 관리자가 아니면 403"""
+from conftest import run_app_import
+
+ADMIN_CHECK = """
+import json
+import app
+
+app.ADMIN_USERS = frozenset({"admin"})
+results = {}
+for user in (None, "student", "admin"):
+    client = app.app.test_client()
+    if user:
+        with client.session_transaction() as sess:
+            sess["username"] = user
+    results[user or "anonymous"] = [client.get("/model_registry").status_code,
+                                    client.post("/model_registry/activate", data={"version": "v9999"}).status_code]
+print(json.dumps(results))
+"""
+
+
+def test_model_registry_endpoints_require_admin(tmp_path):
+    results = run_app_import(tmp_path, ADMIN_CHECK)
+
+    assert results["anonymous"] == [401, 401]
+    assert results["student"] == [403, 403]
+    # 관리자: 목록 조회 성공, 없는 버전 활성화는 400
+    assert results["admin"] == [200, 400]
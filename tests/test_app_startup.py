@@ -0,0 +1,55 @@
+"""app 시작: numpy 백엔드는 빈 레지스트리에서도 torch 를 import 하지 않는다 (별도 프로세스에서 확인)"""
+from conftest import run_app_import
+
+STARTUP_CHECK = """
+import json, sys
+import app
+print(json.dumps({"torch_loaded": "torch" in sys.modules,
+                  "has_model": app.model_registry.current_planner() is not None
+                               or app.get_study_planner() is not None,
+                  "published": app.model_registry.versions()}))
+"""
+
+
+def test_empty_registry_startup_does_not_import_torch(tmp_path):
+    state = run_app_import(tmp_path, STARTUP_CHECK)
+
+    # 배포용 기본 모델은 레지스트리에 게시하지 않고 읽기 전용으로 사용
+    assert state == {"torch_loaded": False, "has_model": True, "published": []}
+
+
+def test_plan_returns_503_without_any_model(tmp_path):
+    state = run_app_import(tmp_path, """
+import json
+import app
+
+app.BUNDLED_MODEL_PATH = app.BUNDLED_MODEL_PATH + ".missing"
+app._bundled_planner = None
+form = {"timetable_slots": "[]", "subjects_json": json.dumps([{"name": "자료구조", "weight": 80}])}
+client = app.app.test_client()
+html = client.post("/plan", data=form)
+api = client.post("/plan", data=form, headers={"Accept": "application/json"})
+print(json.dumps({"html": html.status_code, "json": api.status_code, "jobs": len(app.plan_jobs._jobs),
+                  "published": app.model_registry.versions()}))
+""")
+
+    # 요청 안에서 훈련하지 않고 바로 503
+    assert state == {"html": 503, "json": 503, "jobs": 0, "published": []}
+
+
+def test_numpy_registry_publishes_without_torch(tmp_path):
+    state = run_app_import(tmp_path, """
+import json, os, sys
+from model_registry import ModelRegistry
+from models.study_plan_nn import StudyPlanGenerator
+import app
+
+registry = ModelRegistry(app.MODEL_REGISTRY_DIR, check_interval=0)
+version = registry.publish(StudyPlanGenerator(app.BUNDLED_MODEL_PATH))
+reloaded = ModelRegistry(app.MODEL_REGISTRY_DIR, check_interval=0).current_planner()
+print(json.dumps({"torch_loaded": "torch" in sys.modules,
+                  "files": sorted(os.listdir(os.path.join(app.MODEL_REGISTRY_DIR, version))),
+                  "same_model": reloaded.fingerprint() == registry.current_planner().fingerprint()}))
+""")
+
+    assert state == {"torch_loaded": False, "files": ["meta.json", "model.npz"], "same_model": True}
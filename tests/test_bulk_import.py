@@ -0,0 +1,77 @@
+"""bulk_import: 동시 요청 수(semaphore)와 호스트별 요청 간격(rate limiter) 상한"""
+import asyncio
+import os
+import time
+
+from bulk_import import HostRateLimiter, fetch_timetables, import_timetables
+from conftest import StubEverytimeServer
+from everytime import EverytimeClient
+
+
+async def collect(identifiers, client, concurrency, rate):
+    return [item async for item in fetch_timetables(identifiers, client, concurrency, rate)]
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    async def run():
+        limiter = HostRateLimiter(rate=20)
+        times = {"a": [], "b": []}
+
+        async def hit(host):
+            await limiter.acquire(host)
+            times[host].append(time.monotonic())
+
+        await asyncio.gather(*(hit(host) for host in ("a", "b") for _ in range(5)))
+        return times
+
+    times = asyncio.run(run())
+    for host_times in times.values():
+        host_times.sort()
+        gaps = [b - a for a, b in zip(host_times, host_times[1:])]
+        assert min(gaps) >= 0.05 - 0.005
+    # 호스트끼리는 서로 기다리지 않음
+    assert abs(times["a"][0] - times["b"][0]) < 0.03
+
+
+def test_rate_limiter_disabled_without_rate():
+    async def run():
+        limiter = HostRateLimiter(rate=0)
+        started = time.monotonic()
+        for _ in range(100):
+            await limiter.acquire("a")
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.05
+
+
+def test_fetch_respects_concurrency_limit():
+    server = StubEverytimeServer(delay=0.1)
+    try:
+        client = EverytimeClient(base_url=server.base_url, cache_ttl=0, pool_maxsize=3)
+        results = asyncio.run(collect([f"id{i}" for i in range(12)], client, concurrency=3, rate=0))
+    finally:
+        server.stop()
+
+    assert len(results) == 12 and all(error is None for _, _, error in results)
+    assert len(server.requests) == 12
+    assert server.max_active == 3
+
+
+def test_fetch_respects_host_rate(stub_server):
+    client = EverytimeClient(base_url=stub_server.base_url, cache_ttl=0)
+    asyncio.run(collect([f"id{i}" for i in range(6)], client, concurrency=6, rate=20))
+
+    times = sorted(request["time"] for request in stub_server.requests)
+    assert len(times) == 6
+    assert times[-1] - times[0] >= 5 / 20 - 0.01
+
+
+def test_import_reports_failures_per_identifier(stub_server, tmp_path):
+    stub_server.responses = [(200, "<response><error>없음</error></response>", {})]
+    client = EverytimeClient(base_url=stub_server.base_url, cache_ttl=0, retries=0)
+    summary = import_timetables(["bad", "good"], str(tmp_path), fmt="json", client=client,
+                                concurrency=1, rate=0)
+
+    assert summary["succeeded"] == 1
+    assert list(summary["failed"]) == ["bad"]
+    assert os.path.exists(summary["outputs"]["good"])
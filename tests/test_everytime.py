@@ -0,0 +1,87 @@
+"""EverytimeClient: 재시도, TTL/ETag 재사용, 실패 시 캐시 사용 (로컬 가짜 서버 대상)"""
+import time
+
+import pytest
+import requests
+
+from everytime import EverytimeClient
+from conftest import TIMETABLE_XML
+
+
+def make_client(server, **kwargs):
+    kwargs.setdefault("backoff_factor", 0)
+    kwargs.setdefault("timeout", (1, 2))
+    return EverytimeClient(base_url=server.base_url, **kwargs)
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_on_rate_limit_and_server_errors(stub_server, status):
+    stub_server.responses = [(status, "<error/>", {}), (status, "<error/>", {})]
+    client = make_client(stub_server, retries=2)
+
+    assert client.get_timetable("abc") == TIMETABLE_XML
+    assert len(stub_server.requests) == 3
+    assert stub_server.requests[0]["identifier"] == "abc"
+
+
+def test_gives_up_after_retries_without_cache(stub_server):
+    stub_server.responses = [(503, "<error>busy</error>", {})] * 3
+    client = make_client(stub_server, retries=1)
+
+    assert "<error>" in client.get_timetable("abc")
+    assert len(stub_server.requests) == 2
+    assert client.cache_stats()["entries"] == 0
+
+
+def test_ttl_cache_skips_request(stub_server):
+    client = make_client(stub_server, cache_ttl=60)
+
+    assert client.get_timetable("abc") == TIMETABLE_XML
+    assert client.get_timetable("abc") == TIMETABLE_XML
+    assert len(stub_server.requests) == 1
+    assert client.cache_stats()["hits"] == 1
+
+
+def test_expired_entry_is_revalidated_with_etag(stub_server):
+    client = make_client(stub_server, cache_ttl=0.05)
+    client.get_timetable("abc")
+    time.sleep(0.1)
+
+    stub_server.responses = [(304, "", {"ETag": '"v1"'})]
+    assert client.get_timetable("abc") == TIMETABLE_XML
+    assert stub_server.requests[-1]["headers"].get("If-None-Match") == '"v1"'
+    assert client.cache_stats()["revalidated"] == 1
+    # 재검증 후에는 다시 TTL 동안 요청하지 않음
+    client.cache_ttl = 60
+    client.get_timetable("abc")
+    assert len(stub_server.requests) == 2
+
+
+def test_force_refresh_sends_unconditional_request(stub_server):
+    client = make_client(stub_server, cache_ttl=60)
+    client.get_timetable("abc")
+    client.get_timetable("abc", force_refresh=True)
+
+    assert len(stub_server.requests) == 2
+    assert "If-None-Match" not in stub_server.requests[-1]["headers"]
+
+
+def test_serves_stale_copy_when_server_keeps_failing(stub_server):
+    client = make_client(stub_server, cache_ttl=0.05, retries=1)
+    client.get_timetable("abc")
+    time.sleep(0.1)
+
+    stub_server.responses = [(503, "<error>busy</error>", {})] * 2
+    assert client.get_timetable("abc") == TIMETABLE_XML
+    assert len(stub_server.requests) == 3
+
+
+def test_serves_stale_copy_when_server_is_down(stub_server):
+    client = make_client(stub_server, cache_ttl=0.05, retries=0)
+    client.get_timetable("abc")
+    time.sleep(0.1)
+    stub_server.stop()
+
+    assert client.get_timetable("abc") == TIMETABLE_XML
+    with pytest.raises(requests.RequestException):
+        client.get_timetable("other")
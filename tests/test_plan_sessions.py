@@ -0,0 +1,45 @@
+"""plan_sessions: 메모리/SQLite 저장소 저장·조회·만료, 저장소 인터페이스"""
+import pytest
+
+from plan_sessions import PlanSessionStore, open_plan_session_store
+
+PLAN = {"weekly_schedule": {"월": []}, "priorities": [], "summary": {}, "timetable_slots": []}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return open_plan_session_store(request.param, str(tmp_path / "plans.sqlite3"), ttl=60)
+
+
+def test_put_get_delete(store):
+    plan_id = store.put(PLAN)
+
+    assert store.get(plan_id) == PLAN
+    assert store.put({**PLAN, "summary": {"total_subjects": 1}}, plan_id) == plan_id
+    assert store.get(plan_id)["summary"] == {"total_subjects": 1}
+    assert len(store) == 1
+    store.delete(plan_id)
+    assert store.get(plan_id) is None
+
+
+def test_expired_plan_is_not_returned(store):
+    store.ttl = -1
+    plan_id = store.put(PLAN)
+
+    assert store.get(plan_id) is None
+    assert len(store) == 0
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class NoLenStore(PlanSessionStore):
+        def get(self, plan_id):
+            return None
+
+        def put(self, plan, plan_id=None):
+            return plan_id
+
+        def delete(self, plan_id):
+            pass
+
+    with pytest.raises(TypeError):
+        NoLenStore()
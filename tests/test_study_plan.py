@@ -0,0 +1,37 @@
+"""학습 계획 생성: 과목이 없는 입력 (배포용 기본 모델, numpy 백엔드)"""
+import os
+
+import pytest
+
+from models.study_plan_nn import FEATURE_NAMES, StudyPlanDataset, StudyPlanGenerator, create_study_plan, create_study_plans_batch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SLOTS = [("수업", "자료구조", "월", "09:00", "10:30", "김교수", "공학관")]
+SUBJECTS = [{"name": "자료구조", "weight": 9.0, "major": 1.0}]
+
+
+@pytest.fixture(scope="module")
+def planner():
+    return StudyPlanGenerator(os.path.join(ROOT, "models", "model.npz"))
+
+
+def test_empty_subjects_have_two_dimensional_features():
+    features = StudyPlanDataset([], SLOTS).features
+
+    assert features.shape == (0, len(FEATURE_NAMES))
+
+
+def test_empty_subjects_give_empty_plan(planner):
+    plan = create_study_plan([], SLOTS, planner=planner)
+
+    assert plan["priorities"] == []
+    assert all(items == [] for items in plan["weekly_schedule"].values())
+    assert plan["summary"]["total_subjects"] == 0
+    assert plan["stats"]["total_study_hours"] == 0
+
+
+def test_batch_with_empty_subjects(planner):
+    plans = create_study_plans_batch([([], SLOTS), (SUBJECTS, SLOTS), ([], [])], planner)
+
+    assert [len(plan["priorities"]) for plan in plans] == [0, 1, 0]
+    assert plans[1]["priorities"][0]["subject_name"] == "자료구조"
@@ -0,0 +1,47 @@
+"""user_store: JSON 파일 저장소의 키 인코딩 (서로 다른 키가 같은 파일을 쓰지 않음), 저장소 인터페이스"""
+import os
+
+import pytest
+
+from user_store import JsonFileUserStore, UserStore, decode_user_key, encode_user_key
+
+SLOTS = [["수업", "자료구조", "월", "09:00", "10:30", "김교수", "공학관"]]
+
+
+@pytest.mark.parametrize("user_key", ["user:a", "user_a", "anon:0f3c", "user:../../etc", "user:김철수", ""])
+def test_user_key_encoding_round_trips(user_key):
+    name = encode_user_key(user_key)
+
+    assert decode_user_key(name) == user_key
+    assert os.sep not in name and not name.startswith(".")
+
+
+def test_keys_that_sanitize_alike_do_not_collide(tmp_path):
+    store = JsonFileUserStore(str(tmp_path))
+    store.put("user:a", SLOTS, [{"name": "자료구조"}])
+    store.put("user_a", [], [{"name": "운영체제"}])
+
+    fresh = JsonFileUserStore(str(tmp_path))
+    assert fresh.get("user:a") == (SLOTS, [{"name": "자료구조"}])
+    assert fresh.get("user_a") == ([], [{"name": "운영체제"}])
+    assert fresh.user_keys() == ["user:a", "user_a"]
+
+
+def test_user_keys_skips_foreign_files(tmp_path):
+    store = JsonFileUserStore(str(tmp_path))
+    store.put("user:a", SLOTS)
+    (tmp_path / "notes.json").write_text("{}", encoding="utf-8")
+
+    assert store.user_keys() == ["user:a"]
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class NoKeysStore(UserStore):
+        def get(self, user_key):
+            return [], []
+
+        def put(self, user_key, timetable_slots, subjects=None):
+            pass
+
+    with pytest.raises(TypeError):
+        NoKeysStore()
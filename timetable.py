@@ -0,0 +1,113 @@
+"""
+시간표 데이터 모델
+
+슬롯(수업/공강)과 과목을 요일은 정수(0=월요일 ... 6=일요일), 시각은 자정 기준 분으로 저장한다.
+"HH:MM" 문자열 파싱은 입력 시점(Convert, JSON 역직렬화)에 한 번만 한다.
+
+JSON/세션에서 쓰는 기존 형식(wire format)과의 변환:
+    슬롯: ["수업", 과목명, "월요일", "09:00", "10:15", 교수명, 강의실]
+    과목: {"name", "professor", "info": [{"day": "0", "place", "startAt", "endAt"}]}
+"""
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+DAY_NAMES = ("월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일")
+DAY_INDEX = {name: i for i, name in enumerate(DAY_NAMES)}
+
+CLASS = "수업"
+FREE = "공강"
+
+
+def parse_time(time_str) -> Optional[int]:
+    """"HH:MM" -> 자정 기준 분 (형식 오류 시 None)"""
+    try:
+        h, m = map(int, time_str.split(':'))
+        return h * 60 + m
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def format_time(minutes: int) -> str:
+    """자정 기준 분 -> "HH:MM\""""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class Slot(NamedTuple):
+    """시간표 한 칸 (수업 또는 공강)"""
+    kind: str           # CLASS / FREE
+    name: str
+    day: int            # 0=월요일 ... 6=일요일, 알 수 없는 요일은 -1
+    start: int          # 자정 기준 분
+    end: int
+    professor: str = ""
+    place: str = ""
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    @property
+    def day_name(self) -> str:
+        return DAY_NAMES[self.day] if 0 <= self.day < len(DAY_NAMES) else ""
+
+    @property
+    def start_str(self) -> str:
+        return format_time(self.start)
+
+    @property
+    def end_str(self) -> str:
+        return format_time(self.end)
+
+    def to_wire(self) -> list:
+        return [self.kind, self.name, self.day_name, self.start_str, self.end_str, self.professor, self.place]
+
+    @classmethod
+    def from_wire(cls, row) -> Optional["Slot"]:
+        """JSON 형식의 슬롯(5개 또는 7개 항목)을 변환. 이미 Slot 이면 그대로 반환"""
+        if isinstance(row, Slot):
+            return row
+        if len(row) < 5:
+            return None
+        return cls(
+            row[0], row[1], DAY_INDEX.get(row[2], -1),
+            parse_time(row[3]) or 0, parse_time(row[4]) or 0,
+            row[5] if len(row) > 5 else "",
+            row[6] if len(row) > 6 else "",
+        )
+
+
+class Subject(NamedTuple):
+    """과목과 그 수업 슬롯들"""
+    name: str
+    professor: str
+    sessions: Tuple[Slot, ...]
+
+    def to_wire(self) -> dict:
+        return {
+            "name": self.name,
+            "professor": self.professor,
+            "info": [{
+                "day": str(slot.day) if slot.day >= 0 else None,
+                "place": slot.place,
+                "startAt": slot.start_str,
+                "endAt": slot.end_str,
+            } for slot in self.sessions],
+        }
+
+
+def to_slots(rows: Iterable) -> List[Slot]:
+    """JSON 형식 또는 Slot 이 섞인 목록을 Slot 목록으로 변환 (형식이 맞지 않는 항목은 제외)"""
+    slots = []
+    for row in rows:
+        slot = Slot.from_wire(row)
+        if slot is not None:
+            slots.append(slot)
+    return slots
+
+
+def slots_to_wire(slots: Iterable) -> List[list]:
+    return [slot.to_wire() if isinstance(slot, Slot) else list(slot) for slot in slots]
+
+
+def sort_slots(slots: List[Slot]) -> List[Slot]:
+    """요일, 시작 시각 순 (같은 시각이면 공강 먼저)"""
+    return sorted(slots, key=lambda s: (s.day if s.day >= 0 else len(DAY_NAMES), s.start, 0 if s.kind == FREE else 1))
@@ -0,0 +1,233 @@
+"""
+오프라인 학습 계획 모델 훈련
+
+웹 앱의 사용자 데이터 저장소(user_store: SQLite / 사용자별 JSON) 또는
+사용자별 데이터 파일(subject_datas 형식: {"timetable_slots": [...], "subjects": [...]})을 샤드로 보고
+프로세스 풀에서 병렬로 특성을 추출한 뒤, torch CPU 스레드를 모두 사용해 하나의 모델을 훈련하고
+모델 레지스트리에 새 버전으로 게시한다. 실행 중인 웹 서버는 CURRENT 변경을 감지해 새 버전을 사용한다.
+
+경로를 주지 않으면 웹 앱과 같은 저장소(SUBJECT_STORE, 기본 subject_datas/subject_datas.sqlite3)를 읽는다.
+
+사용 예:
+    python train_offline.py --workers 8
+    python train_offline.py --store json --store-location subject_datas/users
+    python train_offline.py subject_datas/subject_datas.sqlite3 other/*.json
+    python train_offline.py users/*.json --batch-size 256 --patience 10 --no-activate
+    python train_offline.py --synthetic 2000 --patience 20 --output models/model.npz   # 배포용 기본 모델
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model_registry import ModelRegistry
+from free_time import FreeTimeIndex
+from models.study_plan_nn import StudyPlanDataset, StudyPlanGenerator, TrainingConfig
+from timetable import CLASS, Slot, slots_to_wire, sort_slots
+from user_store import DEFAULT_STORE_LOCATIONS, USER_STORES, open_user_store
+
+SQLITE_SUFFIXES = (".sqlite3", ".sqlite", ".db")
+DEFAULT_REGISTRY_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "models", "registry")
+
+
+def find_shards(paths):
+    """파일과 디렉터리(안의 *.json) 목록을 정렬된 샤드 파일 목록으로 (SQLite 저장소 파일 포함)"""
+    shards = []
+    for path in paths:
+        if os.path.isdir(path):
+            shards.extend(glob.glob(os.path.join(path, "*.json")))
+        else:
+            shards.append(path)
+    return sorted(set(shards))
+
+
+def store_users(backend, location=None):
+    """
+    사용자 데이터 저장소의 모든 사용자 [(user_key, timetable_slots, subjects)]
+
+    Raises:
+        FileNotFoundError: 저장소가 없는 경우 (빈 저장소를 새로 만들지 않음)
+    """
+    location = location or DEFAULT_STORE_LOCATIONS[backend]
+    if not os.path.exists(location):
+        raise FileNotFoundError(f"사용자 데이터 저장소가 없습니다: {location} ({backend})")
+    return list(open_user_store(backend, location).items())
+
+
+def expand_sources(shards):
+    """샤드 목록의 SQLite 저장소 파일을 사용자별 항목으로 펼침 (JSON 파일은 그대로)"""
+    sources = []
+    for shard in shards:
+        if shard.endswith(SQLITE_SUFFIXES):
+            sources.extend(store_users("sqlite", shard))
+        else:
+            sources.append(shard)
+    return sources
+
+
+def load_shard(source):
+    """
+    샤드 하나의 특성/라벨 추출 (워커 프로세스에서 실행)
+
+    Args:
+        source: JSON 파일 경로 또는 저장소의 (user_key, timetable_slots, subjects)
+
+    Returns:
+        (이름, features, labels, error) - 실패하거나 과목이 없으면 features 는 None
+    """
+    if isinstance(source, str):
+        name = source
+    else:
+        name, timetable_slots, subjects = source
+    try:
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            subjects, timetable_slots = data.get("subjects"), data.get("timetable_slots")
+        if not subjects:
+            return name, None, None, None
+        dataset = StudyPlanDataset(subjects, timetable_slots or [])
+        return name, dataset.features, dataset.labels, None
+    except Exception as e:
+        return name, None, None, str(e)
+
+
+def synthetic_users(n_users, seed=0):
+    """
+    배포용 기본 모델을 위한 합성 사용자 데이터 [(subjects, timetable_slots)]
+
+    중요도 1-10 과 전공 여부를 고르게 섞어 다섯 우선순위 라벨이 모두 나오게 하고,
+    시간표는 과목마다 평일 0-2 회 수업 + 남는 공강으로 만든다.
+    """
+    rng = random.Random(seed)
+    users = []
+    for user in range(n_users):
+        subjects, class_slots = [], []
+        for i in range(rng.randint(3, 8)):
+            name = f"과목{user}-{i}"
+            subjects.append({"name": name, "weight": float(rng.randint(1, 10)), "major": float(rng.random() < 0.4)})
+            # 일부 과목은 시간표에 수업이 없는 경우 (직접 입력한 과목 등)
+            for day in rng.sample(range(5), rng.choice((0, 1, 1, 2, 2))):
+                start = rng.randrange(9 * 60, 17 * 60, 30)
+                class_slots.append(Slot(CLASS, name, day, start, start + rng.choice((50, 75, 90, 150))))
+        slots = sort_slots(class_slots + FreeTimeIndex(class_slots).free_slot_rows())
+        users.append((subjects, slots_to_wire(slots)))
+    return users
+
+
+def extract_features(shards, workers=None):
+    """
+    모든 샤드의 특성을 병렬로 추출해 이어 붙인다 (workers=0 이면 현재 프로세스에서 순서대로)
+
+    Returns:
+        (features, labels, stats)
+    """
+    if workers == 0:
+        results = map(load_shard, shards)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(len(shards) // ((workers or os.cpu_count() or 1) * 4), 1)
+        results = executor.map(load_shard, shards, chunksize=chunksize)
+
+    features, labels = [], []
+    stats = {"shards": len(shards), "used": 0, "empty": 0, "failed": 0}
+    try:
+        for path, shard_features, shard_labels, error in results:
+            if error is not None:
+                stats["failed"] += 1
+                print(f"샤드 로드 실패 ({path}): {error}")
+            elif shard_features is None:
+                stats["empty"] += 1
+            else:
+                stats["used"] += 1
+                features.append(shard_features)
+                labels.append(shard_labels)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if not features:
+        return np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.int64), stats
+    return np.concatenate(features), np.concatenate(labels), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="사용자별 데이터로 학습 계획 모델 오프라인 훈련")
+    parser.add_argument("paths", nargs="*",
+                        help="사용자 데이터 파일, 디렉터리 또는 SQLite 저장소 파일 (기본: 웹 앱의 사용자 데이터 저장소)")
+    parser.add_argument("--store", choices=sorted(USER_STORES), default=None,
+                        help="사용자 데이터 저장소에서 읽기 (경로를 주지 않으면 SUBJECT_STORE 또는 sqlite)")
+    parser.add_argument("--store-location", type=str, default=None,
+                        help="저장소 위치 (sqlite: DB 파일, json: 디렉터리, 기본: 웹 앱과 같은 위치)")
+    parser.add_argument("--synthetic", type=int, default=0, help="사용자 데이터 대신 합성 사용자 N 명으로 훈련")
+    parser.add_argument("--output", type=str, default=None,
+                        help="레지스트리에 게시하지 않고 체크포인트 파일로 저장 (.npz 이면 torch 없이 로드 가능)")
+    parser.add_argument("--workers", type=int, default=None, help="특성 추출 프로세스 수 (기본: CPU 수, 0: 단일 프로세스)")
+    parser.add_argument("--threads", type=int, default=None, help="훈련에 사용할 torch 스레드 수 (기본: CPU 수)")
+    parser.add_argument("--registry", type=str, default=DEFAULT_REGISTRY_DIR, help="모델 레지스트리 디렉터리")
+    parser.add_argument("--no-activate", action="store_true", help="게시만 하고 현재 버전으로 바꾸지 않음")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--lr", type=float, default=0.01)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--patience", type=int, default=10)
+    parser.add_argument("--lr-patience", type=int, default=4)
+    parser.add_argument("--val-fraction", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.synthetic:
+        datasets = [StudyPlanDataset(subjects, slots) for subjects, slots in synthetic_users(args.synthetic, args.seed)]
+        features = np.concatenate([dataset.features for dataset in datasets])
+        labels = np.concatenate([dataset.labels for dataset in datasets])
+        stats = {"shards": args.synthetic, "used": args.synthetic, "empty": 0, "failed": 0}
+    else:
+        try:
+            if args.store or not args.paths:
+                backend = args.store or os.environ.get("SUBJECT_STORE", "sqlite")
+                source_desc = f"{backend} 저장소 {args.store_location or DEFAULT_STORE_LOCATIONS[backend]}"
+                sources = store_users(backend, args.store_location)
+            else:
+                source_desc = ", ".join(args.paths)
+                sources = expand_sources(find_shards(args.paths))
+        except (FileNotFoundError, ValueError) as e:
+            parser.error(str(e))
+        if not sources:
+            parser.error(f"훈련 데이터가 없습니다: {source_desc}")
+        features, labels, stats = extract_features(sources, args.workers)
+        if not len(labels):
+            parser.error(f"훈련할 과목 데이터가 없습니다: {source_desc} "
+                         f"(사용자 {stats['shards']}명 중 과목 있음 {stats['used']}, 실패 {stats['failed']})")
+    extract_seconds = time.perf_counter() - started
+    print(f"특성 추출: 샤드 {stats['used']}/{stats['shards']}개 (빈 샤드 {stats['empty']}, 실패 {stats['failed']}), "
+          f"샘플 {len(labels):,}개, {extract_seconds:.2f}s")
+
+    import torch
+
+    torch.set_num_threads(args.threads or os.cpu_count() or 1)
+    config = TrainingConfig(epochs=args.epochs, lr=args.lr, batch_size=args.batch_size, patience=args.patience,
+                            val_fraction=args.val_fraction, lr_patience=args.lr_patience, seed=args.seed)
+    planner = StudyPlanGenerator()
+    planner.train_on_features(features, labels, config=config)
+    metrics = dict(planner.training_metrics, shards=stats["used"], extract_seconds=extract_seconds)
+    print(f"훈련: epoch {metrics['epochs']}/{metrics['max_epochs']}, 손실 {metrics['final_loss']:.4f}, "
+          f"정확도 {metrics['train_accuracy']:.1%}, {metrics['seconds']:.2f}s (스레드 {torch.get_num_threads()})")
+
+    if args.output:
+        planner.save_model(args.output)
+        print(f"모델 저장: {args.output}")
+        return
+
+    registry = ModelRegistry(args.registry)
+    version = registry.publish(planner, metrics=metrics, activate=not args.no_activate)
+    print(f"모델 게시: {version}{'' if args.no_activate else ' (현재 버전)'}")
+
+
+if __name__ == '__main__':
+    main()
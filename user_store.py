@@ -0,0 +1,245 @@
+"""
+사용자별 시간표/과목 데이터 저장소
+
+사용자 키마다 (timetable_slots, subjects) 를 저장한다.
+    - SqliteUserStore: SQLite(WAL 모드) 한 파일에 사용자별 행으로 저장 (기본값)
+    - JsonFileUserStore: 사용자별 JSON 파일 (이전 subject_datas 형식과 호환)
+
+쓰기는 원자적이며(SQLite 트랜잭션 / 임시 파일 + os.replace) 읽기는 프로세스 내 LRU 캐시를 거친다.
+캐시는 이 프로세스의 쓰기에서 바로 갱신되고, 다른 스레드/프로세스의 쓰기는
+SQLite 행의 revision / JSON 파일의 수정 시각으로 사용자별로 감지해 그 사용자만 다시 읽는다.
+반환되는 리스트는 캐시와 공유되므로 호출 측에서 수정하지 않는다.
+"""
+import base64
+import binascii
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
+
+from timetable import slots_to_wire
+
+EMPTY = ([], [])
+
+DEFAULT_DATA_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "subject_datas")
+# 웹 앱(SUBJECT_STORE)과 train_offline.py 가 함께 쓰는 기본 저장 위치
+DEFAULT_STORE_LOCATIONS = {
+    "sqlite": os.path.join(DEFAULT_DATA_DIR, "subject_datas.sqlite3"),
+    "json": os.path.join(DEFAULT_DATA_DIR, "users"),
+}
+
+
+class UserStore(ABC):
+    """저장소 공통 부분: 읽기 캐시 (하위 클래스는 get / put / user_keys 구현)"""
+    def __init__(self, max_cached=1024):
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_get(self, user_key, stamp=None):
+        with self._lock:
+            entry = self._cache.get(user_key)
+            if entry is not None and entry[0] == stamp:
+                self._cache.move_to_end(user_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return None
+
+    def _cache_put(self, user_key, value, stamp=None):
+        with self._lock:
+            self._cache[user_key] = (stamp, value)
+            self._cache.move_to_end(user_key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    @abstractmethod
+    def get(self, user_key: str) -> Tuple[List, List]:
+        """(timetable_slots, subjects). 저장된 데이터가 없으면 ([], [])"""
+
+    @abstractmethod
+    def put(self, user_key: str, timetable_slots, subjects: Optional[List] = None):
+        """사용자 데이터 저장 (Slot 은 JSON 형식으로 변환)"""
+
+    @abstractmethod
+    def user_keys(self) -> List[str]:
+        """저장된 사용자 키 목록 (정렬됨)"""
+
+    def items(self) -> Iterator[Tuple[str, List, List]]:
+        """모든 사용자의 (user_key, timetable_slots, subjects) (재훈련 등 일괄 처리용)"""
+        for user_key in self.user_keys():
+            timetable_slots, subjects = self.get(user_key)
+            yield user_key, timetable_slots, subjects
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "cached": len(self._cache)}
+
+
+class SqliteUserStore(UserStore):
+    """
+    SQLite(WAL) 사용자 데이터 저장소
+
+    스레드마다 연결을 하나씩 사용한다. WAL 모드라 쓰기 중에도 다른 요청의 읽기가 막히지 않는다.
+    행마다 쓰기 때 1 씩 늘어나는 rev 를 캐시 stamp 로 사용하므로, 읽기는 rev 만 조회하고
+    rev 가 바뀐 사용자(다른 스레드나 프로세스가 쓴 경우)만 JSON 을 다시 읽는다.
+    """
+    def __init__(self, path, max_cached=1024, timeout=10.0):
+        super().__init__(max_cached)
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_data ("
+            " user_key TEXT PRIMARY KEY,"
+            " timetable_slots TEXT NOT NULL,"
+            " subjects TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " rev INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(user_data)")]
+        if "rev" not in columns:
+            # rev 열이 없던 이전 DB
+            conn.execute("ALTER TABLE user_data ADD COLUMN rev INTEGER NOT NULL DEFAULT 1")
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, user_key):
+        conn = self._connection()
+        row = conn.execute("SELECT rev FROM user_data WHERE user_key = ?", (user_key,)).fetchone()
+        if row is None:
+            return EMPTY
+        cached = self._cache_get(user_key, row[0])
+        if cached is not None:
+            return cached
+        row = conn.execute("SELECT rev, timetable_slots, subjects FROM user_data WHERE user_key = ?",
+                           (user_key,)).fetchone()
+        if row is None:
+            return EMPTY
+        value = (json.loads(row[1]), json.loads(row[2]))
+        self._cache_put(user_key, value, row[0])
+        return value
+
+    def put(self, user_key, timetable_slots, subjects=None):
+        slots = slots_to_wire(timetable_slots)
+        subjects = list(subjects) if subjects is not None else []
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO user_data (user_key, timetable_slots, subjects, updated_at, rev) VALUES (?, ?, ?, ?, 1)"
+                " ON CONFLICT(user_key) DO UPDATE SET timetable_slots = excluded.timetable_slots,"
+                " subjects = excluded.subjects, updated_at = excluded.updated_at, rev = user_data.rev + 1",
+                (user_key, json.dumps(slots, ensure_ascii=False, separators=(",", ":")),
+                 json.dumps(subjects, ensure_ascii=False, separators=(",", ":")), time.time()))
+            rev = conn.execute("SELECT rev FROM user_data WHERE user_key = ?", (user_key,)).fetchone()[0]
+        self._cache_put(user_key, (slots, subjects), rev)
+
+    def user_keys(self):
+        rows = self._connection().execute("SELECT user_key FROM user_data ORDER BY user_key").fetchall()
+        return [row[0] for row in rows]
+
+
+class JsonFileUserStore(UserStore):
+    """
+    사용자별 JSON 파일 저장소 (<directory>/<인코딩한 user_key>.json, subject_datas.json 과 같은 형식)
+
+    파일 이름은 user_key 를 URL-safe base64 로 인코딩해 만든다. 되돌릴 수 있는 인코딩이라
+    서로 다른 키("user:a", "user_a")가 같은 파일을 쓰지 않고, user_keys() 는 원래 키를 돌려준다.
+    """
+    def __init__(self, directory, max_cached=1024):
+        super().__init__(max_cached)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, user_key):
+        return os.path.join(self.directory, encode_user_key(user_key) + ".json")
+
+    def get(self, user_key):
+        path = self._path(user_key)
+        try:
+            stamp = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return EMPTY
+        cached = self._cache_get(user_key, stamp)
+        if cached is not None:
+            return cached
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            value = (data.get("timetable_slots", []), data.get("subjects", []))
+        except Exception as e:
+            print(f"과목 데이터 로드 오류 ({user_key}): {e}")
+            return EMPTY
+        self._cache_put(user_key, value, stamp)
+        return value
+
+    def put(self, user_key, timetable_slots, subjects=None):
+        data = {"timetable_slots": slots_to_wire(timetable_slots)}
+        if subjects is not None:
+            data["subjects"] = list(subjects)
+        path = self._path(user_key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._cache_put(user_key, (data["timetable_slots"], data.get("subjects", [])), os.stat(path).st_mtime_ns)
+
+    def user_keys(self):
+        keys = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and not name.startswith("."):
+                user_key = decode_user_key(name[:-len(".json")])
+                if user_key is not None:
+                    keys.append(user_key)
+        return sorted(keys)
+
+
+def encode_user_key(user_key: str) -> str:
+    """사용자 키 -> 파일 이름 (URL-safe base64, 경로 구분자나 '.' 로 시작하는 이름이 나오지 않음)"""
+    return base64.urlsafe_b64encode(user_key.encode("utf-8")).decode("ascii")
+
+
+def decode_user_key(name: str) -> Optional[str]:
+    """encode_user_key 의 역변환. 이 저장소가 만든 이름이 아니면 None"""
+    try:
+        user_key = base64.urlsafe_b64decode(name.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    return user_key if encode_user_key(user_key) == name else None
+
+
+USER_STORES = {"sqlite": SqliteUserStore, "json": JsonFileUserStore}
+
+
+def open_user_store(backend, location=None, **kwargs) -> UserStore:
+    """backend: "sqlite" (location = DB 파일) 또는 "json" (location = 디렉터리). location 기본값은 DEFAULT_STORE_LOCATIONS"""
+    if backend not in USER_STORES:
+        raise ValueError(f"지원하지 않는 저장소입니다: {backend}")
+    return USER_STORES[backend](location or DEFAULT_STORE_LOCATIONS[backend], **kwargs)